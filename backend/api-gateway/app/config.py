@@ -16,17 +16,141 @@ class Settings(BaseSettings):
     
     # JWT Secret (deve ser o mesmo usado pelo auth-service)
     JWT_SECRET: str = "default-secret-change-in-production"
+    # HS256 (JWT_SECRET) ou ES256/EdDSA (chaves públicas do JWKS do auth-service)
     JWT_ALGORITHM: str = "HS256"
+    JWT_JWKS_URL: str = "http://auth-service:3000/.well-known/jwks.json"
+    JWT_JWKS_REFRESH_SECONDS: float = 300.0
+    # Intervalo mínimo entre recargas disparadas por um kid desconhecido
+    JWT_JWKS_MIN_REFRESH_SECONDS: float = 30.0
+    
+    # Cache de tokens verificados (evita jwt.decode em requisições repetidas)
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_MAX_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL_SECONDS: int = 300
     
     # URLs dos microsserviços
     AUTH_SERVICE_URL: str = "http://auth-service:3000"
     USER_SERVICE_URL: str = "http://user-service:3000"
     QUIZ_SERVICE_URL: str = "http://quiz-service:3000"
     
+    # Pools de conexão por microsserviço (limites, keep-alive e timeouts em segundos)
+    AUTH_POOL_MAX_CONNECTIONS: int = 50
+    AUTH_POOL_MAX_KEEPALIVE: int = 20
+    AUTH_CONNECT_TIMEOUT: float = 5.0
+    AUTH_READ_TIMEOUT: float = 30.0
+    USER_POOL_MAX_CONNECTIONS: int = 50
+    USER_POOL_MAX_KEEPALIVE: int = 20
+    USER_CONNECT_TIMEOUT: float = 5.0
+    USER_READ_TIMEOUT: float = 30.0
+    QUIZ_POOL_MAX_CONNECTIONS: int = 100
+    QUIZ_POOL_MAX_KEEPALIVE: int = 40
+    QUIZ_CONNECT_TIMEOUT: float = 5.0
+    QUIZ_READ_TIMEOUT: float = 30.0
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    # HTTP/2 com os microsserviços (requer o pacote opcional h2: pip install httpx[http2])
+    UPSTREAM_HTTP2: bool = False
+    
+    # Proxy em streaming: corpos acima do limite (ou sem content-length)
+    # são repassados em chunks, sem bufferizar no gateway
+    PROXY_STREAMING_ENABLED: bool = True
+    PROXY_STREAM_THRESHOLD_BYTES: int = 65536
+    
+    # GETs idênticos concorrentes (mesma URL e mesmo token) compartilham uma chamada ao microsserviço
+    PROXY_COALESCE_ENABLED: bool = True
+    
+    # Hedging dos GETs de ranking e perguntas: segunda tentativa depois do percentil
+    # PROXY_HEDGE_PERCENTILE da latência recente (mínimo MIN_DELAY), vale a primeira resposta
+    PROXY_HEDGE_ENABLED: bool = True
+    PROXY_HEDGE_PERCENTILE: float = 95.0
+    PROXY_HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    PROXY_HEDGE_MIN_SAMPLES: int = 20
+    # Retries de falhas de conexão com backoff exponencial e jitter (0 desliga)
+    PROXY_RETRY_ATTEMPTS: int = 2
+    PROXY_RETRY_BACKOFF_SECONDS: float = 0.05
+    PROXY_RETRY_BACKOFF_MAX_SECONDS: float = 1.0
+    # Orçamento por serviço para hedges e retries: cada chamada rende RATIO ficha, cada extra gasta 1
+    PROXY_RETRY_BUDGET_RATIO: float = 0.1
+    PROXY_RETRY_BUDGET_MAX_TOKENS: float = 10.0
+    
+    # Circuit breaker por microsserviço: abre quando, nas últimas WINDOW_SIZE chamadas
+    # (mínimo MIN_CALLS), a taxa de erros ou de chamadas lentas passa do limite
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_WINDOW_SIZE: int = 20
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 15.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+    
+    # Cache de respostas dos GETs de /api/teams, /api/questions e /api/quizzes-admin
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 262144
+    
+    # Compressão das respostas conforme o Accept-Encoding do cliente (br requer o pacote opcional brotli).
+    # Corpos a partir de OFFLOAD_BYTES são comprimidos fora do event loop
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_OFFLOAD_BYTES: int = 32768
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_ENTRIES: int = 256
+    
+    # POST /api/batch: itens por chamada e quantos vão ao mesmo tempo para os microsserviços
+    BATCH_MAX_ITEMS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 8
+    
+    # Rate limiting (token bucket por usuário, ou IP em rotas públicas, e grupo de rotas).
+    # RATE = tokens por segundo, BURST = capacidade do balde
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "local"  # local | redis (requer o pacote opcional redis)
+    RATE_LIMIT_REDIS_URL: str = "redis://redis:6379/0"
+    RATE_LIMIT_IDLE_SECONDS: float = 300.0
+    RATE_LIMIT_MAX_BUCKETS: int = 100000
+    RATE_LIMIT_DEFAULT_RATE: float = 50.0
+    RATE_LIMIT_DEFAULT_BURST: int = 100
+    RATE_LIMIT_AUTH_RATE: float = 2.0
+    RATE_LIMIT_AUTH_BURST: int = 10
+    RATE_LIMIT_GAMEPLAY_RATE: float = 5.0
+    RATE_LIMIT_GAMEPLAY_BURST: int = 15
+    
+    # Access log estruturado (JSON por linha). SAMPLE_RATE = fração das requisições
+    # bem-sucedidas registradas; erros (status >= 400) são sempre registrados
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_ALWAYS_LOG_ERRORS: bool = True
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+    
+    # Drenagem no desligamento: tempo com readiness desligada antes de recusar requisições
+    # novas e prazo para as requisições em andamento terminarem
+    DRAIN_READINESS_GRACE_SECONDS: float = 5.0
+    DRAIN_TIMEOUT_SECONDS: float = 25.0
+    
+    # Tracing distribuído (W3C traceparent + X-Request-ID). Spans em JSON por linha no arquivo
+    # e/ou em lotes para o coletor; sem nenhum dos dois, o contexto só é propagado
+    TRACE_SERVICE_NAME: str = "api-gateway"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
+    # Endpoint /metrics (formato Prometheus)
+    METRICS_ENABLED: bool = True
+    
     # Caminho para arquivos Casbin
     CASBIN_MODEL_PATH: str = "app/casbin/rbac_model.conf"
     CASBIN_POLICY_PATH: str = "app/casbin/policy.csv"
     
+    # Tamanho do memo de decisões (role, path, método) da tabela compilada
+    CASBIN_DECISION_MEMO_SIZE: int = 4096
+    
+    # Recarga a quente do policy.csv (polling do arquivo; a tabela nova é trocada sem bloquear requisições)
+    CASBIN_POLICY_WATCH: bool = True
+    CASBIN_POLICY_POLL_SECONDS: float = 2.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,92 @@
+"""
+Middleware de access log
+Emite um registro JSON por requisição (ver app/services/access_log.py)
+
+Middleware ASGI puro e o mais externo da pilha: mede a requisição inteira,
+incluindo autenticação e autorização, e conta os bytes de entrada e saída
+sem bufferizar corpos.
+"""
+import logging
+import random
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.services.access_log import ACCESS_LOG_KEY, access_logger
+
+
+class AccessLogMiddleware:
+    """Middleware ASGI que monta e emite o registro de acesso de cada requisição"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.ACCESS_LOG_SAMPLE_RATE,
+        always_log_errors: bool = settings.ACCESS_LOG_ALWAYS_LOG_ERRORS,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.always_log_errors = always_log_errors
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        record = {
+            "type": "access",
+            "method": scope["method"],
+            "path": scope["path"],
+            "client": scope["client"][0] if scope.get("client") else None,
+        }
+        scope.setdefault("state", {})[ACCESS_LOG_KEY] = record
+        status_code: Optional[int] = None
+        bytes_in = 0
+        bytes_out = 0
+
+        async def receive_counting() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status_code, bytes_out
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_counting, send_counting)
+        except Exception:
+            status_code = status_code or 500
+            raise
+        finally:
+            if self._should_log(status_code):
+                state = scope["state"]
+                record["status"] = status_code
+                record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                # Corpos em streaming não têm content-length: vale o que foi lido
+                record["bytes_in"] = self._declared_length(scope) or bytes_in
+                record["bytes_out"] = bytes_out
+                record["user_id"] = state.get("user_id")
+                record["role"] = state.get("user_role")
+                access_logger.info(record)
+
+    @staticmethod
+    def _declared_length(scope: Scope) -> int:
+        for key, value in scope["headers"]:
+            if key == b"content-length":
+                return int(value) if value.isdigit() else 0
+        return 0
+
+    def _should_log(self, status_code: Optional[int]) -> bool:
+        if self.always_log_errors and (status_code is None or status_code >= 400):
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
@@ -1,97 +1,151 @@
 """
 Middleware de autorização Casbin
 Verifica permissões baseadas em roles e políticas
+
+Implementado como middleware ASGI puro: o `user_role` é lido de
+scope["state"] (preenchido pelo JwtAuthMiddleware) sem construir um `Request`.
+As políticas são compiladas em uma PolicyDecisionTable no startup e trocadas a
+quente quando o policy.csv muda (PolicyStore); o Enforcer fica disponível
+apenas como referência.
 """
-import os
-from typing import Callable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, JSONResponse
-from starlette.types import ASGIApp
+import time
+from typing import Iterable, Optional, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi import status
 import casbin
 
-from app.config import settings
-
-
-class CasbinAuthzMiddleware(BaseHTTPMiddleware):
-    """Middleware para verificação de autorização usando Casbin"""
-    
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.enforcer = None
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Inicializar enforcer se ainda não foi inicializado
-        if self.enforcer is None:
-            # Obter caminho base do projeto (pasta onde está o main.py)
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            model_path = os.path.join(base_dir, settings.CASBIN_MODEL_PATH)
-            policy_path = os.path.join(base_dir, settings.CASBIN_POLICY_PATH)
-            
-            print(f"[Casbin] Inicializando enforcer: model={model_path}, policy={policy_path}")
-            
-            try:
-                self.enforcer = casbin.Enforcer(
-                    model_path,
-                    policy_path
-                )
-                print(f"[Casbin] Enforcer inicializado com sucesso. Políticas carregadas: {len(self.enforcer.get_policy())}")
-            except Exception as e:
-                print(f"[Casbin] ERRO ao inicializar enforcer: {e}")
-                raise
-        
-        # Rotas de autenticação são permitidas para todos
-        path = request.url.path
-        if path.startswith("/api/auth/"):
-            return await call_next(request)
-        
-        # Rotas de password reset são públicas (não precisam de autenticação)
-        if path.startswith("/api/password/"):
-            return await call_next(request)
-        
+from app.services import metrics
+from app.services.access_log import annotate
+from app.services.policy_store import PolicyStore, policy_store as default_store
+from app.services.policy_table import PolicyDecisionTable
+from app.services.public_routes import PublicRoutes
+
+
+# Rotas liberadas sem verificação de política (formato em app/services/public_routes.py)
+# Rotas de autenticação e de password reset são públicas
+PUBLIC_PREFIXES = [
+    "/api/auth/",
+    "/api/password/",
+    "POST /api/users",  # Cadastro
+    "POST /api/user",
+    "POST /api/users/password/forgot",  # Recuperação de senha (app mobile, sem token)
+    "POST /api/users/password/reset",
+    "GET /api/users/password/validate-token",
+    "/",  # Apenas a raiz
+    "/health",
+    "/ready",  # Readiness (balanceador/Kubernetes)
+    "/metrics",  # Scrape do Prometheus
+    "/docs",
+    "/docs/",
+    "/openapi.json",
+    "/redoc",
+]
+PUBLIC_ROUTES = PublicRoutes(PUBLIC_PREFIXES)
+
+# Rotas serviço-a-serviço (ex: /users/internal/by-email devolve o hash da senha):
+# negadas no gateway para qualquer role, mesmo que uma política as cubra
+INTERNAL_PREFIXES = [
+    "/api/users/internal",
+    "/api/users/internal/",
+    "/api/user/internal",
+    "/api/user/internal/",
+]
+INTERNAL_ROUTES = PublicRoutes(INTERNAL_PREFIXES)
+
+
+def load_policies() -> Tuple[casbin.Enforcer, PolicyDecisionTable]:
+    """Enforcer e tabela em uso no momento (ver app/services/policy_store.py)"""
+    current = default_store.current or default_store.load()
+    return current.enforcer, current.decisions
+
+
+def authorize(
+    decisions: PolicyDecisionTable,
+    path: str,
+    method: str,
+    user_role: Optional[str],
+    public_routes: PublicRoutes = PUBLIC_ROUTES,
+    internal_routes: PublicRoutes = INTERNAL_ROUTES,
+) -> Tuple[str, Optional[str]]:
+    """
+    Decisão de autorização de um (path, método, role).
+
+    Returns:
+        (resultado, mensagem de erro): resultado é public, unauthenticated,
+        denied ou allowed; a mensagem só existe quando o acesso é negado
+    """
+    if internal_routes.matches(path, method):
+        return "denied", "Acesso negado: rota interna"
+    if public_routes.matches(path, method):
+        return "public", None
+    # Se não tem role (usuário não autenticado), bloquear
+    if not user_role:
+        return "unauthenticated", "Acesso negado: autenticação necessária"
+    # Path exato e, para rotas com ID, o wildcard do recurso (ex: /api/users/*)
+    if not decisions.is_allowed(user_role, path, method):
+        return "denied", f"Acesso negado: você não tem permissão para {method} {path}"
+    return "allowed", None
+
+
+class CasbinAuthzMiddleware:
+    """Middleware ASGI para verificação de autorização usando Casbin"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_prefixes: Iterable[str] = PUBLIC_PREFIXES,
+        store: PolicyStore = default_store,
+    ):
+        self.app = app
+        self.public_routes = PublicRoutes(public_prefixes)
+        self.store = store
+
+    @property
+    def enforcer(self) -> casbin.Enforcer:
+        return self.store.enforcer
+
+    @property
+    def decisions(self) -> PolicyDecisionTable:
+        return self.store.decisions
+
+    def _init_enforcer(self) -> None:
+        """Garante as políticas carregadas (o lifespan já faz isso no startup)"""
+        if self.store.current is None:
+            self.store.load()
+
+    @staticmethod
+    def _finish(scope: Scope, started: float, outcome: str) -> None:
+        """Registra o resultado da autorização no access log e nas métricas"""
+        annotate(scope, authz=outcome)
+        metrics.authz_duration.observe(time.perf_counter() - started, outcome)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Rotas públicas não precisam de autorização
-        public_routes = ["/", "/health", "/docs", "/openapi.json", "/redoc"]
-        if any(path.startswith(route) for route in public_routes):
-            return await call_next(request)
-        
-        # Se não tem role (usuário não autenticado), bloquear
-        user_role = getattr(request.state, "user_role", None)
-        if not user_role:
-            return JSONResponse(
-                status_code=status.HTTP_403_FORBIDDEN,
-                content={"detail": "Acesso negado: autenticação necessária"}
-            )
-        
-        # Normalizar path (remover query params)
-        normalized_path = path.split("?")[0]
-        method = request.method
-        
-        # Log para debug
-        print(f"[Casbin] Verificando autorização: role={user_role}, path={normalized_path}, method={method}")
-        
-        # Tentar verificar com path exato primeiro
-        allowed = self.enforcer.enforce(user_role, normalized_path, method)
-        
-        # Se não permitido com path exato, tentar com wildcard
-        if not allowed:
-            # Para rotas com ID (ex: /api/users/123), tentar com wildcard (ex: /api/users/*)
-            path_parts = normalized_path.split("/")
-            if len(path_parts) > 3:
-                # Construir path com wildcard (ex: /api/users/*)
-                wildcard_path = "/".join(path_parts[:-1]) + "/*"
-                print(f"[Casbin] Tentando com wildcard: {wildcard_path}")
-                allowed = self.enforcer.enforce(user_role, wildcard_path, method)
-        
-        if not allowed:
-            print(f"[Casbin] Acesso NEGADO: role={user_role}, path={normalized_path}, method={method}")
-            return JSONResponse(
+        path = scope["path"]
+        if self.public_routes.matches(path, scope["method"]):
+            annotate(scope, authz="public")
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        # scope["path"] já vem sem query string
+        user_role = scope.get("state", {}).get("user_role")
+        # Uma leitura da tabela por requisição: uma recarga no meio não a afeta
+        outcome, detail = authorize(self.store.decisions, path, scope["method"], user_role, self.public_routes)
+        self._finish(scope, started, outcome)
+
+        if detail is not None:
+            response = JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
-                content={
-                    "detail": f"Acesso negado: você não tem permissão para {method} {normalized_path}"
-                }
+                content={"detail": detail}
             )
-        
-        print(f"[Casbin] Acesso PERMITIDO: role={user_role}, path={normalized_path}, method={method}")
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
 
+        await self.app(scope, receive, send)
@@ -0,0 +1,46 @@
+"""
+Middleware de drenagem
+Conta as requisições em andamento e, durante a drenagem, recusa as novas
+
+Fica por dentro do access log e das métricas, para que as recusas (503)
+apareçam nos dois.
+"""
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from fastapi import status
+
+from app.services.access_log import annotate
+from app.services.drain import DrainController, drain_controller
+
+# Sondas e scrape continuam respondendo durante a drenagem
+EXEMPT_PATHS = ("/health", "/ready", "/metrics")
+
+
+class DrainMiddleware:
+    """Middleware ASGI que registra cada requisição no DrainController"""
+
+    def __init__(self, app: ASGIApp, controller: DrainController = drain_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.refusing:
+            self.controller.refused += 1
+            annotate(scope, draining=True)
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Gateway em desligamento. Tente novamente"},
+                headers={"Connection": "close", "Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        task = self.controller.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.leave(task)
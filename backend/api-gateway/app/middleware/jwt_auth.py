@@ -1,19 +1,26 @@
 """
 Middleware de autenticação JWT
 Valida tokens JWT e extrai informações do usuário (userId, role)
+
+Implementado como middleware ASGI puro: rotas públicas seguem direto para a
+aplicação com o `scope` intacto, sem criar `Request` nem tasks extras.
 """
-from typing import Callable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, JSONResponse
-from starlette.types import ASGIApp
+import time
+from typing import Iterable, Optional
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from jose import jwt, JWTError
 from fastapi import status
 
 from app.config import settings
+from app.services import jwks, metrics
+from app.services.access_log import annotate
+from app.services.public_routes import PublicRoutes
+from app.services.token_cache import TokenCache, token_cache
 
 
 # Lista de rotas públicas que não precisam de autenticação
+# Formato em app/services/public_routes.py: exata, prefixo (termina em "/") ou "MÉTODO path"
 PUBLIC_ROUTES = [
     "/api/auth/login",
     "/api/auth/logout",
@@ -21,80 +28,130 @@ PUBLIC_ROUTES = [
     "/api/password/forgot",  # Corrigido: gateway usa /api/password/forgot
     "/api/password/reset",  # Corrigido: gateway usa /api/password/reset
     "/api/password/validate-token",  # Corrigido: gateway usa /api/password/validate-token
-    "/api/users",  # Rota pública para criação de usuário (cadastro)
-    "/api/user",  # Alias para rota de usuário (cadastro)
-    "/",
+    "POST /api/users",  # Criação de usuário (cadastro); o restante de /api/users exige token
+    "POST /api/user",  # Alias para rota de usuário (cadastro)
+    "POST /api/users/password/forgot",  # Recuperação de senha chamada pelo app mobile
+    "POST /api/users/password/reset",
+    "GET /api/users/password/validate-token",
+    "/",  # Apenas a raiz
     "/health",
+    "/ready",  # Readiness (balanceador/Kubernetes)
+    "/metrics",  # Scrape do Prometheus
     "/docs",
+    "/docs/",
     "/openapi.json",
     "/redoc",
 ]
 
 
-class JwtAuthMiddleware(BaseHTTPMiddleware):
-    """Middleware para validação de tokens JWT"""
-    
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+def get_header(scope: Scope, name: bytes) -> Optional[str]:
+    """Busca um header direto na lista crua do scope (nome em minúsculas)"""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class JwtAuthMiddleware:
+    """Middleware ASGI para validação de tokens JWT"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_routes: Iterable[str] = PUBLIC_ROUTES,
+        cache: Optional[TokenCache] = token_cache if settings.JWT_CACHE_ENABLED else None,
+        key_set: Optional[jwks.JwksKeySet] = jwks.key_set,
+    ):
+        self.app = app
+        self.public_routes = PublicRoutes(public_routes)
+        self.cache = cache
+        # Com ES256/EdDSA, chaves públicas do JWKS do auth-service; senão, JWT_SECRET
+        self.key_set = key_set
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Verificar se a rota é pública
-        path = request.url.path
-        
-        if self._is_public_route(path):
-            return await call_next(request)
-        
+        if self._is_public_route(scope["path"], scope["method"]):
+            annotate(scope, authn="public")
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
         # Extrair token do header Authorization
-        auth_header = request.headers.get("Authorization")
-        
+        auth_header = get_header(scope, b"authorization")
+
         if not auth_header or not auth_header.startswith("Bearer "):
-            return JSONResponse(
+            self._finish(scope, started, "missing")
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Token não fornecido"}
             )
-        
+            await response(scope, receive, send)
+            return
+
         token = auth_header.split(" ")[1]
-        
-        try:
-            # Validar token JWT
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
-            
-            # Extrair informações do usuário do payload
-            user_id = payload.get("sub") or payload.get("userId")
-            user_role = payload.get("role", "comum")
-            
-            # Anexar informações ao estado da requisição
-            request.state.user_id = user_id
-            request.state.user_role = user_role
-            request.state.user = payload
-            
-        except JWTError as e:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": f"Token inválido: {str(e)}"}
-            )
-        except Exception as e:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": f"Erro ao validar token: {str(e)}"}
-            )
-        
-        return await call_next(request)
-    
-    def _is_public_route(self, path: str) -> bool:
-        """Verifica se a rota é pública"""
-        # Verificar rotas exatas
-        if path in PUBLIC_ROUTES:
-            return True
-        
-        # Verificar se começa com alguma rota pública
-        for public_route in PUBLIC_ROUTES:
-            if path.startswith(public_route):
-                return True
-        
-        return False
 
+        # Token já verificado recentemente: pula a criptografia
+        identity = self.cache.get(token) if self.cache is not None else None
+
+        if identity is None:
+            try:
+                # Validar token JWT
+                payload = await self._decode(token)
+            except JWTError as e:
+                self._finish(scope, started, "invalid")
+                response = JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": f"Token inválido: {str(e)}"}
+                )
+                await response(scope, receive, send)
+                return
+            except Exception as e:
+                self._finish(scope, started, "error")
+                response = JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": f"Erro ao validar token: {str(e)}"}
+                )
+                await response(scope, receive, send)
+                return
+
+            if self.cache is not None:
+                identity = self.cache.put(token, payload)
+            else:
+                identity = TokenCache.identity_from(payload)
+            self._finish(scope, started, "verified")
+        else:
+            self._finish(scope, started, "cached")
+
+        # Anexar informações ao estado da requisição.
+        # request.state lê de scope["state"], então os handlers enxergam os mesmos valores.
+        state = scope.setdefault("state", {})
+        state["user_id"] = identity.user_id
+        state["user_role"] = identity.user_role
+        state["user"] = identity.payload
+
+        await self.app(scope, receive, send)
+
+    async def _decode(self, token: str) -> dict:
+        """Valida o token e retorna o payload (levanta JWTError se inválido)"""
+        if self.key_set is not None:
+            return await jwks.verify_token(token, self.key_set)
+        return jwt.decode(
+            token,
+            settings.JWT_SECRET,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+
+    @staticmethod
+    def _finish(scope: Scope, started: float, outcome: str) -> None:
+        """Registra o resultado da autenticação no access log e nas métricas"""
+        annotate(scope, authn=outcome)
+        metrics.authn_duration.observe(time.perf_counter() - started, outcome)
+
+    def _is_public_route(self, path: str, method: str) -> bool:
+        """Verifica se a rota é pública (exata, por prefixo ou por método + path)"""
+        return self.public_routes.matches(path, method)
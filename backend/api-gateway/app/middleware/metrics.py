@@ -0,0 +1,59 @@
+"""
+Middleware de métricas
+Conta requisições, bytes e duração por rota (ver app/services/metrics.py)
+
+Middleware ASGI puro. A rota é o template registrado no FastAPI
+(ex: /api/teams/{path}), lido de scope["route"] depois do roteamento, para
+que IDs no path não criem uma série por recurso.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import metrics
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que alimenta as métricas por rota do gateway"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        bytes_in = 0
+        bytes_out = 0
+
+        async def receive_counting() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status_code, bytes_out
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive_counting, send_counting)
+        finally:
+            metrics.requests_in_flight.dec()
+            route = scope.get("route")
+            route = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+            metrics.requests_total.inc(route, scope["method"], metrics.status_class(status_code))
+            metrics.request_duration.observe(time.perf_counter() - started, route)
+            metrics.request_bytes.inc(route, amount=bytes_in)
+            metrics.response_bytes.inc(route, amount=bytes_out)
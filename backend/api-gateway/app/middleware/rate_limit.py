@@ -0,0 +1,42 @@
+"""
+Middleware de rate limiting
+Aplica os token buckets de app/services/rate_limit.py antes da autorização
+
+Roda depois do JwtAuthMiddleware: requisições autenticadas são limitadas por
+user_id e as demais (rotas públicas, sem token) pelo IP do cliente.
+"""
+import math
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from fastapi import status
+
+from app.services.access_log import annotate
+from app.services.rate_limit import EXEMPT_PREFIXES, RateLimiter, client_identity, get_rate_limiter
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI de admissão por token bucket"""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or get_rate_limiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        rule, wait = await self.limiter.check(scope["path"], client_identity(scope))
+        if wait > 0:
+            annotate(scope, rate_limited=rule.group)
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Muitas requisições. Tente novamente em instantes"},
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
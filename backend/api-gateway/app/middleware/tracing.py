@@ -0,0 +1,43 @@
+"""
+Middleware de tracing
+Abre o span raiz da requisição no gateway (ver app/services/tracing.py)
+
+Fica por dentro do access log: o registro de acesso recebe o request_id e o
+trace_id, e o span cobre drenagem, autenticação, autorização e proxy.
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.access_log import annotate
+from app.services.tracing import REQUEST_ID_HEADER, Tracer, tracer as default_tracer
+
+
+class TracingMiddleware:
+    """Middleware ASGI que continua (ou inicia) o trace e devolve o X-Request-ID ao cliente"""
+
+    def __init__(self, app: ASGIApp, tracer: Tracer = default_tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        parent, request_id = self.tracer.extract(headers)
+        method = scope["method"]
+        attributes = {"http.method": method, "http.target": scope["path"]}
+        with self.tracer.span(f"{method} {scope['path']}", "server", parent, request_id, attributes) as span:
+            annotate(scope, request_id=span.request_id, trace_id=span.trace_id)
+
+            async def send_with_request_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (REQUEST_ID_HEADER.encode(), span.request_id.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_request_id)
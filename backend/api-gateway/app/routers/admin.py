@@ -0,0 +1,116 @@
+"""
+Router administrativo do Gateway - Estado interno para operação e incidentes
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.config import settings
+from app.routers.gateway import proxy_service
+from app.services import jwks
+from app.services.drain import drain_controller
+from app.services.policy_store import policy_store
+from app.services.tracing import tracer
+
+router = APIRouter(prefix="/gateway", tags=["gateway-admin"])
+
+
+def require_admin(request: Request) -> None:
+    """
+    Operações que mudam o estado do gateway exigem admin autenticado mesmo que
+    a lista de rotas públicas ou as políticas do Casbin liberem o path por engano
+    """
+    user_role = getattr(request.state, "user_role", None)
+    if not user_role:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token não fornecido")
+    if user_role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado: requer admin")
+
+
+@router.get("/pools")
+async def get_pools():
+    """Uso dos pools de conexão por microsserviço"""
+    return proxy_service.pool_stats()
+
+
+@router.get("/cache")
+async def get_response_cache():
+    """Contadores do cache de respostas (hits, misses, revalidações, invalidações)"""
+    if proxy_service.response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **proxy_service.response_cache.stats()}
+
+
+@router.get("/coalescing")
+async def get_coalescing():
+    """Contadores do singleflight: chamadas líderes e requisições que reaproveitaram uma chamada"""
+    if proxy_service.singleflight is None:
+        return {"enabled": False}
+    return {"enabled": True, **proxy_service.singleflight.stats()}
+
+
+@router.get("/compression")
+async def get_compression():
+    """Contadores da compressão de respostas (comprimidas, ignoradas, em thread, bytes antes/depois)"""
+    if proxy_service.compressor is None:
+        return {"enabled": False}
+    return {"enabled": True, **proxy_service.compressor.stats()}
+
+
+@router.get("/hedging")
+async def get_hedging():
+    """Hedges (e quantos venceram), retries de conexão, orçamento por serviço e espera atual do hedge"""
+    if proxy_service.hedger is None:
+        return {"enabled": False}
+    return {"enabled": True, **proxy_service.hedger.stats()}
+
+
+@router.get("/breakers")
+async def get_breakers():
+    """Estado do circuit breaker por microsserviço (closed/open/half_open)"""
+    return proxy_service.breaker_stats()
+
+
+@router.get("/jwks")
+async def get_jwks():
+    """Chaves públicas em cache (kids) e recargas do JWKS do auth-service"""
+    if jwks.key_set is None:
+        return {"enabled": False}
+    return {"enabled": True, **jwks.key_set.stats()}
+
+
+@router.get("/policies")
+async def get_policies():
+    """Versão das políticas Casbin em uso, recargas, falhas (última mensagem) e memo de decisões"""
+    return policy_store.stats()
+
+
+@router.post("/policies/reload", dependencies=[Depends(require_admin)])
+async def reload_policies():
+    """Recarrega o policy.csv agora; um arquivo inválido é rejeitado e a versão atual continua"""
+    reloaded = await policy_store.reload()
+    return {"reloaded": reloaded, **policy_store.stats()}
+
+
+@router.get("/tracing")
+async def get_tracing():
+    """Destino dos spans, taxa de amostragem e spans exportados/descartados"""
+    return tracer.stats()
+
+
+@router.get("/drain")
+async def get_drain():
+    """Readiness, requisições em andamento e relatório da última drenagem"""
+    return drain_controller.stats()
+
+
+@router.post("/drain", dependencies=[Depends(require_admin)])
+async def start_drain():
+    """
+    Inicia a drenagem (ex: preStop do Kubernetes): readiness desligada, requisições
+    novas recusadas, em andamento aguardadas até o prazo e pools fechados.
+    Responde com o relatório (concluídas/abortadas/recusadas)
+    """
+    return await drain_controller.drain(
+        grace_seconds=settings.DRAIN_READINESS_GRACE_SECONDS,
+        timeout_seconds=settings.DRAIN_TIMEOUT_SECONDS,
+        close=proxy_service.close,
+    )
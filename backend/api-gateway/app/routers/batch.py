@@ -0,0 +1,180 @@
+"""
+Router de batch - Várias requisições ao gateway em uma única chamada
+
+O app faz várias chamadas seguidas ao abrir (quiz atual, times, ranking...).
+POST /api/batch recebe essas sub-requisições, reaproveita a autenticação da
+própria chamada de batch (o JwtAuthMiddleware roda uma vez) e executa as
+autorizadas em paralelo pelo ProxyService, com o mesmo roteamento, cache,
+coalescência e circuit breakers das requisições avulsas. Cada item tem seu
+próprio status: um item negado ou com erro não derruba os demais.
+
+Cada item consome um token do rate limiting, como se fosse uma requisição
+avulsa: o batch não serve para contornar os limites.
+"""
+import asyncio
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.middleware.casbin_authz import authorize, load_policies
+from app.routers.gateway import dispatcher
+from app.services import rate_limit
+from app.services.access_log import ACCESS_LOG_KEY
+
+router = APIRouter(tags=["batch"])
+
+# Headers da chamada de batch herdados por todos os itens (autenticação feita uma vez)
+INHERITED_HEADERS = frozenset([b"authorization", b"accept-language", b"user-agent"])
+# Headers aceitos por item (autenticação e codificação vêm sempre da chamada de batch)
+ITEM_HEADERS = frozenset(["accept", "if-none-match"])
+# Headers da resposta de cada item devolvidos no batch
+ITEM_RESPONSE_HEADERS = ("content-type", "etag", "x-cache", "retry-after")
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    # Path no gateway, com query string (ex: /api/teams?page=1)
+    path: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+
+def _item_result(item: BatchItem, status_code: int, body: Any, headers: Optional[Dict[str, str]] = None) -> Dict:
+    return {"id": item.id, "status": status_code, "headers": headers or {}, "body": body}
+
+
+def _error(item: BatchItem, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None) -> Dict:
+    return _item_result(item, status_code, {"detail": detail}, headers)
+
+
+def _sub_request(parent: Request, item: BatchItem) -> Request:
+    """Requisição sintética do item, com o estado de autenticação da chamada de batch"""
+    path, _, query = item.path.partition("?")
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+
+    headers = [(key, value) for key, value in parent.scope["headers"] if key in INHERITED_HEADERS]
+    headers += [
+        (key.lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in item.headers.items()
+        if key.lower() in ITEM_HEADERS
+    ]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    # Mesmo user_id/role, mas registro de access log próprio (não mistura com o do batch)
+    state = {key: value for key, value in parent.scope.get("state", {}).items() if key != ACCESS_LOG_KEY}
+    scope = {
+        **parent.scope,
+        "method": item.method.upper(),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def _read_body(response: Response) -> bytes:
+    if not isinstance(response, StreamingResponse):
+        return response.body
+    chunks = []
+    try:
+        async for chunk in response.body_iterator:
+            chunks.append(chunk if isinstance(chunk, bytes) else chunk.encode())
+    finally:
+        if response.background is not None:
+            await response.background()
+    return b"".join(chunks)
+
+
+def _decode(body: bytes, content_type: Optional[str]) -> Any:
+    if not body:
+        return None
+    if content_type and "json" in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.decode("utf-8", errors="replace")
+
+
+async def _run_item(parent: Request, item: BatchItem, semaphore: asyncio.Semaphore) -> Dict:
+    request = _sub_request(parent, item)
+    scope = request.scope
+    path, method = scope["path"], scope["method"]
+
+    found = dispatcher.table.lookup(path)
+    if found is None:
+        return _error(item, status.HTTP_404_NOT_FOUND, "Not Found")
+    route, remainder = found
+    if method not in route.methods:
+        return _error(
+            item, status.HTTP_405_METHOD_NOT_ALLOWED, "Method Not Allowed", {"allow": ", ".join(sorted(route.methods))}
+        )
+
+    _, decisions = load_policies()
+    outcome, detail = authorize(decisions, path, method, scope["state"].get("user_role"))
+    if detail is not None:
+        if outcome == "unauthenticated":
+            return _error(item, status.HTTP_401_UNAUTHORIZED, detail)
+        return _error(item, status.HTTP_403_FORBIDDEN, detail)
+
+    if settings.RATE_LIMIT_ENABLED and not path.startswith(rate_limit.EXEMPT_PREFIXES):
+        _, wait = await rate_limit.get_rate_limiter().check(path, rate_limit.client_identity(scope))
+        if wait > 0:
+            return _error(
+                item,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Muitas requisições. Tente novamente em instantes",
+                {"retry-after": str(max(1, math.ceil(wait)))},
+            )
+
+    async with semaphore:
+        try:
+            response = await dispatcher.forward(route, remainder, request)
+        except HTTPException as e:
+            return _error(item, e.status_code, e.detail, dict(e.headers or {}))
+        body = await _read_body(response)
+
+    headers = {name: response.headers[name] for name in ITEM_RESPONSE_HEADERS if name in response.headers}
+    return _item_result(item, response.status_code, _decode(body, headers.get("content-type")), headers)
+
+
+@router.post("/batch")
+async def batch(payload: BatchRequest, request: Request):
+    """
+    Executa várias requisições ao gateway de uma vez.
+
+    Corpo: {"requests": [{"id": "teams", "method": "GET", "path": "/api/teams"}, ...]}
+    Resposta: {"responses": [{"id", "status", "headers", "body"}, ...]} na mesma ordem
+    """
+    if len(payload.requests) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            # Literal: o nome da constante mudou entre versões do Starlette
+            status_code=413,
+            detail=f"Batch com mais de {settings.BATCH_MAX_ITEMS} requisições",
+        )
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+    results = await asyncio.gather(*(_run_item(request, item, semaphore) for item in payload.requests))
+
+    response = JSONResponse({"responses": results})
+    compressor = dispatcher.proxy.compressor
+    if compressor is not None:
+        response = await compressor.compress(response, request.headers.get("accept-encoding"))
+    return response
@@ -1,158 +1,75 @@
 """
 Router do Gateway - Roteia requisições para os microsserviços
+
+Uma única rota ASGI atende todos os prefixos de app/services/route_table.py:
+a rota é resolvida na trie de prefixos (em vez de testar uma regex por
+handler) e a URL no microsserviço sai de uma base pré-computada.
 """
-from fastapi import APIRouter, Request
+from fastapi import status
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
 
 from app.services.proxy import ProxyService
+from app.services.route_table import ROUTE_TABLE, ProxyRoute, RouteTable
+from app.services.token_cache import token_cache
 
-router = APIRouter()
-# ISP: o router define proxies separados por domínio, mantendo cada interface segregada.
 # DIP: delegamos o comportamento de proxy a um serviço especializado em vez de misturar no router.
 proxy_service = ProxyService()
 
-# ==========================================
-# AUTH SERVICE
-# ==========================================
-
-
-@router.api_route("/auth/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_auth(path: str, request: Request):
-    """Roteia requisições para auth-service"""
-    return await proxy_service.proxy_request("auth", path, request)
-
-
-# ========== PASSWORD RESET ROUTES (Public) ==========
-
-@router.post("/password/forgot")
-async def forgot_password(request: Request):
-    """
-    Inicia recuperação de senha
-    Roteia para user-service
-    """
-    return await proxy_service.proxy_request("user", "password/forgot", request)
-
-
-@router.post("/password/reset")
-async def reset_password(request: Request):
-    """
-    Redefine a senha usando token
-    Roteia para user-service
-    """
-    return await proxy_service.proxy_request("user", "password/reset", request)
-
-
-@router.get("/password/validate-token")
-async def validate_token(request: Request):
-    """
-    Valida um token de reset
-    Roteia para user-service
-    """
-    return await proxy_service.proxy_request("user", "password/validate-token", request)
-
-# ==========================================
-# USER SERVICE
-# ==========================================
-
-@router.post("/users")
-async def create_user(request: Request):
-    """Roteia criação de usuário para user-service"""
-    print("[Gateway] POST /api/users - Criando usuário")
-    return await proxy_service.proxy_request("user", "", request)
-
-
-@router.api_route("/users/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_users(path: str, request: Request):
-    """Roteia requisições para user-service"""
-    print(f"[Gateway] /api/users/{path} - Roteando para user-service")
-    return await proxy_service.proxy_request("user", path, request)
-
-
-@router.api_route("/user/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_user(path: str, request: Request):
-    """Roteia requisições para user-service (alias)"""
-    return await proxy_service.proxy_request("user", path, request)
-
-# ==========================================
-# QUIZ SERVICE - GAMEPLAY & RANKING 
-# ==========================================
-
-@router.api_route("/api/quiz/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
-async def proxy_gameplay(path: str, request: Request):
-    """
-    Roteia o Gameplay (Start, Answer, Abandon)
-    Gateway: /api/quiz/start -> QuizService: /quizzes/start
-    """
-    # O quiz-service usa prefixo /quizzes, então mapeamos /api/quiz para /quizzes
-    full_path = f"quizzes/{path}"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-@router.api_route("/api/leaderboard/{path:path}", methods=["GET", "OPTIONS"])
-async def proxy_leaderboard(path: str, request: Request):
-    """
-    Roteia o Ranking
-    Gateway: /api/leaderboard/general -> QuizService: /api/leaderboard/general
-    """
-    full_path = f"api/leaderboard/{path}"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-# ==========================================
-# QUIZ SERVICE - ADMIN (CRUD)
-# ==========================================
-
-@router.api_route("/quiz/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_quiz(path: str, request: Request):
-    """Roteia requisições para quiz-service"""
-    return await proxy_service.proxy_request("quiz", path, request)
-
-
-@router.api_route("/teams/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_teams(path: str, request: Request):
-    """Roteia requisições para quiz-service - Teams"""
-    full_path = f"teams/{path}" if path else "teams"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-
-@router.api_route("/teams", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_teams_root(request: Request):
-    """Roteia requisições para quiz-service - Teams (root)"""
-    return await proxy_service.proxy_request("quiz", "teams", request)
-
-
-@router.api_route("/questions/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_questions(path: str, request: Request):
-    """Roteia requisições para quiz-service - Questions"""
-    full_path = f"questions/{path}" if path else "questions"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-
-@router.api_route("/questions", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_questions_root(request: Request):
-    """Roteia requisições para quiz-service - Questions (root)"""
-    return await proxy_service.proxy_request("quiz", "questions", request)
-
-
-@router.api_route("/answers/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_answers(path: str, request: Request):
-    """Roteia requisições para quiz-service - Answers"""
-    full_path = f"answers/{path}" if path else "answers"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-
-@router.api_route("/answers", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_answers_root(request: Request):
-    """Roteia requisições para quiz-service - Answers (root)"""
-    return await proxy_service.proxy_request("quiz", "answers", request)
-
-
-@router.api_route("/quizzes-admin/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_quizzes_admin(path: str, request: Request):
-    """Roteia requisições para quiz-service - Quizzes Admin (CRUD de quizzes pré-definidos)"""
-    full_path = f"quizzes-admin/{path}" if path else "quizzes-admin"
-    return await proxy_service.proxy_request("quiz", full_path, request)
-
-
-@router.api_route("/quizzes-admin", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy_quizzes_admin_root(request: Request):
-    """Roteia requisições para quiz-service - Quizzes Admin (root)"""
-    return await proxy_service.proxy_request("quiz", "quizzes-admin", request)
 
+class GatewayDispatcher(BaseRoute):
+    """Rota catch-all que encaminha pela tabela de prefixos"""
+
+    def __init__(self, table: RouteTable, proxy: ProxyService):
+        self.table = table
+        self.proxy = proxy
+
+    def matches(self, scope: Scope):
+        if scope["type"] != "http":
+            return Match.NONE, {}
+        found = self.table.lookup(scope["path"])
+        if found is None:
+            return Match.NONE, {}
+        route, remainder = found
+        # "route" é o mesmo campo que o FastAPI preenche (usado como label nas métricas)
+        child_scope = {"route": route, "gateway_remainder": remainder, "path_params": {}}
+        if scope["method"] not in route.methods:
+            # PARTIAL: o Starlette ainda procura outra rota antes de cair no 405
+            return Match.PARTIAL, child_scope
+        return Match.FULL, child_scope
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = scope["route"]
+        if scope["method"] not in route.methods:
+            response = JSONResponse(
+                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+                content={"detail": "Method Not Allowed"},
+                headers={"Allow": ", ".join(sorted(route.methods))},
+            )
+            await response(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        response = await self.forward(route, scope["gateway_remainder"], request)
+        await response(scope, receive, send)
+
+    async def forward(self, route: ProxyRoute, remainder: str, request: Request) -> Response:
+        """Encaminha uma requisição já roteada (também usado pelo /api/batch)"""
+        target_url = self.table.target_url(route, remainder, request.url.query)
+        response = await self.proxy.forward(route.service, target_url, request, user_scoped=route.user_scoped)
+
+        # Logout bem-sucedido: derrubar tokens do usuário no cache do JWT middleware
+        if route.service == "auth" and remainder == "/logout" and response.status_code < 400:
+            auth_header = request.headers.get("Authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                token_cache.invalidate_on_logout(auth_header.split(" ")[1])
+
+        return response
+
+    def url_path_for(self, name: str, /, **path_params):
+        raise NoMatchFound(name, path_params)
+
+
+dispatcher = GatewayDispatcher(RouteTable(ROUTE_TABLE, ProxyService.SERVICE_URLS), proxy_service)
@@ -0,0 +1,26 @@
+"""
+Router de saúde - Liveness e readiness do gateway
+"""
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.services.drain import drain_controller
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health")
+async def health():
+    """Liveness: o processo está de pé (continua 200 durante a drenagem)"""
+    return {"status": "healthy"}
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness: 503 assim que a drenagem começa, para o balanceador tirar a réplica"""
+    if not drain_controller.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "draining", "in_flight": drain_controller.in_flight},
+        )
+    return {"status": "ready"}
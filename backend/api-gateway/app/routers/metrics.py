@@ -0,0 +1,125 @@
+"""
+Router de métricas - Endpoint /metrics no formato do Prometheus
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.routers.gateway import proxy_service
+from app.services import access_log, metrics, rate_limit
+from app.services.circuit_breaker import BreakerState
+from app.services.token_cache import token_cache
+
+router = APIRouter(tags=["metrics"])
+
+BREAKER_STATE_VALUES = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+def _upstream_in_flight():
+    return {(service,): count for service, count in proxy_service.in_flight.items()}
+
+
+def _breaker_state():
+    return {(service,): BREAKER_STATE_VALUES[breaker.state] for service, breaker in proxy_service.breakers.items()}
+
+
+def _breaker_rejections():
+    return {(service,): breaker.rejected for service, breaker in proxy_service.breakers.items()}
+
+
+def _response_cache():
+    cache = proxy_service.response_cache
+    if cache is None:
+        return {}
+    stats = cache.stats()
+    return {(result,): stats[result] for result in ("hits", "misses", "revalidations", "invalidations")}
+
+
+def _coalescing():
+    flight = proxy_service.singleflight
+    if flight is None:
+        return {}
+    stats = flight.stats()
+    return {(result,): stats[result] for result in ("leaders", "coalesced", "fallbacks")}
+
+
+def _compression():
+    compressor = proxy_service.compressor
+    if compressor is None:
+        return {}
+    stats = compressor.stats()
+    return {(result,): stats[result] for result in ("compressed", "skipped", "offloaded", "cache_hits")}
+
+
+def _hedging():
+    hedger = proxy_service.hedger
+    if hedger is None:
+        return {}
+    stats = hedger.stats()
+    return {(result,): stats[result] for result in ("hedges", "hedge_wins", "retries", "budget_exhausted")}
+
+
+def _token_cache():
+    stats = token_cache.stats()
+    return {(result,): stats[result] for result in ("hits", "misses", "evictions")}
+
+
+def _rate_limited():
+    limiter = rate_limit.rate_limiter
+    if limiter is None:
+        return {}
+    return {(group,): count for group, count in limiter.rejected.items()}
+
+
+def _dropped_logs():
+    pipeline = access_log.log_pipeline
+    return {(): pipeline.handler.dropped if pipeline is not None else 0}
+
+
+for metric in (
+    metrics.CallbackGauge(
+        "gateway_upstream_in_flight", "Chamadas em andamento por microsserviço", ("service",), _upstream_in_flight,
+    ),
+    metrics.CallbackGauge(
+        "gateway_circuit_breaker_state", "Estado do circuit breaker (0=fechado, 1=meio-aberto, 2=aberto)",
+        ("service",), _breaker_state,
+    ),
+    metrics.CallbackGauge(
+        "gateway_circuit_breaker_rejections_total", "Requisições recusadas com o circuito aberto",
+        ("service",), _breaker_rejections, type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_response_cache_events_total", "Eventos do cache de respostas", ("result",), _response_cache,
+        type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_coalescing_events_total", "Chamadas líderes e requisições coalescidas (singleflight)",
+        ("result",), _coalescing, type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_compression_events_total", "Respostas comprimidas, enviadas sem compressão, comprimidas em thread "
+        "e reaproveitadas do cache de compressão", ("result",), _compression, type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_upstream_retry_events_total", "Hedges enviados e vencedores, retries de conexão e tentativas "
+        "extras negadas pelo orçamento", ("result",), _hedging, type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_token_cache_events_total", "Eventos do cache de tokens JWT", ("result",), _token_cache,
+        type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_rate_limited_total", "Requisições recusadas pelo rate limiting (429)", ("group",),
+        _rate_limited, type="counter",
+    ),
+    metrics.CallbackGauge(
+        "gateway_access_log_dropped_total", "Registros de access log descartados com a fila cheia", (),
+        _dropped_logs, type="counter",
+    ),
+):
+    metrics.registry.register(metric)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métricas do gateway (text/plain; version=0.0.4)"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
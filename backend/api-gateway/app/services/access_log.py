@@ -0,0 +1,122 @@
+"""
+Access log estruturado do gateway
+
+Cada requisição gera um único registro JSON (uma linha), montado ao longo do
+caminho: o AccessLogMiddleware cria o registro em scope["state"], os
+middlewares de autenticação/autorização e o ProxyService anotam seus campos
+com `annotate`, e o middleware emite o registro ao final.
+
+A emissão não bloqueia o event loop: o handler apenas coloca o LogRecord em
+uma fila limitada; a serialização para JSON e a escrita no stdout acontecem
+na thread do QueueListener. Com a fila cheia o registro é descartado e
+contado em `dropped`, em vez de segurar a requisição.
+"""
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from starlette.types import Scope
+
+from app.config import settings
+
+# Chave do registro em scope["state"] (request.state.access_log)
+ACCESS_LOG_KEY = "access_log"
+
+access_logger = logging.getLogger("gateway.access")
+
+
+def annotate(scope: Scope, **fields: Any) -> None:
+    """Acrescenta campos ao registro da requisição (sem efeito se não houver registro)"""
+    record = scope.get("state", {}).get(ACCESS_LOG_KEY)
+    if record is not None:
+        record.update(fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro; registros de acesso (dict) são expandidos"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        if isinstance(record.msg, dict):
+            data = {"ts": ts, **record.msg}
+        else:
+            data = {
+                "ts": ts,
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": record.getMessage(),
+            }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler que não formata no event loop e descarta quando a fila enche"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A formatação fica para o listener; aqui só o necessário para cruzar a thread
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Fila + listener compartilhados pelo access log e pelos logs do gateway"""
+
+    def __init__(self, queue_size: int = 10000, stream=None):
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter())
+        self.listener = QueueListener(self.handler.queue, output, respect_handler_level=False)
+        self._loggers = (access_logger, logging.getLogger("app"))
+
+    def start(self) -> None:
+        for logger in self._loggers:
+            logger.addHandler(self.handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Esvazia a fila e desliga o listener (chamado no shutdown)"""
+        self.listener.stop()
+        for logger in self._loggers:
+            logger.removeHandler(self.handler)
+            logger.propagate = True
+
+
+log_pipeline: Optional[LogPipeline] = None
+
+
+def start_logging() -> LogPipeline:
+    """Liga o pipeline de logs (idempotente)"""
+    global log_pipeline
+    if log_pipeline is None:
+        log_pipeline = LogPipeline(queue_size=settings.ACCESS_LOG_QUEUE_SIZE)
+        log_pipeline.start()
+    return log_pipeline
+
+
+def stop_logging() -> None:
+    global log_pipeline
+    if log_pipeline is not None:
+        log_pipeline.stop()
+        log_pipeline = None
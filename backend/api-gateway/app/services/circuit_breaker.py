@@ -0,0 +1,164 @@
+"""
+Circuit breaker por microsserviço
+
+Fechado: as chamadas passam e o resultado das últimas N entra em uma janela
+deslizante. Se a taxa de erros (falhas de conexão, timeouts, 5xx) ou de
+chamadas lentas passar do limite, o circuito abre e o gateway responde 503
+imediatamente, sem ocupar conexões nem esperar o timeout do httpx.
+Depois de `open_seconds`, o circuito fica meio-aberto e deixa passar algumas
+chamadas de teste: se todas derem certo ele fecha, se uma falhar ele reabre.
+"""
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker com janela deslizante por contagem de chamadas"""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 15.0,
+        half_open_max_calls: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self.state = BreakerState.CLOSED
+        # (falhou?, lenta?) das últimas chamadas
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Reserva uma chamada; False significa responder 503 sem chamar o serviço"""
+        if self.state == BreakerState.OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self._transition(BreakerState.HALF_OPEN)
+
+        if self.state == BreakerState.HALF_OPEN:
+            if self._half_open_in_flight + self._half_open_successes >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_in_flight += 1
+        return True
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Registra o resultado de uma chamada liberada por allow()"""
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == BreakerState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if failed or slow:
+                self._transition(BreakerState.OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(BreakerState.CLOSED)
+            return
+
+        if self.state == BreakerState.OPEN:
+            # Chamada iniciada antes de o circuito abrir
+            return
+
+        if len(self._window) == self._window.maxlen:
+            old_failed, old_slow = self._window[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        self._window.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        if (
+            self._failures / calls >= self.failure_rate_threshold
+            or self._slow / calls >= self.slow_call_rate_threshold
+        ):
+            self._transition(BreakerState.OPEN)
+
+    def release(self) -> None:
+        """Devolve uma reserva de allow() cuja chamada foi cancelada sem resultado"""
+        if self.state == BreakerState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def retry_after(self) -> int:
+        """Segundos até o circuito aceitar chamadas de teste"""
+        if self.state != BreakerState.OPEN:
+            return 0
+        return max(1, int(self.open_seconds - (self._clock() - self._opened_at) + 0.999))
+
+    def _transition(self, state: BreakerState) -> None:
+        if state == self.state:
+            return
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, self.state.value, state.value)
+        self.state = state
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if state == BreakerState.OPEN:
+            self._opened_at = self._clock()
+            self.times_opened += 1
+        if state == BreakerState.CLOSED:
+            self._window.clear()
+            self._failures = 0
+            self._slow = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual para o endpoint administrativo"""
+        calls = len(self._window)
+        return {
+            "state": self.state.value,
+            "calls_in_window": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+            "retry_after_seconds": self.retry_after(),
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+def breaker_for(service: str) -> CircuitBreaker:
+    """Cria o circuit breaker de um microsserviço com os CIRCUIT_BREAKER_* do app/config.py"""
+    return CircuitBreaker(
+        name=service,
+        window_size=settings.CIRCUIT_BREAKER_WINDOW_SIZE,
+        min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+        failure_rate_threshold=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+        slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold=settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+    )
@@ -0,0 +1,288 @@
+"""
+Compressão das respostas do gateway (negociação por Accept-Encoding)
+
+O gateway comprime na borda o que devolve ao cliente: o tráfego com os
+microsserviços fica sem compressão (rede interna) e o gateway escolhe a
+codificação pelo Accept-Encoding do cliente - br (pacote opcional `brotli`)
+ou gzip.
+
+Não são comprimidas respostas pequenas (abaixo de COMPRESSION_MIN_BYTES), já
+codificadas pelo microsserviço, com Cache-Control: no-transform ou de tipos que
+não ganham nada (imagens, zip...). Corpos a partir de COMPRESSION_OFFLOAD_BYTES
+são comprimidos em thread para não travar o event loop; os menores saem mais
+baratos inline.
+
+Respostas em streaming (acima de PROXY_STREAM_THRESHOLD_BYTES ou sem tamanho)
+são comprimidas chunk a chunk com um compressor incremental: cada chunk do
+microsserviço sai comprimido e com flush, então o gateway continua sem
+bufferizar o payload e o cliente recebe os dados conforme chegam.
+
+Respostas vindas do ResponseCache têm ETag derivado do corpo, então a versão
+comprimida é guardada em um LRU por (ETag, codificação): GETs repetidos do
+catálogo não comprimem o mesmo corpo de novo.
+"""
+import asyncio
+import gzip
+import zlib
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import settings
+
+try:
+    import brotli  # dependência opcional
+except ImportError:
+    brotli = None
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+)
+
+# Headers que não fazem sentido na versão comprimida
+_DROPPED_HEADERS = frozenset([b"content-length", b"content-encoding", b"etag", b"vary"])
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {codificação: q}"""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class _StreamEncoder:
+    """Compressor incremental (gzip ou br) com flush ao fim de cada chunk"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: formato gzip (header com mtime 0)
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def process(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class EdgeCompressor:
+    """Comprime respostas (bufferizadas ou em streaming) conforme o Accept-Encoding do cliente"""
+
+    def __init__(
+        self,
+        min_bytes: int = 1024,
+        offload_bytes: int = 32768,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_entries: int = 256,
+    ):
+        self.min_bytes = min_bytes
+        self.offload_bytes = offload_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        # Ordem de preferência em caso de empate no q
+        self.encodings: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+        # (etag, codificação) -> corpo comprimido
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.compressed = 0
+        self.streamed = 0
+        self.skipped = 0
+        self.offloaded = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Codificação suportada de maior q aceita pelo cliente (None = identity)"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def encode(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime fixo: o mesmo corpo sempre gera os mesmos bytes
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def compress(self, response: Response, accept_encoding: Optional[str]) -> Response:
+        """Versão comprimida da resposta, ou a própria resposta quando não compensa"""
+        if isinstance(response, StreamingResponse):
+            return self.compress_stream(response, accept_encoding)
+        body = response.body
+        headers = response.headers
+        if (
+            len(body) < self.min_bytes
+            or "content-encoding" in headers
+            or response.status_code in (204, 206, 304)
+            or not _compressible(headers.get("content-type"))
+            or "no-transform" in headers.get("cache-control", "").lower()
+        ):
+            return response
+
+        # A partir daqui o corpo varia conforme o Accept-Encoding
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            headers["vary"] = "Accept-Encoding"
+            self.skipped += 1
+            return response
+
+        etag = headers.get("etag")
+        cache_key = (etag, encoding) if etag and "x-cache" in headers else None
+        encoded = self._cache_get(cache_key)
+        if encoded is None:
+            if len(body) >= self.offload_bytes:
+                self.offloaded += 1
+                encoded = await asyncio.to_thread(self.encode, body, encoding)
+            else:
+                encoded = self.encode(body, encoding)
+            self._cache_put(cache_key, encoded)
+
+        if len(encoded) >= len(body):
+            # Conteúdo incompressível: mandar o original
+            headers["vary"] = "Accept-Encoding"
+            self.skipped += 1
+            return response
+
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(encoded)
+        compressed = Response(content=encoded, status_code=response.status_code)
+        compressed.raw_headers = [(key, value) for key, value in response.raw_headers if key not in _DROPPED_HEADERS]
+        compressed.headers["content-length"] = str(len(encoded))
+        compressed.headers["content-encoding"] = encoding
+        compressed.headers["vary"] = "Accept-Encoding"
+        if etag:
+            # Cada representação tem seu próprio ETag (o If-None-Match do cliente volta com ele)
+            compressed.headers["etag"] = etag[:-1] + f'-{encoding}"' if etag.endswith('"') else etag
+        return compressed
+
+    def compress_stream(self, response: StreamingResponse, accept_encoding: Optional[str]) -> StreamingResponse:
+        """Troca o corpo da resposta em streaming por um iterador que comprime chunk a chunk"""
+        headers = response.headers
+        if (
+            "content-encoding" in headers
+            or response.status_code in (204, 206, 304)
+            or not _compressible(headers.get("content-type"))
+            or "no-transform" in headers.get("cache-control", "").lower()
+        ):
+            return response
+        # COMPRESSION_MIN_BYTES não se aplica: só vai em streaming o que passa do limiar do proxy
+        encoding = self.negotiate(accept_encoding)
+        headers["vary"] = "Accept-Encoding"
+        if encoding is None:
+            self.skipped += 1
+            return response
+
+        response.body_iterator = self._encode_stream(response.body_iterator, encoding)
+        # O tamanho final só é conhecido no fim; o ETag era da representação sem compressão
+        for name in ("content-length", "etag"):
+            if name in headers:
+                del headers[name]
+        headers["content-encoding"] = encoding
+        self.compressed += 1
+        self.streamed += 1
+        return response
+
+    async def _encode_stream(self, chunks: AsyncIterator, encoding: str) -> AsyncIterator[bytes]:
+        encoder = _StreamEncoder(encoding, self.gzip_level, self.brotli_quality)
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            if len(chunk) >= self.offload_bytes:
+                self.offloaded += 1
+                encoded = await asyncio.to_thread(encoder.process, chunk)
+            else:
+                encoded = encoder.process(chunk)
+            self.bytes_in += len(chunk)
+            self.bytes_out += len(encoded)
+            if encoded:
+                yield encoded
+        tail = encoder.finish()
+        self.bytes_out += len(tail)
+        if tail:
+            yield tail
+
+    def _cache_get(self, key: Optional[Tuple[str, str]]) -> Optional[bytes]:
+        if key is None:
+            return None
+        encoded = self._cache.get(key)
+        if encoded is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+        return encoded
+
+    def _cache_put(self, key: Optional[Tuple[str, str]], encoded: bytes) -> None:
+        if key is None or self.cache_entries <= 0:
+            return
+        self._cache[key] = encoded
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            "encodings": list(self.encodings),
+            "compressed": self.compressed,
+            "streamed": self.streamed,
+            "skipped": self.skipped,
+            "offloaded": self.offloaded,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+def build_compressor() -> Optional[EdgeCompressor]:
+    """Compressor configurado em app/config.py (None se COMPRESSION_ENABLED=false)"""
+    if not settings.COMPRESSION_ENABLED:
+        return None
+    return EdgeCompressor(
+        min_bytes=settings.COMPRESSION_MIN_BYTES,
+        offload_bytes=settings.COMPRESSION_OFFLOAD_BYTES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_entries=settings.COMPRESSION_CACHE_ENTRIES,
+    )
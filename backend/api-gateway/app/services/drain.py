@@ -0,0 +1,126 @@
+"""
+Drenagem do gateway para deploys sem derrubar requisições
+
+Sequência de drain():
+1. Readiness vira "não pronto" (GET /ready -> 503): o balanceador para de
+   mandar tráfego novo, mas o gateway ainda atende o que chegar durante
+   DRAIN_READINESS_GRACE_SECONDS.
+2. Requisições novas recebem 503 (Connection: close); as em andamento têm
+   até DRAIN_TIMEOUT_SECONDS para terminar.
+3. As que ainda estiverem em andamento no prazo são canceladas (abortadas).
+4. Os pools de conexão com os microsserviços são fechados.
+
+Com uvicorn/gunicorn o drain roda no shutdown do lifespan, depois que o
+servidor parou de aceitar conexões; para começar antes (ex: preStop do
+Kubernetes), use POST /api/gateway/drain.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DrainController:
+    """Acompanha as requisições em andamento e conduz a drenagem"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.ready = True
+        # True a partir da fase 2: requisições novas são recusadas
+        self.refusing = False
+        self._active: Set[asyncio.Task] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._drain: Optional[asyncio.Task] = None
+        self.report: Optional[Dict] = None
+        self.drained = 0
+        self.refused = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._active)
+
+    def enter(self) -> Optional[asyncio.Task]:
+        """Registra a requisição atual (a task é o que se cancela no prazo)"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._active.add(task)
+            self._idle.clear()
+        return task
+
+    def leave(self, task: Optional[asyncio.Task]) -> None:
+        if task is None or task not in self._active:
+            return
+        self._active.discard(task)
+        if not self.ready:
+            self.drained += 1
+        if not self._active:
+            self._idle.set()
+
+    def drain(
+        self,
+        grace_seconds: float,
+        timeout_seconds: float,
+        close: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> "asyncio.Future[Dict]":
+        """Inicia a drenagem (idempotente: chamadas seguintes aguardam a mesma)"""
+        # Quem pediu a drenagem (ex: POST /api/gateway/drain) não espera por si mesmo
+        self.leave(asyncio.current_task())
+        if self._drain is None:
+            self._drain = asyncio.ensure_future(self._run(grace_seconds, timeout_seconds, close))
+        return asyncio.shield(self._drain)
+
+    async def _run(
+        self,
+        grace_seconds: float,
+        timeout_seconds: float,
+        close: Optional[Callable[[], Awaitable[None]]],
+    ) -> Dict:
+        started = self._clock()
+        self.ready = False
+        pending = self.in_flight
+        logger.warning("Drenagem iniciada: readiness desligada, %d requisições em andamento", pending)
+        if grace_seconds > 0:
+            await asyncio.sleep(grace_seconds)
+
+        self.refusing = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+        drained = self.drained
+        leftovers = [task for task in self._active if not task.done()]
+        for task in leftovers:
+            task.cancel()
+        if leftovers:
+            await asyncio.wait(leftovers, timeout=1.0)
+
+        if close is not None:
+            await close()
+
+        self.report = {
+            "in_flight_at_start": pending,
+            "drained": drained,
+            "aborted": len(leftovers),
+            "refused": self.refused,
+            "duration_seconds": round(self._clock() - started, 3),
+        }
+        logger.warning(
+            "Drenagem concluída: %d concluídas, %d abortadas, %d recusadas",
+            self.report["drained"], self.report["aborted"], self.report["refused"],
+        )
+        return self.report
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "refusing": self.refusing,
+            "in_flight": self.in_flight,
+            "report": self.report,
+        }
+
+
+drain_controller = DrainController()
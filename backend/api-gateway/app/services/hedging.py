@@ -0,0 +1,282 @@
+"""
+Hedging e retries das chamadas aos microsserviços
+
+- Hedging: GETs de rotas com cauda de latência longa (ranking, perguntas) que
+  ainda não responderam depois do percentil PROXY_HEDGE_PERCENTILE da latência
+  recente ganham uma segunda tentativa; vale a primeira resposta que chegar e a
+  outra é cancelada (a conexão volta ao pool).
+- Retries: falhas de conexão (a requisição nem saiu do gateway) são repetidas
+  até PROXY_RETRY_ATTEMPTS vezes, com backoff exponencial e jitter completo.
+  Só com corpo bufferizado: corpo em streaming não pode ser reenviado.
+
+Hedges e retries saem do mesmo orçamento por serviço (RetryBudget): cada
+chamada deposita PROXY_RETRY_BUDGET_RATIO de ficha e cada tentativa extra
+gasta uma. Com o serviço fora do ar o orçamento seca e as chamadas voltam a
+uma tentativa só, sem tempestade de retries.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rotas (path no gateway) em que GETs podem ser duplicados
+HEDGE_PATH_PREFIXES = ("/api/api/leaderboard", "/api/leaderboard", "/api/questions")
+
+HEDGE_METHODS = frozenset(["GET", "HEAD"])
+
+# Falhas em que a requisição não chegou ao microsserviço (seguro repetir qualquer método)
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+Attempt = Callable[[], Awaitable[httpx.Response]]
+
+
+def hedge_key(method: str, path: str) -> Optional[str]:
+    """Prefixo de hedging da rota (None se a requisição não pode ser duplicada)"""
+    if method not in HEDGE_METHODS:
+        return None
+    for prefix in HEDGE_PATH_PREFIXES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return prefix
+    return None
+
+
+class LatencyWindow:
+    """Latências recentes (tempo até os headers) com percentil recalculado a cada N amostras"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20, recompute_every: int = 10):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+        self.recompute_every = recompute_every
+        self._since_sorted = 0
+        self._sorted = []
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_sorted += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """None enquanto não houver amostras suficientes"""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._since_sorted >= self.recompute_every or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_sorted = 0
+        index = min(len(self._sorted) - 1, int(pct / 100 * len(self._sorted)))
+        return self._sorted[index]
+
+
+class RetryBudget:
+    """Fichas para tentativas extras: cada chamada deposita `ratio`, cada extra gasta 1"""
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class UpstreamHedger:
+    """Executa a chamada ao microsserviço com retries de conexão e hedging"""
+
+    def __init__(
+        self,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay_seconds: float = 0.05,
+        hedge_min_samples: int = 20,
+        retry_attempts: int = 2,
+        retry_backoff_seconds: float = 0.05,
+        retry_backoff_max_seconds: float = 1.0,
+        budget_ratio: float = 0.1,
+        budget_max_tokens: float = 10.0,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_attempts = retry_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.retry_backoff_max_seconds = retry_backoff_max_seconds
+        self.budget_ratio = budget_ratio
+        self.budget_max_tokens = budget_max_tokens
+        self._rng = rng
+        self._clock = clock
+        self.windows: Dict[str, LatencyWindow] = {}
+        self.budgets: Dict[str, RetryBudget] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.budget_exhausted = 0
+
+    def _budget(self, service: str) -> RetryBudget:
+        budget = self.budgets.get(service)
+        if budget is None:
+            budget = self.budgets[service] = RetryBudget(self.budget_ratio, self.budget_max_tokens)
+        return budget
+
+    def _window(self, key: str) -> LatencyWindow:
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = LatencyWindow(min_samples=self.hedge_min_samples)
+        return window
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Espera antes da segunda tentativa (None = sem dados ainda, não duplicar)"""
+        observed = self._window(key).percentile(self.hedge_percentile)
+        if observed is None:
+            return None
+        return max(self.hedge_min_delay_seconds, observed)
+
+    async def call(
+        self,
+        service: str,
+        attempt: Attempt,
+        replayable: bool,
+        key: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Faz a chamada; `attempt` monta e envia uma requisição nova a cada tentativa.
+        `key` é o prefixo de hedging da rota (ver hedge_key)
+        """
+        budget = self._budget(service)
+        budget.deposit()
+
+        async def run() -> httpx.Response:
+            return await self._with_retries(budget, attempt, replayable)
+
+        if not self.hedge_enabled or key is None or not replayable:
+            return await run()
+
+        window = self._window(key)
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await self._timed(window, run)
+        return await self._hedged(budget, window, run, delay)
+
+    async def _with_retries(self, budget: RetryBudget, attempt: Attempt, replayable: bool) -> httpx.Response:
+        retries = 0
+        while True:
+            try:
+                return await attempt()
+            except RETRYABLE_ERRORS:
+                if not replayable or retries >= self.retry_attempts:
+                    raise
+                if not budget.withdraw():
+                    self.budget_exhausted += 1
+                    raise
+            retries += 1
+            self.retries += 1
+            # Jitter completo: espalha as tentativas de várias requisições no tempo
+            ceiling = min(self.retry_backoff_max_seconds, self.retry_backoff_seconds * 2 ** (retries - 1))
+            await asyncio.sleep(self._rng() * ceiling)
+
+    def stats(self) -> Dict:
+        delays = {key: self.hedge_delay(key) for key in self.windows}
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "retries": self.retries,
+            "budget_exhausted": self.budget_exhausted,
+            "hedge_delay_ms": {
+                key: round(delay * 1000, 3) if delay is not None else None for key, delay in delays.items()
+            },
+            "budget_tokens": {service: round(budget.tokens, 2) for service, budget in self.budgets.items()},
+        }
+
+    async def _timed(self, window: LatencyWindow, run: Attempt) -> httpx.Response:
+        started = self._clock()
+        try:
+            response = await run()
+        except asyncio.CancelledError:
+            # Tentativa perdedora: a latência real é pelo menos esta (não subestimar o percentil)
+            window.observe(self._clock() - started)
+            raise
+        window.observe(self._clock() - started)
+        return response
+
+    async def _hedged(
+        self,
+        budget: RetryBudget,
+        window: LatencyWindow,
+        run: Attempt,
+        delay: float,
+    ) -> httpx.Response:
+        primary = asyncio.ensure_future(self._timed(window, run))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+        if not budget.withdraw():
+            self.budget_exhausted += 1
+            return await primary
+
+        self.hedges += 1
+        hedge = asyncio.ensure_future(self._timed(window, run))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+                    else:
+                        # As duas responderam no mesmo ciclo: devolver a conexão da sobra
+                        await task.result().aclose()
+                if winner is not None:
+                    if winner is hedge:
+                        self.hedge_wins += 1
+                    return winner.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_orphan)
+
+
+def _close_orphan(task: "asyncio.Future[httpx.Response]") -> None:
+    """Fecha a resposta de uma tentativa perdedora que terminou antes do cancelamento"""
+    if task.cancelled() or task.exception() is not None:
+        return
+    asyncio.ensure_future(task.result().aclose())
+
+
+def build_hedger() -> Optional[UpstreamHedger]:
+    """UpstreamHedger com os PROXY_HEDGE_*/PROXY_RETRY_* do app/config.py (None se ambos desligados)"""
+    if not settings.PROXY_HEDGE_ENABLED and settings.PROXY_RETRY_ATTEMPTS <= 0:
+        return None
+    return UpstreamHedger(
+        hedge_enabled=settings.PROXY_HEDGE_ENABLED,
+        hedge_percentile=settings.PROXY_HEDGE_PERCENTILE,
+        hedge_min_delay_seconds=settings.PROXY_HEDGE_MIN_DELAY_SECONDS,
+        hedge_min_samples=settings.PROXY_HEDGE_MIN_SAMPLES,
+        retry_attempts=settings.PROXY_RETRY_ATTEMPTS,
+        retry_backoff_seconds=settings.PROXY_RETRY_BACKOFF_SECONDS,
+        retry_backoff_max_seconds=settings.PROXY_RETRY_BACKOFF_MAX_SECONDS,
+        budget_ratio=settings.PROXY_RETRY_BUDGET_RATIO,
+        budget_max_tokens=settings.PROXY_RETRY_BUDGET_MAX_TOKENS,
+    )
@@ -0,0 +1,242 @@
+"""
+Verificação de JWT assinados com chave assimétrica (ES256/EdDSA) via JWKS
+
+Com JWT_ALGORITHM=ES256 (ou EdDSA) o gateway não precisa do segredo de
+assinatura: as chaves públicas vêm do JWKS publicado pelo auth-service
+(JWT_JWKS_URL) e ficam em memória, indexadas pelo `kid`.
+
+- O conjunto é recarregado em background a cada JWT_JWKS_REFRESH_SECONDS.
+- Um `kid` desconhecido (chave nova após rotação) força uma recarga, no
+  máximo uma a cada JWT_JWKS_MIN_REFRESH_SECONDS, para que tokens forjados
+  com kids aleatórios não virem uma enxurrada de chamadas ao auth-service.
+- Falhas na recarga mantêm as chaves anteriores.
+
+A verificação usa o `cryptography` direto, com as chaves já desserializadas:
+por token resta decodificar base64/JSON e uma verificação de assinatura, sem a
+camada de abstração do python-jose. Os erros são os do jose (JWTError,
+ExpiredSignatureError), então o JwtAuthMiddleware trata os dois caminhos igual.
+"""
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Union
+
+import httpx
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = frozenset(["ES256", "EdDSA"])
+
+PublicKey = Union[ec.EllipticCurvePublicKey, ed25519.Ed25519PublicKey]
+
+_ECDSA_SHA256 = ec.ECDSA(hashes.SHA256())
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def parse_jwk(jwk: Dict[str, str]) -> Optional[PublicKey]:
+    """Chave pública de um JWK EC P-256 ou OKP Ed25519 (None para tipos não suportados)"""
+    kty, crv = jwk.get("kty"), jwk.get("crv")
+    if kty == "EC" and crv == "P-256":
+        x = int.from_bytes(_b64decode(jwk["x"]), "big")
+        y = int.from_bytes(_b64decode(jwk["y"]), "big")
+        return ec.EllipticCurvePublicNumbers(x, y, ec.SECP256R1()).public_key()
+    if kty == "OKP" and crv == "Ed25519":
+        return ed25519.Ed25519PublicKey.from_public_bytes(_b64decode(jwk["x"]))
+    return None
+
+
+class JwksKeySet:
+    """Chaves públicas do JWKS por kid, com recarga periódica e sob demanda"""
+
+    def __init__(
+        self,
+        url: str,
+        refresh_seconds: float = 300,
+        min_refresh_seconds: float = 30,
+        timeout: float = 5.0,
+        clock=time.monotonic,
+    ):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self.timeout = timeout
+        self._clock = clock
+        self.keys: Dict[str, PublicKey] = {}
+        self.last_refresh: Optional[float] = None
+        self._last_attempt = float("-inf")
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.unknown_kids = 0
+
+    def load(self, document: Dict[str, Any]) -> None:
+        """Troca o conjunto de chaves de uma vez (leitores nunca veem um conjunto parcial)"""
+        keys: Dict[str, PublicKey] = {}
+        for jwk in document.get("keys", []):
+            if jwk.get("use", "sig") != "sig" or "kid" not in jwk:
+                continue
+            try:
+                key = parse_jwk(jwk)
+            except (KeyError, ValueError):
+                logger.warning("JWK inválido ignorado: kid=%s", jwk.get("kid"))
+                continue
+            if key is not None:
+                keys[jwk["kid"]] = key
+        self.keys = keys
+        self.last_refresh = self._clock()
+
+    async def refresh(self) -> bool:
+        """Busca o JWKS; em caso de falha mantém as chaves atuais"""
+        self._last_attempt = self._clock()
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            self.load(response.json())
+        except (httpx.HTTPError, ValueError):
+            self.failures += 1
+            logger.warning("Falha ao atualizar o JWKS de %s; mantendo %d chaves", self.url, len(self.keys), exc_info=True)
+            return False
+        self.refreshes += 1
+        return True
+
+    async def key_for(self, kid: str) -> Optional[PublicKey]:
+        key = self.keys.get(kid)
+        if key is not None:
+            return key
+        self.unknown_kids += 1
+        if self._clock() - self._last_attempt < self.min_refresh_seconds:
+            return None
+        # Requisições concorrentes com o mesmo kid novo esperam uma única recarga
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self.refresh())
+        await asyncio.shield(self._refreshing)
+        return self.keys.get(kid)
+
+    async def start(self) -> None:
+        """Primeira carga e recarga em background (chamado no lifespan do gateway)"""
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "kids": sorted(self.keys),
+            "seconds_since_refresh": None if self.last_refresh is None else round(self._clock() - self.last_refresh, 1),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "unknown_kids": self.unknown_kids,
+        }
+
+
+def verify_signature(key: PublicKey, algorithm: str, signing_input: bytes, signature: bytes) -> bool:
+    """Verifica a assinatura; o algoritmo do header precisa bater com o tipo da chave"""
+    try:
+        if algorithm == "ES256" and isinstance(key, ec.EllipticCurvePublicKey):
+            if len(signature) != 64:
+                return False
+            # JWS usa r||s crus; o cryptography espera DER
+            r = int.from_bytes(signature[:32], "big")
+            s = int.from_bytes(signature[32:], "big")
+            key.verify(encode_dss_signature(r, s), signing_input, _ECDSA_SHA256)
+            return True
+        if algorithm == "EdDSA" and isinstance(key, ed25519.Ed25519PublicKey):
+            key.verify(signature, signing_input)
+            return True
+    except InvalidSignature:
+        return False
+    return False
+
+
+async def verify_token(token: str, key_set: JwksKeySet, leeway: float = 0) -> Dict[str, Any]:
+    """
+    Valida assinatura, exp e nbf de um JWT assimétrico.
+
+    Returns:
+        Payload do token
+
+    Raises:
+        JWTError/ExpiredSignatureError (os mesmos do jose.jwt.decode)
+    """
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64decode(header_segment))
+        signature = _b64decode(signature_segment)
+    except ValueError:
+        raise JWTError("Token malformado")
+
+    algorithm = header.get("alg")
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise JWTError("Algoritmo não permitido")
+    kid = header.get("kid")
+    key = await key_set.key_for(kid) if isinstance(kid, str) else None
+    if key is None:
+        raise JWTError("Chave de assinatura desconhecida")
+
+    signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+    if not verify_signature(key, algorithm, signing_input, signature):
+        raise JWTError("Assinatura inválida")
+
+    try:
+        payload = json.loads(_b64decode(payload_segment))
+    except ValueError:
+        raise JWTError("Payload malformado")
+    if not isinstance(payload, dict):
+        raise JWTError("Payload malformado")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTClaimsError("exp inválido")
+        if exp < now - leeway:
+            raise ExpiredSignatureError("Signature has expired.")
+    nbf = payload.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise JWTClaimsError("nbf inválido")
+        if nbf > now + leeway:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+    return payload
+
+
+key_set: Optional[JwksKeySet] = None
+if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+    key_set = JwksKeySet(
+        settings.JWT_JWKS_URL,
+        refresh_seconds=settings.JWT_JWKS_REFRESH_SECONDS,
+        min_refresh_seconds=settings.JWT_JWKS_MIN_REFRESH_SECONDS,
+    )
@@ -0,0 +1,178 @@
+"""
+Métricas do gateway no formato de texto do Prometheus
+
+Contadores, gauges e histogramas simples, sem dependências externas. Todas as
+atualizações acontecem no event loop (uma única thread), então não há locks:
+cada observação é um lookup de dict e uma soma. Séries de outros componentes
+(pools, cache, breakers) são lidas apenas no momento do scrape via callback.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Buckets (segundos) pensados para latências de gateway: de 0,5 ms a 30 s (timeout do httpx)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotônico com labels posicionais"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Valor que sobe e desce (ex: requisições em andamento)"""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class CallbackGauge:
+    """Gauge/contador lido de outro componente no momento do scrape"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Labels, float]],
+        type: str = "gauge",
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.type = type
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma com buckets fixos; guarda contagens não cumulativas e acumula no scrape"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [contagem por bucket..., +Inf, soma]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expostas em /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def status_class(status_code: int) -> str:
+    """200 -> "2xx"; usado como label para manter a cardinalidade baixa"""
+    return f"{status_code // 100}xx"
+
+
+registry = MetricsRegistry()
+
+# Requisições recebidas pelo gateway (rota = template da rota FastAPI)
+requests_total = registry.register(Counter(
+    "gateway_requests_total", "Requisições recebidas pelo gateway", ("route", "method", "status_class"),
+))
+request_duration = registry.register(Histogram(
+    "gateway_request_duration_seconds", "Duração total da requisição no gateway", ("route",),
+))
+requests_in_flight = registry.register(Gauge(
+    "gateway_requests_in_flight", "Requisições em andamento no gateway",
+))
+request_bytes = registry.register(Counter(
+    "gateway_request_bytes_total", "Bytes recebidos dos clientes", ("route",),
+))
+response_bytes = registry.register(Counter(
+    "gateway_response_bytes_total", "Bytes enviados aos clientes", ("route",),
+))
+
+# Fases: autenticação, autorização e chamada ao microsserviço
+authn_duration = registry.register(Histogram(
+    "gateway_authn_duration_seconds", "Tempo de autenticação JWT (rotas protegidas)", ("outcome",),
+))
+authz_duration = registry.register(Histogram(
+    "gateway_authz_duration_seconds", "Tempo de autorização Casbin (rotas protegidas)", ("outcome",),
+))
+upstream_requests_total = registry.register(Counter(
+    "gateway_upstream_requests_total", "Chamadas aos microsserviços", ("service", "status_class"),
+))
+upstream_duration = registry.register(Histogram(
+    "gateway_upstream_duration_seconds", "Tempo até os headers da resposta do microsserviço", ("service",),
+))
@@ -0,0 +1,194 @@
+"""
+Políticas Casbin carregadas na inicialização e recarregadas a quente
+
+O Enforcer e a PolicyDecisionTable são montados no startup do lifespan (em
+thread, antes de o gateway aceitar tráfego), e não na primeira requisição.
+Depois disso o policy.csv é observado por polling (mtime/tamanho): quando o
+arquivo muda e fica estável por um intervalo, a nova tabela é compilada em
+thread e publicada com uma única atribuição (`self.current = ...`). Requisições
+em andamento terminam com a tabela que já tinham em mãos; as seguintes usam a
+nova. Um arquivo inválido ou sem políticas é rejeitado e a tabela anterior
+continua valendo.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import casbin
+
+from app.config import settings
+from app.services.policy_table import PolicyDecisionTable
+
+logger = logging.getLogger(__name__)
+
+# Pasta onde está o main.py (os caminhos do app/config.py são relativos a ela)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class LoadedPolicies(NamedTuple):
+    enforcer: casbin.Enforcer
+    decisions: PolicyDecisionTable
+    version: int
+    digest: str
+    loaded_at: float
+
+
+class PolicyStore:
+    """Dono do Enforcer/tabela em uso; troca os dois juntos a cada recarga"""
+
+    def __init__(
+        self,
+        model_path: str,
+        policy_path: str,
+        memo_size: int = 4096,
+        poll_seconds: float = 2.0,
+    ):
+        self.model_path = model_path
+        self.policy_path = policy_path
+        self.memo_size = memo_size
+        self.poll_seconds = poll_seconds
+        self.current: Optional[LoadedPolicies] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._reloading: Optional[asyncio.Lock] = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def decisions(self) -> PolicyDecisionTable:
+        """Tabela em uso (carrega na hora só se o lifespan não rodou, ex: testes)"""
+        current = self.current
+        if current is None:
+            current = self.load()
+        return current.decisions
+
+    @property
+    def enforcer(self) -> casbin.Enforcer:
+        current = self.current
+        if current is None:
+            current = self.load()
+        return current.enforcer
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.policy_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self, version: int) -> LoadedPolicies:
+        """Lê e compila as políticas (roda em thread nas recargas)"""
+        with open(self.policy_path, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        enforcer = casbin.Enforcer(self.model_path, self.policy_path)
+        if not enforcer.get_policy():
+            # Ex: arquivo truncado no meio de um deploy; melhor manter a tabela anterior
+            raise ValueError(f"nenhuma política em {self.policy_path}")
+        decisions = PolicyDecisionTable.from_enforcer(enforcer, memo_size=self.memo_size)
+        return LoadedPolicies(enforcer, decisions, version, digest, time.time())
+
+    def load(self) -> LoadedPolicies:
+        """Carga síncrona inicial; falha alto (sem política não há como autorizar)"""
+        logger.info("Inicializando enforcer Casbin: model=%s, policy=%s", self.model_path, self.policy_path)
+        self._signature = self._stat()
+        try:
+            self.current = self._build(1)
+        except Exception:
+            logger.exception("Erro ao inicializar enforcer Casbin")
+            raise
+        logger.info("Enforcer Casbin inicializado. Políticas carregadas: %d", self.current.decisions.policy_count)
+        return self.current
+
+    async def reload(self) -> bool:
+        """Recompila em thread e troca a tabela; False (mantendo a atual) se o arquivo for inválido"""
+        if self._reloading is None:
+            self._reloading = asyncio.Lock()
+        async with self._reloading:
+            previous = self.current
+            signature = self._stat()
+            try:
+                loaded = await asyncio.to_thread(self._build, previous.version + 1 if previous else 1)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._signature = signature
+                logger.error("Políticas Casbin não recarregadas (mantendo a versão atual): %s", self.last_error)
+                return False
+            self._signature = signature
+            if previous is not None and loaded.digest == previous.digest:
+                # Só o mtime mudou (ex: touch); a tabela atual (e o memo) continuam valendo
+                return True
+            # Troca atômica: quem já leu self.current segue com a tabela antiga
+            self.current = loaded
+            self.reloads += 1
+            self.last_error = None
+            logger.warning(
+                "Políticas Casbin recarregadas: versão %d, %d políticas",
+                loaded.version, loaded.decisions.policy_count,
+            )
+            return True
+
+    async def start(self, watch: bool = True) -> None:
+        """Carrega (em thread) antes de aceitar tráfego e inicia a observação do arquivo"""
+        if self.current is None:
+            self._signature = self._stat()
+            self.current = await asyncio.to_thread(self._build, 1)
+            logger.info("Enforcer Casbin inicializado. Políticas carregadas: %d", self.current.decisions.policy_count)
+        if watch and self._watcher is None and self.poll_seconds > 0:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    async def _watch(self) -> None:
+        pending: Optional[Tuple[int, int]] = None
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                pending = None
+                continue
+            if signature != pending:
+                # Mudou agora: esperar um intervalo estável (editor/deploy ainda escrevendo)
+                pending = signature
+                continue
+            pending = None
+            await self.reload()
+
+    def stats(self) -> Dict:
+        current = self.current
+        return {
+            "policy_path": self.policy_path,
+            "version": current.version if current else None,
+            "policies": current.decisions.policy_count if current else 0,
+            "digest": current.digest[:12] if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "watching": self._watcher is not None,
+            "memo": current.decisions.memo_stats() if current else None,
+        }
+
+
+def build_policy_store() -> PolicyStore:
+    """PolicyStore com os CASBIN_* do app/config.py"""
+    return PolicyStore(
+        model_path=os.path.join(BASE_DIR, settings.CASBIN_MODEL_PATH),
+        policy_path=os.path.join(BASE_DIR, settings.CASBIN_POLICY_PATH),
+        memo_size=settings.CASBIN_DECISION_MEMO_SIZE,
+        poll_seconds=settings.CASBIN_POLICY_POLL_SECONDS,
+    )
+
+
+policy_store = build_policy_store()
@@ -1,24 +1,38 @@
 """
 Serviço de Proxy - Encaminha requisições para os microsserviços
 """
+import asyncio
+import time
+from typing import Dict, Optional, Tuple, Union, AsyncIterator
+
 from fastapi import Request, HTTPException, status
 from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 
 from app.config import settings
+from app.services import metrics
+from app.services.access_log import annotate
+from app.services.circuit_breaker import CircuitBreaker, breaker_for
+from app.services.compression import EdgeCompressor, build_compressor
+from app.services.hedging import UpstreamHedger, build_hedger, hedge_key
+from app.services.response_cache import CachedResponse, CacheKey, ResponseCache
+from app.services.singleflight import SingleFlight
+from app.services.tracing import tracer
+from app.services.upstream_pools import PoolSettings, build_client, pool_settings_for, pool_usage
 
 
 # SRP: ProxyService cuida apenas do encaminhamento das requisições, sem misturar regras de negócio.
 class ProxyService:
     """Serviço para fazer proxy de requisições para microsserviços"""
-    
+
     # Mapeamento de serviços para URLs
     SERVICE_URLS = {
         "auth": settings.AUTH_SERVICE_URL,
         "user": settings.USER_SERVICE_URL,
         "quiz": settings.QUIZ_SERVICE_URL,
     }
-    
+
     # Mapeamento de prefixos por serviço
     # Esses prefixos são adicionados ao path antes de fazer proxy
     SERVICE_PREFIXES = {
@@ -26,10 +40,75 @@ class ProxyService:
         "user": "/users",  # User service espera /users/{id}, /users/by-email, etc.
         "quiz": "",  # Quiz service não precisa de prefixo adicional (já incluído no path)
     }
-    
+
+    # Headers da requisição repassados ao microsserviço
+    REQUEST_HEADERS_TO_FORWARD = frozenset([
+        "authorization",
+        "content-type",
+        "accept",
+        "accept-encoding",
+        "accept-language",
+        "user-agent",
+        "x-user-id",
+        "x-user-role",
+    ])
+
+    # Métodos que alteram recursos e invalidam o cache de respostas
+    CACHE_INVALIDATING_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+
+    # Headers que fazem parte da chave de coalescência (negociação de conteúdo);
+    # GETs que diferem neles nunca são agrupados
+    FLIGHT_KEY_HEADERS = (
+        "accept",
+        "accept-encoding",
+        "accept-language",
+        "if-none-match",
+    )
+
+    # Escopo de autenticação: entra na chave só em rotas cuja resposta depende do usuário
+    FLIGHT_AUTH_HEADERS = ("authorization", "x-user-id", "x-user-role")
+
+    # Headers da resposta devolvidos ao cliente
+    RESPONSE_HEADERS_TO_FORWARD = frozenset([
+        "content-type",
+        "content-length",
+        "content-encoding",
+        "access-control-allow-origin",
+        "set-cookie",
+    ])
+
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
+        # Um pool de conexões por microsserviço (ver app/services/upstream_pools.py)
+        self.pool_settings: Dict[str, PoolSettings] = {
+            service: pool_settings_for(service) for service in self.SERVICE_URLS
+        }
+        self.clients: Dict[str, httpx.AsyncClient] = {
+            service: build_client(service, pool) for service, pool in self.pool_settings.items()
+        }
+        # Requisições em andamento por serviço (da chamada até o fim do corpo da resposta)
+        self.in_flight: Dict[str, int] = {service: 0 for service in self.SERVICE_URLS}
+        # Circuit breaker por serviço: 503 imediato enquanto o serviço estiver falhando
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        if settings.CIRCUIT_BREAKER_ENABLED:
+            self.breakers = {service: breaker_for(service) for service in self.SERVICE_URLS}
+        self.streaming = settings.PROXY_STREAMING_ENABLED
+        self.stream_threshold = settings.PROXY_STREAM_THRESHOLD_BYTES
+        # Cache dos GETs de times/perguntas/quizzes (ver app/services/response_cache.py)
+        self.response_cache: Optional[ResponseCache] = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                max_entry_bytes=settings.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+            )
+        # GETs idênticos concorrentes compartilham a chamada ao microsserviço
+        self.singleflight: Optional[SingleFlight] = SingleFlight() if settings.PROXY_COALESCE_ENABLED else None
+        # Compressão na borda: com ela ativa, o microsserviço sempre responde sem codificação
+        # (ver app/services/compression.py)
+        self.compressor: Optional[EdgeCompressor] = build_compressor()
+        # Retries de conexão e hedging dos GETs lentos (ver app/services/hedging.py)
+        self.hedger: Optional[UpstreamHedger] = build_hedger()
+
     async def proxy_request(
         self,
         service: str,
@@ -38,12 +117,21 @@ class ProxyService:
     ) -> Response:
         """
         Faz proxy de uma requisição para um microsserviço
-        
+
+        Corpos pequenos (ou com streaming desabilitado) são bufferizados; corpos
+        maiores que PROXY_STREAM_THRESHOLD_BYTES, ou sem tamanho conhecido, são
+        repassados em streaming nos dois sentidos.
+
+        GETs de recursos cacheáveis são servidos do ResponseCache enquanto frescos;
+        escritas bem-sucedidas invalidam o recurso correspondente. GETs idênticos
+        concorrentes (mesma URL e mesmo escopo de autenticação) compartilham uma
+        única chamada ao microsserviço.
+
         Args:
             service: Nome do serviço (auth, user, quiz)
             path: Caminho do endpoint no microsserviço
             request: Requisição FastAPI original
-        
+
         Returns:
             Resposta do microsserviço
         """
@@ -54,10 +142,290 @@ class ProxyService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Serviço '{service}' não configurado"
             )
-        
+
+        target_url = self._build_target_url(service, service_url, path, request)
+        return await self.forward(service, target_url, request)
+
+    async def forward(
+        self, service: str, target_url: str, request: Request, user_scoped: bool = True
+    ) -> Response:
+        """
+        Encaminha a requisição para uma URL já resolvida no microsserviço
+        (usado pela tabela de rotas, que pré-computa as URLs).
+        user_scoped=False: a resposta não depende do usuário e GETs de
+        usuários diferentes podem compartilhar a chamada (singleflight)
+        """
+        service_url = self.SERVICE_URLS[service]
+        annotate(request.scope, upstream=service)
+
+        headers = self._build_forward_headers(request)
+
+        cache_key = self._cache_key(request)
+        cached = None
+        if cache_key is not None:
+            cached, fresh = self.response_cache.lookup(cache_key)
+            if cached is not None and fresh:
+                annotate(request.scope, cache="HIT")
+                return await self._finalize(request, self._cached_response(cached, "HIT"))
+            if cached is not None and cached.upstream_etag:
+                # Entrada vencida: revalidar com o microsserviço em vez de baixar de novo
+                headers["if-none-match"] = cached.upstream_etag
+
+        async def forward() -> Response:
+            return await self._forward(service, service_url, target_url, headers, request, cache_key, cached)
+
+        flight_key = self._flight_key(service, target_url, headers, request, user_scoped)
+        if flight_key is None:
+            gateway_response = await forward()
+        else:
+            gateway_response, shared = await self.singleflight.do(flight_key, forward)
+            if shared:
+                annotate(request.scope, coalesced=True)
+                if isinstance(gateway_response, StreamingResponse):
+                    # Corpo em streaming só pode ser lido uma vez: buscar o próprio
+                    gateway_response = await forward()
+                else:
+                    gateway_response = self._copy_response(gateway_response)
+
+        if (
+            self.response_cache is not None
+            and request.method in self.CACHE_INVALIDATING_METHODS
+            and gateway_response.status_code < 400
+        ):
+            self.response_cache.invalidate_resource(request.url.path)
+
+        return await self._finalize(request, gateway_response)
+
+    async def _forward(
+        self,
+        service: str,
+        service_url: str,
+        target_url: str,
+        headers: Dict[str, str],
+        request: Request,
+        cache_key: Optional[CacheKey],
+        cached: Optional[CachedResponse],
+    ) -> Response:
+        """Envia ao microsserviço e monta a resposta do gateway (armazenando no cache se aplicável)"""
+        content = await self._request_content(request)
+        started = time.perf_counter()
+        response = await self._send(
+            service, service_url, request.method, target_url, headers, content,
+            hedge=hedge_key(request.method, request.url.path),
+        )
+        annotate(
+            request.scope,
+            upstream_status=response.status_code,
+            upstream_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+
+        if cached is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+            await self._releaser(service, response)()
+            cached = self.response_cache.refresh(cache_key, cached)
+            annotate(request.scope, cache="REVALIDATED")
+            return self._cached_response(cached, "REVALIDATED")
+
+        gateway_response = await self._build_response(service, response)
+
+        if cache_key is not None and not isinstance(gateway_response, StreamingResponse):
+            stored = self.response_cache.store(
+                cache_key,
+                gateway_response.status_code,
+                gateway_response.body,
+                {k: v for k, v in gateway_response.headers.items() if k != "content-length"},
+                upstream_etag=response.headers.get("etag"),
+            )
+            if stored is not None:
+                annotate(request.scope, cache="MISS")
+                return self._cached_response(stored, "MISS")
+
+        return gateway_response
+
+    def _flight_key(
+        self,
+        service: str,
+        target_url: str,
+        headers: Dict[str, str],
+        request: Request,
+        user_scoped: bool,
+    ) -> Optional[Tuple]:
+        """
+        Chave de coalescência: só GETs sem corpo, com a mesma URL e, em rotas
+        que dependem do usuário, o mesmo escopo de autenticação (None se a
+        requisição não pode ser coalescida)
+        """
+        if self.singleflight is None or request.method != "GET":
+            return None
+        if "transfer-encoding" in request.headers or request.headers.get("content-length", "0") != "0":
+            return None
+        lowered = {key.lower(): value for key, value in headers.items()}
+        names = self.FLIGHT_KEY_HEADERS + (self.FLIGHT_AUTH_HEADERS if user_scoped else ())
+        return (service, target_url, user_scoped) + tuple(lowered.get(name) for name in names)
+
+    @staticmethod
+    def _copy_response(response: Response) -> Response:
+        """Cópia de uma resposta bufferizada para um seguidor do singleflight"""
+        copy = Response(content=response.body, status_code=response.status_code)
+        copy.raw_headers = list(response.raw_headers)
+        return copy
+
+    def _cache_key(self, request: Request) -> Optional[CacheKey]:
+        """Chave do cache para GETs de recursos cacheáveis (None se a requisição não usa cache)"""
+        if self.response_cache is None or request.method != "GET":
+            return None
+        path = request.url.path
+        if ResponseCache.resource_prefix(path) is None:
+            return None
+        # Mesma role repassada ao microsserviço em X-User-Role
+        role = getattr(request.state, "user_role", None) or request.headers.get("x-user-role")
+        return ResponseCache.make_key(role, path, request.url.query)
+
+    @staticmethod
+    def _cached_response(entry: CachedResponse, cache_status: str) -> Response:
+        """Resposta montada a partir de uma entrada do cache"""
+        return Response(
+            content=entry.body,
+            status_code=entry.status_code,
+            headers={**entry.headers, "etag": entry.etag, "x-cache": cache_status},
+        )
+
+    async def _finalize(self, request: Request, response: Response) -> Response:
+        """Compressão conforme o Accept-Encoding do cliente e resposta condicional (304)"""
+        if self.compressor is not None:
+            response = await self.compressor.compress(response, request.headers.get("accept-encoding"))
+        return self._conditional(request, response)
+
+    @staticmethod
+    def _conditional(request: Request, response: Response) -> Response:
+        """304 quando o If-None-Match do cliente bate com o ETag de uma resposta do cache"""
+        if_none_match = request.headers.get("if-none-match")
+        etag = response.headers.get("etag")
+        if not if_none_match or not etag or "x-cache" not in response.headers:
+            return response
+        if not ProxyService._etag_matches(if_none_match, etag):
+            return response
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"etag": etag, "x-cache": response.headers["x-cache"]},
+        )
+
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        # Comparação fraca (RFC 9110): ignora o prefixo W/
+        candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        return etag in candidates
+
+    async def _send(
+        self,
+        service: str,
+        service_url: str,
+        method: str,
+        target_url: str,
+        headers: Dict[str, str],
+        content: Union[bytes, AsyncIterator[bytes]],
+        hedge: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Envia a requisição pelo pool do serviço; o corpo da resposta ainda não é lido.
+        Retries e hedges contam como uma chamada só para o breaker e as métricas
+        """
+        breaker = self.breakers.get(service)
+        if breaker is not None and not breaker.allow():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"{service} indisponível no momento (circuit breaker aberto)",
+                headers={"Retry-After": str(breaker.retry_after())},
+            )
+
+        client = self.clients[service]
+        self.in_flight[service] += 1
+        sent = False
+        failed = True
+        started = time.monotonic()
+        async def attempt() -> httpx.Response:
+            # Um span por tentativa (retries e hedges aparecem lado a lado no trace)
+            attributes = {"http.method": method, "http.url": target_url, "peer.service": service}
+            with tracer.span(f"{method} {service}", "client", attributes=attributes) as span:
+                upstream_request = client.build_request(
+                    method=method,
+                    url=target_url,
+                    headers=tracer.inject(dict(headers)),
+                    content=content,
+                )
+                response = await client.send(upstream_request, stream=True, follow_redirects=True)
+                span.set("http.status_code", response.status_code)
+                return response
+
+        try:
+            if self.hedger is None:
+                response = await attempt()
+            else:
+                # Só corpo bufferizado pode ser reenviado
+                replayable = isinstance(content, bytes)
+                response = await self.hedger.call(service, attempt, replayable, hedge)
+            sent = True
+            failed = response.status_code >= 500
+            return response
+        except httpx.TimeoutException:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Timeout ao conectar com {service}"
+            )
+        except httpx.ConnectError:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Erro ao conectar com {service} em {service_url}"
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Erro ao processar requisição para {service}: {str(e)}"
+            )
+        except httpx.StreamConsumed:
+            # Redirect do microsserviço exigiria reenviar um corpo já transmitido
+            failed = False
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"{service} redirecionou uma requisição com corpo em streaming"
+            )
+        except asyncio.CancelledError:
+            # Cliente desconectou: não diz nada sobre a saúde do serviço
+            if breaker is not None:
+                breaker.release()
+            breaker = None
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            if not sent:
+                self.in_flight[service] -= 1
+            if breaker is not None:
+                breaker.record(failed, elapsed)
+            metrics.upstream_duration.observe(elapsed, service)
+            metrics.upstream_requests_total.inc(
+                service, metrics.status_class(response.status_code) if sent else "error"
+            )
+
+    def _releaser(self, service: str, response: httpx.Response):
+        """Fecha a resposta e devolve a conexão ao pool (idempotente)"""
+        released = False
+
+        async def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight[service] -= 1
+            await response.aclose()
+
+        return release
+
+    def _build_target_url(self, service: str, service_url: str, path: str, request: Request) -> str:
+        """Monta a URL final no microsserviço (prefixo do serviço + path + query)"""
         # Obter prefixo do serviço (se houver)
         service_prefix = self.SERVICE_PREFIXES.get(service, "")
-        
+
         # Construir path completo com prefixo
         if service_prefix:
             # Se o path já começar com o prefixo, não adicionar novamente
@@ -71,91 +439,123 @@ class ProxyService:
         else:
             # Sem prefixo, usar o path diretamente
             full_path = f"/{path.lstrip('/')}" if path else ""
-        
+
         # Adicionar query string se houver
         if request.url.query:
             full_path += f"?{request.url.query}"
-        
-        target_url = f"{service_url}{full_path}"
-        
-        # Log para debug (pode ser removido após confirmação)
-        print(f"[Proxy] Service: {service}, Path recebido: {path}, URL final: {target_url}")
-        
-        # Preparar headers (filtrar headers relevantes)
+
+        return f"{service_url}{full_path}"
+
+    def _build_forward_headers(self, request: Request) -> Dict[str, str]:
+        """Filtra os headers relevantes e injeta a identidade extraída pelo JWT middleware"""
         headers = {}
-        header_keys_to_forward = [
-            "authorization",
-            "content-type",
-            "accept",
-            "accept-encoding",
-            "accept-language",
-            "user-agent",
-            "x-user-id",
-            "x-user-role",
-        ]
-        
-        for key in request.headers:
-            if key.lower() in header_keys_to_forward:
-                headers[key] = request.headers[key]
-        
+        for key, value in request.headers.items():
+            if key in self.REQUEST_HEADERS_TO_FORWARD:
+                headers[key] = value
+        if self.compressor is not None:
+            # A codificação é negociada pelo gateway: o corpo do microsserviço chega cru
+            # (sem isso o httpx pediria gzip por padrão)
+            headers["accept-encoding"] = "identity"
+
         # Adicionar headers de user_role e user_id do estado da requisição
         # (extraídos pelo JWT middleware)
         if hasattr(request.state, "user_role"):
             headers["X-User-Role"] = request.state.user_role
-        
+
         if hasattr(request.state, "user_id"):
             headers["X-User-Id"] = str(request.state.user_id)
-        
-        # Ler body da requisição
-        body = await request.body()
-        
-        try:
-            # Fazer requisição para o microsserviço
-            response = await self.client.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                content=body,
-                follow_redirects=True,
-            )
-            # Preparar headers da resposta
-            response_headers = {}
-            headers_to_forward = [
-                "content-type",
-                "content-length",
-                "content-encoding",
-                "access-control-allow-origin",
-                "set-cookie",
-            ]
-            
-            for key in response.headers:
-                if key.lower() in headers_to_forward:
-                    response_headers[key] = response.headers[key]
-            
-            # Retornar resposta
+
+        return headers
+
+    async def _request_content(self, request: Request) -> Union[bytes, AsyncIterator[bytes]]:
+        """
+        Corpo da requisição a ser enviado ao microsserviço.
+        Corpos pequenos são lidos inteiros (permitem seguir redirects);
+        os demais são repassados em streaming, sem cópia em memória.
+        """
+        if not self.streaming:
+            return await request.body()
+
+        content_length = self._content_length(request.headers.get("content-length"))
+        if content_length is not None and content_length <= self.stream_threshold:
+            return await request.body()
+        if content_length is None and "transfer-encoding" not in request.headers:
+            # Sem corpo (ex: GET)
+            return b""
+        return request.stream()
+
+    async def _build_response(self, service: str, response: httpx.Response) -> Response:
+        """Converte a resposta do httpx (ainda em streaming) em resposta do gateway"""
+        # Preparar headers da resposta
+        response_headers = {}
+        for key, value in response.headers.items():
+            if key in self.RESPONSE_HEADERS_TO_FORWARD:
+                response_headers[key] = value
+
+        release = self._releaser(service, response)
+        content_length = self._content_length(response.headers.get("content-length"))
+        if not self.streaming or (content_length is not None and content_length <= self.stream_threshold):
+            # Resposta pequena: ler de uma vez (bytes crus, coerentes com content-encoding)
+            try:
+                body = b"".join([chunk async for chunk in response.aiter_raw()])
+            except httpx.HTTPError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"Erro ao processar requisição para {service}: {str(e)}"
+                )
+            finally:
+                await release()
+
             return Response(
-                content=response.content,
+                content=body,
                 status_code=response.status_code,
                 headers=response_headers,
             )
-            
-        except httpx.TimeoutException:
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail=f"Timeout ao conectar com {service}"
-            )
-        except httpx.ConnectError:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Erro ao conectar com {service} em {service_url}"
-            )
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Erro ao processar requisição para {service}: {str(e)}"
-            )
-    
-    async def close(self):
-        """Fecha o cliente HTTP"""
-        await self.client.aclose()
 
+        # Resposta grande ou sem tamanho: repassar em streaming.
+        # O próximo chunk só é lido do microsserviço depois que o anterior foi
+        # enviado ao cliente, então a memória do gateway não cresce com o payload.
+        async def stream_body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in response.aiter_raw():
+                    yield chunk
+            finally:
+                # Também cobre o cliente desconectando no meio do stream
+                await release()
+
+        return StreamingResponse(
+            stream_body(),
+            status_code=response.status_code,
+            headers=response_headers,
+            background=BackgroundTask(release),
+        )
+
+    @staticmethod
+    def _content_length(value: Optional[str]) -> Optional[int]:
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def breaker_stats(self) -> Dict[str, Dict]:
+        """Estado do circuit breaker de cada serviço"""
+        return {service: breaker.snapshot() for service, breaker in self.breakers.items()}
+
+    def pool_stats(self) -> Dict[str, Dict]:
+        """Uso dos pools por serviço, para dimensionamento sob carga"""
+        stats = {}
+        for service, client in self.clients.items():
+            pool = self.pool_settings[service]
+            stats[service] = {
+                "max_connections": pool.max_connections,
+                "max_keepalive_connections": pool.max_keepalive_connections,
+                "http2": pool.http2,
+                "in_flight": self.in_flight[service],
+                **pool_usage(client),
+            }
+        return stats
+
+    async def close(self):
+        """Fecha os clientes HTTP de todos os serviços"""
+        for client in self.clients.values():
+            await client.aclose()
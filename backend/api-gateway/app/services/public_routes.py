@@ -0,0 +1,42 @@
+"""
+Rotas públicas do gateway (sem token e/ou sem verificação de política)
+
+Cada entrada da lista é interpretada pelo formato:
+
+- "/health": path exato ("/" casa apenas a raiz, não todo o gateway)
+- "/api/auth/": prefixo (termina em "/"), libera o que estiver abaixo dele
+- "POST /api/users": path exato apenas para o método informado (ex: cadastro)
+
+A lista é compilada uma vez (set + tupla de prefixos); a verificação por
+requisição é um lookup em set e um único str.startswith.
+"""
+from typing import FrozenSet, Iterable, Tuple
+
+
+class PublicRoutes:
+    """Verificação de rota pública por path exato, prefixo ou (método, path)"""
+
+    __slots__ = ("entries", "exact", "prefixes", "endpoints")
+
+    def __init__(self, entries: Iterable[str]):
+        self.entries: Tuple[str, ...] = tuple(entries)
+        exact = set()
+        prefixes = []
+        endpoints = set()
+        for entry in self.entries:
+            method, _, path = entry.rpartition(" ")
+            if method:
+                endpoints.add((method.upper(), path))
+            elif path != "/" and path.endswith("/"):
+                prefixes.append(path)
+            else:
+                exact.add(path)
+        self.exact: FrozenSet[str] = frozenset(exact)
+        self.prefixes: Tuple[str, ...] = tuple(prefixes)
+        self.endpoints: FrozenSet[Tuple[str, str]] = frozenset(endpoints)
+
+    def matches(self, path: str, method: str) -> bool:
+        return path in self.exact or (method, path) in self.endpoints or path.startswith(self.prefixes)
+
+    def __iter__(self):
+        return iter(self.entries)
@@ -0,0 +1,219 @@
+"""
+Rate limiting por token bucket
+
+Cada (grupo de rotas, usuário) tem um balde com capacidade `burst` que recebe
+`rate` tokens por segundo; cada requisição consome um token. Sem token, o
+gateway responde 429 com Retry-After.
+
+O estado fica em um RateLimitBackend:
+- LocalRateLimitBackend: em memória, O(1) por verificação, baldes ociosos são
+  descartados (um balde ocioso está cheio, então descartá-lo não muda nada).
+  Cada réplica do gateway limita de forma independente.
+- RedisRateLimitBackend: balde compartilhado entre réplicas via script Lua
+  atômico (requer o pacote opcional `redis`).
+"""
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Limite de um grupo de rotas"""
+    group: str
+    rate: float
+    burst: int
+
+
+# Grupos de rotas (prefixo do path no gateway -> grupo). O primeiro prefixo que casar vence.
+# Gameplay aparece nos dois formatos aceitos pelo gateway (/api/quiz e /api/api/quiz).
+ROUTE_GROUPS: List[Tuple[str, str]] = [
+    ("/api/auth/", "auth"),
+    ("/api/password/", "auth"),
+    ("/api/api/quiz/", "gameplay"),
+    ("/api/quiz/", "gameplay"),
+]
+
+# Rotas operacionais nunca são limitadas
+EXEMPT_PREFIXES = ("/health", "/ready", "/metrics", "/docs", "/openapi.json", "/redoc")
+
+
+def client_identity(scope) -> str:
+    """Chave do balde: user_id do JWT ou, sem usuário, o IP do cliente"""
+    user_id = scope.get("state", {}).get("user_id")
+    if user_id is not None:
+        return f"u:{user_id}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def rule_for_group(group: str) -> RateLimitRule:
+    """Lê RATE_LIMIT_<GRUPO>_RATE / RATE_LIMIT_<GRUPO>_BURST do app/config.py"""
+    prefix = f"RATE_LIMIT_{group.upper()}"
+    return RateLimitRule(
+        group=group,
+        rate=getattr(settings, f"{prefix}_RATE"),
+        burst=getattr(settings, f"{prefix}_BURST"),
+    )
+
+
+class RateLimitBackend(ABC):
+    """Interface dos armazenamentos de baldes"""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Consome um token; retorna 0 se permitido ou os segundos até o próximo token"""
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """Baldes em memória do processo, com descarte dos ociosos"""
+
+    def __init__(self, idle_seconds: float = 300, max_buckets: int = 100000, clock=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.max_buckets = max_buckets
+        self._clock = clock
+        # chave -> [tokens, último acesso]; ordem = do acesso mais antigo ao mais recente
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        return self.acquire_now(key, rate, burst)
+
+    def acquire_now(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(burst), now]
+        else:
+            bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            wait = 0.0
+        else:
+            wait = (1 - bucket[0]) / rate
+
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        # Custo amortizado O(1): só olha o início da fila (o balde mais antigo)
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < self.idle_seconds and len(buckets) <= self.max_buckets:
+                break
+            buckets.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Token bucket atômico no Redis. O relógio é o do próprio Redis (TIME),
+# então réplicas com relógios diferentes enxergam o mesmo balde.
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Baldes compartilhados entre réplicas do gateway (pacote opcional `redis`)"""
+
+    def __init__(self, url: str, key_prefix: str = "gateway:ratelimit:"):
+        import redis.asyncio as redis  # dependência opcional
+
+        self.client = redis.from_url(url)
+        self.key_prefix = key_prefix
+        self._script = self.client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        try:
+            wait = await self._script(keys=[self.key_prefix + key], args=[rate, burst])
+        except Exception:
+            # Redis fora do ar não deve derrubar o gateway: libera a requisição
+            logger.warning("Rate limit indisponível (Redis); liberando requisição", exc_info=True)
+            return 0.0
+        return float(wait)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def build_backend() -> RateLimitBackend:
+    """Cria o backend configurado em RATE_LIMIT_BACKEND (local ou redis)"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+        except ImportError:
+            logger.warning("RATE_LIMIT_BACKEND=redis, mas o pacote 'redis' não está instalado. Usando baldes locais")
+    return LocalRateLimitBackend(
+        idle_seconds=settings.RATE_LIMIT_IDLE_SECONDS,
+        max_buckets=settings.RATE_LIMIT_MAX_BUCKETS,
+    )
+
+
+class RateLimiter:
+    """Resolve grupo e chave da requisição e consulta o backend"""
+
+    def __init__(self, backend: RateLimitBackend, groups: Optional[List[Tuple[str, str]]] = None):
+        self.backend = backend
+        self.groups = groups if groups is not None else ROUTE_GROUPS
+        self.rules: Dict[str, RateLimitRule] = {}
+        for _, group in self.groups:
+            self.rules.setdefault(group, rule_for_group(group))
+        self.rules.setdefault("default", rule_for_group("default"))
+        self.rejected: Dict[str, int] = {group: 0 for group in self.rules}
+
+    def rule_for_path(self, path: str) -> RateLimitRule:
+        for prefix, group in self.groups:
+            if path.startswith(prefix):
+                return self.rules[group]
+        return self.rules["default"]
+
+    async def check(self, path: str, identity: str) -> Tuple[RateLimitRule, float]:
+        """Retorna a regra aplicada e a espera (0 = permitido)"""
+        rule = self.rule_for_path(path)
+        wait = await self.backend.acquire(f"{rule.group}:{identity}", rule.rate, rule.burst)
+        if wait > 0:
+            self.rejected[rule.group] += 1
+        return rule, wait
+
+
+rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Limiter compartilhado do gateway (criado no primeiro uso)"""
+    global rate_limiter
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(build_backend())
+    return rate_limiter
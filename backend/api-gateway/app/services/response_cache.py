@@ -0,0 +1,138 @@
+"""
+Cache de respostas do gateway para GETs idempotentes do catálogo do quiz
+
+Times, perguntas e quizzes só mudam quando um admin edita. As respostas de GET
+nesses prefixos ficam em um cache LRU com TTL, indexado por (role, path, query).
+Escritas (POST/PUT/PATCH/DELETE) passando pelo gateway derrubam as entradas
+do mesmo recurso. Cada entrada tem um ETag próprio, então clientes com
+If-None-Match recebem 304 sem corpo.
+
+O cache é local ao processo: com vários workers, escritas invalidam apenas o
+worker que as recebeu e o TTL limita por quanto tempo os demais servem a
+versão anterior.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Prefixos (no gateway) cujos GETs podem ser cacheados
+CACHEABLE_PREFIXES = ("/api/teams", "/api/questions", "/api/quizzes-admin")
+
+# Escritas em um recurso também invalidam recursos derivados.
+# Criar uma pergunta com team_id cria/atualiza o quiz automático do time.
+INVALIDATION_DEPENDENCIES = {
+    "/api/questions": ("/api/questions", "/api/quizzes-admin"),
+}
+
+CacheKey = Tuple[str, str, str]
+
+
+class CachedResponse(NamedTuple):
+    """Resposta armazenada (corpo cru e headers já filtrados)"""
+    status_code: int
+    body: bytes
+    headers: Dict[str, str]
+    etag: str
+    # ETag enviado pelo microsserviço, usado para revalidar com If-None-Match
+    upstream_etag: Optional[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Cache LRU com TTL para respostas de GET"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 30, max_entry_bytes: int = 262144):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def resource_prefix(path: str) -> Optional[str]:
+        """Prefixo cacheável ao qual o path pertence (ex: /api/teams/1 -> /api/teams)"""
+        for prefix in CACHEABLE_PREFIXES:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    @staticmethod
+    def make_key(role: Optional[str], path: str, query: str) -> CacheKey:
+        return (role or "", path, query)
+
+    @staticmethod
+    def compute_etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[CachedResponse], bool]:
+        """Retorna (entrada, fresca?). Entradas vencidas continuam disponíveis para revalidação"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        if entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry, True
+        return entry, False
+
+    def store(
+        self,
+        key: CacheKey,
+        status_code: int,
+        body: bytes,
+        headers: Dict[str, str],
+        upstream_etag: Optional[str] = None,
+    ) -> Optional[CachedResponse]:
+        """Armazena uma resposta 200 pequena; retorna a entrada (ou None se não cacheável)"""
+        if status_code != 200 or len(body) > self.max_entry_bytes or "set-cookie" in headers:
+            return None
+        entry = CachedResponse(
+            status_code=status_code,
+            body=body,
+            headers=headers,
+            etag=self.compute_etag(body),
+            upstream_etag=upstream_etag,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def refresh(self, key: CacheKey, entry: CachedResponse) -> CachedResponse:
+        """Renova o TTL de uma entrada revalidada pelo microsserviço (304)"""
+        self.revalidations += 1
+        refreshed = entry._replace(expires_at=time.monotonic() + self.ttl_seconds)
+        self._entries[key] = refreshed
+        return refreshed
+
+    def invalidate_resource(self, path: str) -> int:
+        """Derruba as entradas do recurso escrito (e dos recursos dependentes)"""
+        prefix = self.resource_prefix(path)
+        if prefix is None:
+            return 0
+        prefixes = INVALIDATION_DEPENDENCIES.get(prefix, (prefix,))
+        stale = [key for key in self._entries if self.resource_prefix(key[1]) in prefixes]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "invalidations": self.invalidations,
+        }
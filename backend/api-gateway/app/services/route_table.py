@@ -0,0 +1,141 @@
+"""
+Tabela de rotas do gateway
+
+Declara, para cada prefixo do gateway, o microsserviço e o prefixo no
+microsserviço. A tabela é compilada em uma trie por segmento de path: a busca
+percorre no máximo um nó por segmento e devolve a rota de prefixo mais longo.
+A URL base de cada rota (URL do serviço + prefixo) é montada uma única vez;
+por requisição resta apenas concatenar o restante do path e a query.
+
+Paths com segmentos "." ou ".." (também codificados, ex: %2e%2e) não casam
+nenhuma rota: a autorização decide pelo path recebido e o serviço resolveria
+o ".." para outro recurso (ex: /api/teams/../quizzes-admin).
+"""
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import unquote
+
+ALL_METHODS = frozenset(["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
+
+
+@dataclass(frozen=True)
+class ProxyRoute:
+    """Prefixo do gateway -> (serviço, prefixo no serviço)"""
+    prefix: str
+    service: str
+    upstream_prefix: str
+    methods: FrozenSet[str] = ALL_METHODS
+    # True: casa apenas o path exato (sem subpaths)
+    exact: bool = False
+    # False: a resposta não depende do usuário (ex: ranking), então GETs
+    # concorrentes com tokens diferentes compartilham a chamada (singleflight)
+    user_scoped: bool = True
+
+    @property
+    def path_format(self) -> str:
+        """Template usado como label de rota (métricas), no formato do FastAPI"""
+        return self.prefix if self.exact else f"{self.prefix}/{{path}}"
+
+
+# Ordem não importa: vale sempre o prefixo mais longo
+ROUTE_TABLE: Tuple[ProxyRoute, ...] = (
+    # Auth service
+    ProxyRoute("/api/auth", "auth", "/auth"),
+    # Password reset (públicas) -> user-service
+    ProxyRoute("/api/password/forgot", "user", "/users/password/forgot", frozenset(["POST"]), exact=True),
+    ProxyRoute("/api/password/reset", "user", "/users/password/reset", frozenset(["POST"]), exact=True),
+    ProxyRoute("/api/password/validate-token", "user", "/users/password/validate-token", frozenset(["GET"]), exact=True),
+    # User service (/api/user é alias)
+    ProxyRoute("/api/users", "user", "/users"),
+    ProxyRoute("/api/user", "user", "/users"),
+    # Quiz service - gameplay e ranking (Gateway: /api/api/quiz/start -> QuizService: /quizzes/start)
+    ProxyRoute("/api/api/quiz", "quiz", "/quizzes", frozenset(["GET", "POST", "PUT", "DELETE", "OPTIONS"])),
+    ProxyRoute("/api/api/leaderboard", "quiz", "/api/leaderboard", frozenset(["GET", "OPTIONS"]), user_scoped=False),
+    # Quiz service - admin (CRUD)
+    ProxyRoute("/api/quiz", "quiz", ""),
+    ProxyRoute("/api/teams", "quiz", "/teams"),
+    ProxyRoute("/api/questions", "quiz", "/questions"),
+    ProxyRoute("/api/answers", "quiz", "/answers"),
+    ProxyRoute("/api/quizzes-admin", "quiz", "/quizzes-admin"),
+)
+
+
+def _has_dot_segment(path: str) -> bool:
+    """Algum segmento é "." ou "..", mesmo codificado (%2e, %252e)"""
+    if "." not in path and "%" not in path:
+        return False
+    for segment in path.split("/"):
+        decoded = segment
+        while "%" in decoded:
+            previous, decoded = decoded, unquote(decoded)
+            if decoded == previous:
+                break
+        if decoded in (".", ".."):
+            return True
+    return False
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    prefix_route: Optional[ProxyRoute] = None
+    exact_route: Optional[ProxyRoute] = None
+
+
+class RouteTable:
+    """Trie de prefixos por segmento com URLs base pré-computadas"""
+
+    def __init__(self, routes: Iterable[ProxyRoute], service_urls: Dict[str, str]):
+        self.routes = tuple(routes)
+        self._root = _Node()
+        # URL base (serviço + prefixo no serviço) de cada rota
+        self.base_urls: Dict[ProxyRoute, str] = {}
+
+        for route in self.routes:
+            node = self._root
+            for segment in route.prefix.strip("/").split("/"):
+                node = node.children.setdefault(segment, _Node())
+            if route.exact:
+                node.exact_route = route
+            else:
+                node.prefix_route = route
+            self.base_urls[route] = service_urls[route.service] + route.upstream_prefix
+
+    def lookup(self, path: str) -> Optional[Tuple[ProxyRoute, str]]:
+        """
+        Rota de prefixo mais longo para o path.
+
+        Returns:
+            (rota, restante do path a partir do prefixo) ou None
+        """
+        if _has_dot_segment(path):
+            return None
+        node = self._root
+        best: Optional[ProxyRoute] = None
+        best_end = 0
+        position = 1  # pula a "/" inicial
+        length = len(path)
+
+        while position <= length:
+            end = path.find("/", position)
+            if end == -1:
+                end = length
+            node = node.children.get(path[position:end])
+            if node is None:
+                break
+            if end == length and node.exact_route is not None:
+                return node.exact_route, ""
+            if node.prefix_route is not None:
+                best, best_end = node.prefix_route, end
+            position = end + 1
+
+        if best is None:
+            return None
+        remainder = path[best_end:]
+        # "/api/teams/" equivale a "/api/teams"
+        return best, "" if remainder == "/" else remainder
+
+    def target_url(self, route: ProxyRoute, remainder: str, query: str) -> str:
+        """URL final no microsserviço"""
+        url = self.base_urls[route] + remainder
+        return f"{url}?{query}" if query else url
@@ -0,0 +1,67 @@
+"""
+Coalescência de requisições idênticas concorrentes (singleflight)
+
+Quando várias requisições com a mesma chave chegam enquanto uma delas ainda
+está em andamento, apenas a primeira (líder) executa a chamada; as demais
+aguardam e recebem o mesmo resultado (ou a mesma exceção).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Agrupa chamadas concorrentes com a mesma chave em uma única execução"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Executa `fn` uma vez por chave em andamento.
+
+        Returns:
+            (resultado, compartilhado?) — compartilhado é True para quem
+            reaproveitou a chamada de outro
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                # O líder foi cancelado (ex: cliente desconectou); se esta
+                # tarefa não foi cancelada, executa a própria chamada
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.fallbacks += 1
+                return await fn(), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita o aviso "exception was never retrieved" quando não há seguidores
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,141 @@
+"""
+Cache de tokens JWT já verificados
+
+Evita refazer jwt.decode (HMAC, base64, JSON) a cada requisição com o mesmo
+access token. As entradas são indexadas por um digest do token (o token em si
+não fica em memória) e valem até o `exp` do token, limitado a um TTL máximo.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set
+
+from app.config import settings
+
+
+class CachedIdentity(NamedTuple):
+    """Identidade extraída de um token válido"""
+    expires_at: float
+    user_id: Any
+    user_role: str
+    payload: Dict[str, Any]
+
+
+class TokenCache:
+    """Cache LRU com expiração por entrada para payloads de JWT verificados"""
+
+    def __init__(self, max_size: int = 10000, max_ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: "OrderedDict[bytes, CachedIdentity]" = OrderedDict()
+        # Índice user_id -> digests, usado para derrubar as entradas no logout
+        self._by_user: Dict[str, Set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[CachedIdentity]:
+        """Retorna a identidade em cache ou None (ausente ou expirada)"""
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    @staticmethod
+    def identity_from(payload: Dict[str, Any], expires_at: float = 0.0) -> CachedIdentity:
+        """Extrai user_id/role do payload (mesmas regras do middleware)"""
+        return CachedIdentity(
+            expires_at=expires_at,
+            user_id=payload.get("sub") or payload.get("userId"),
+            user_role=payload.get("role", "comum"),
+            payload=payload,
+        )
+
+    def put(self, token: str, payload: Dict[str, Any]) -> CachedIdentity:
+        """Armazena o payload de um token que acabou de ser verificado"""
+        now = time.time()
+        expires_at = now + self.max_ttl_seconds
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        entry = self.identity_from(payload, expires_at)
+        if expires_at <= now or self.max_size <= 0:
+            return entry
+
+        key = self._digest(token)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._by_user.setdefault(str(entry.user_id), set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return entry
+
+    def invalidate_token(self, token: str) -> bool:
+        """Remove um token específico do cache"""
+        key = self._digest(token)
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def invalidate_user(self, user_id: Any) -> int:
+        """Remove todos os tokens em cache de um usuário (ex: logout)"""
+        keys = self._by_user.pop(str(user_id), set())
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def invalidate_on_logout(self, token: str) -> int:
+        """Derruba todas as entradas do dono do token informado"""
+        entry = self._entries.get(self._digest(token))
+        if entry is None:
+            return 0
+        return self.invalidate_user(entry.user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores para monitoramento"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_key = str(entry.user_id)
+        keys = self._by_user.get(user_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_key]
+
+
+token_cache = TokenCache(
+    max_size=settings.JWT_CACHE_MAX_SIZE,
+    max_ttl_seconds=settings.JWT_CACHE_MAX_TTL_SECONDS,
+)
@@ -0,0 +1,90 @@
+"""
+Pools de conexão por microsserviço
+
+Cada serviço de SERVICE_URLS ganha seu próprio httpx.AsyncClient, com limites
+de conexões, keep-alive e timeouts próprios. Assim um quiz-service lento
+esgota apenas o pool dele e não as conexões usadas pelo login.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Parâmetros do pool de um microsserviço"""
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    connect_timeout: float
+    read_timeout: float
+    http2: bool = False
+
+
+def pool_settings_for(service: str) -> PoolSettings:
+    """Lê as configurações <SERVIÇO>_POOL_* / <SERVIÇO>_*_TIMEOUT do app/config.py"""
+    prefix = service.upper()
+    return PoolSettings(
+        max_connections=getattr(settings, f"{prefix}_POOL_MAX_CONNECTIONS"),
+        max_keepalive_connections=getattr(settings, f"{prefix}_POOL_MAX_KEEPALIVE"),
+        keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+        connect_timeout=getattr(settings, f"{prefix}_CONNECT_TIMEOUT"),
+        read_timeout=getattr(settings, f"{prefix}_READ_TIMEOUT"),
+        http2=settings.UPSTREAM_HTTP2,
+    )
+
+
+def _http2_available() -> bool:
+    """HTTP/2 depende do pacote opcional `h2` (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_client(service: str, pool: PoolSettings) -> httpx.AsyncClient:
+    """Cria o cliente HTTP dedicado de um microsserviço"""
+    http2 = pool.http2
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 solicitado para %s, mas o pacote 'h2' não está instalado. Usando HTTP/1.1", service)
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            connect=pool.connect_timeout,
+            read=pool.read_timeout,
+            write=pool.read_timeout,
+            # Espera por uma conexão livre do pool: falhar rápido quando ele estiver esgotado
+            pool=pool.connect_timeout,
+        ),
+    )
+
+
+def pool_usage(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Conexões abertas/ociosas e requisições na fila do pool do httpcore"""
+    pool = getattr(client._transport, "_pool", None)
+    if pool is None:
+        return {}
+
+    connections = pool.connections
+    idle = sum(1 for connection in connections if connection.is_idle())
+    queued = sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+    return {
+        "open_connections": len(connections),
+        "active_connections": len(connections) - idle,
+        "idle_connections": idle,
+        "queued_requests": queued,
+    }
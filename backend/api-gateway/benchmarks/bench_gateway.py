@@ -0,0 +1,226 @@
+"""
+Benchmark ponta a ponta do gateway com microsserviços simulados
+
+Dispara tráfego misto (público, usuário autenticado e admin) contra `main:app`
+em processo, com os microsserviços substituídos pelos stubs de
+benchmarks/stubs.py. Mede o gateway inteiro - middlewares, tabela de rotas,
+proxy, cache e compressão - sem precisar do docker-compose.
+
+Relata, por tipo de tráfego e no total: requisições/s, p50/p95/p99 e, em uma
+segunda passada sequencial com tracemalloc, o pico de memória alocada por
+requisição e os blocos que continuam alocados depois dela (vazamentos).
+Com --latency-ms 0 nada espera por I/O: os clientes se revezam no event loop e
+o resultado é o custo de CPU do gateway; uma latência simulada nos stubs mostra
+o comportamento com requisições concorrentes em andamento. --slow-rate/--slow-ms
+fazem uma fração das chamadas demorar mais (cauda de latência), para comparar
+o p99 com e sem hedging:
+    PROXY_HEDGE_ENABLED=false python -m benchmarks.bench_gateway --latency-ms 2 --slow-rate 0.02 --slow-ms 200
+
+O rate limiting e o access log ficam desligados por padrão (um único cliente
+estouraria os baldes; o log iria para o stdout junto do relatório). Qualquer
+variável de ambiente do app/config.py pode ser usada para comparar configurações:
+    RATE_LIMIT_ENABLED=true RESPONSE_CACHE_ENABLED=false python -m benchmarks.bench_gateway
+
+Uso (a partir de backend/api-gateway):
+    python -m benchmarks.bench_gateway [--requests 5000] [--concurrency 32]
+        [--latency-ms 0] [--slow-rate 0] [--slow-ms 0] [--json resultado.json]
+"""
+import os
+
+# Antes de importar o app: as configurações são lidas uma única vez
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import gc  # noqa: E402
+import json  # noqa: E402
+import random  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from collections import Counter, defaultdict  # noqa: E402
+from typing import Dict, List, NamedTuple, Optional  # noqa: E402
+
+import httpx  # noqa: E402
+
+from benchmarks.stubs import install_stubs, mint_token, stub_calls  # noqa: E402
+
+
+class Scenario(NamedTuple):
+    kind: str  # public | user | admin
+    method: str
+    path: str
+    role: Optional[str]
+    weight: int
+    body: Optional[dict] = None
+
+
+# Mistura de tráfego de uma partida: muito gameplay e catálogo, pouco admin
+SCENARIOS = (
+    Scenario("public", "POST", "/api/auth/login", None, 5, {"email": "jogador1@example.com", "password": "senha"}),
+    Scenario("public", "GET", "/api/teams", None, 15),
+    Scenario("public", "GET", "/api/api/leaderboard/general", None, 10),
+    Scenario("user", "POST", "/api/api/quiz/start", "comum", 10, {"team_id": "team-1"}),
+    Scenario("user", "POST", "/api/api/quiz/answer", "comum", 35, {"session_id": "session-1", "answer": 0}),
+    Scenario("user", "GET", "/api/users/1", "comum", 10),
+    Scenario("user", "GET", "/api/questions", "comum", 10),
+    Scenario("admin", "POST", "/api/questions", "admin", 2, {"statement": "Nova pergunta", "team_id": "team-1"}),
+    Scenario("admin", "GET", "/api/gateway/pools", "admin", 3),
+)
+
+
+def build_plan(requests: int, seed: int) -> List[Scenario]:
+    """Sequência de cenários sorteada pelos pesos (a mesma para a mesma semente)"""
+    rng = random.Random(seed)
+    return rng.choices(SCENARIOS, weights=[scenario.weight for scenario in SCENARIOS], k=requests)
+
+
+def percentile(samples: List[int], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] / 1_000_000
+
+
+class Runner:
+    """Cliente em processo do gateway, com um token por role"""
+
+    def __init__(self, app):
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway")
+        self.headers = {role: {"Authorization": f"Bearer {mint_token(role=role)}"} for role in ("comum", "admin")}
+
+    async def call(self, scenario: Scenario) -> int:
+        response = await self.client.request(
+            scenario.method,
+            scenario.path,
+            json=scenario.body,
+            headers=self.headers.get(scenario.role),
+        )
+        return response.status_code
+
+    async def load(self, plan: List[Scenario], concurrency: int):
+        """Executa o plano com `concurrency` clientes simultâneos"""
+        latencies: Dict[str, List[int]] = defaultdict(list)
+        statuses: Counter = Counter()
+        position = 0
+
+        async def worker():
+            nonlocal position
+            while position < len(plan):
+                scenario = plan[position]
+                position += 1
+                start = time.perf_counter_ns()
+                status_code = await self.call(scenario)
+                latencies[scenario.kind].append(time.perf_counter_ns() - start)
+                statuses[f"{status_code // 100}xx"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - started
+
+    async def allocations(self, plan: List[Scenario]) -> Dict[str, float]:
+        """Passada sequencial com tracemalloc: pico alocado e blocos retidos por requisição"""
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        peaks = []
+        for scenario in plan:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            await self.call(scenario)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        tracemalloc.stop()
+        gc.collect()
+        return {
+            "peak_kib_per_request": sum(peaks) / len(peaks) / 1024,
+            "retained_blocks_per_request": (sys.getallocatedblocks() - blocks_before) / len(plan),
+        }
+
+
+def summarize(latencies: Dict[str, List[int]], elapsed: float) -> Dict[str, Dict[str, float]]:
+    groups = dict(latencies)
+    groups["total"] = [sample for samples in latencies.values() for sample in samples]
+    return {
+        kind: {
+            "requests": len(samples),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+        }
+        for kind, samples in groups.items()
+    }
+
+
+async def main(
+    requests: int,
+    concurrency: int,
+    latency_ms: float,
+    slow_rate: float,
+    slow_ms: float,
+    seed: int,
+    output: Optional[str],
+) -> None:
+    import main as gateway_main
+    from app.routers.gateway import proxy_service
+
+    stubs = install_stubs(proxy_service, latency_ms, slow_rate, slow_ms)
+    app = gateway_main.app
+    async with app.router.lifespan_context(app):
+        runner = Runner(app)
+        await runner.load(build_plan(min(500, requests), seed + 1), concurrency)  # aquecimento
+        latencies, statuses, elapsed = await runner.load(build_plan(requests, seed), concurrency)
+        allocations = await runner.allocations(build_plan(min(1000, requests), seed + 2))
+        await runner.client.aclose()
+
+    results = summarize(latencies, elapsed)
+    print(f"\n{requests} requisições, {concurrency} clientes, latência dos stubs {latency_ms} ms")
+    if slow_rate:
+        print(f"cauda: {slow_rate:.1%} das chamadas com {slow_ms} ms")
+    print(f"{'tráfego':10} {'req':>7} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for kind in ("public", "user", "admin", "total"):
+        if kind not in results:
+            continue
+        row = results[kind]
+        print(
+            f"{kind:10} {row['requests']:>7} {row['rps']:>9.0f} {row['p50_ms']:>9.3f} "
+            f"{row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f}"
+        )
+    print(f"status: {dict(sorted(statuses.items()))}")
+    print(f"chamadas aos stubs: {stub_calls(stubs)}")
+    print(
+        f"memória por requisição: pico {allocations['peak_kib_per_request']:.1f} KiB, "
+        f"{allocations['retained_blocks_per_request']:.2f} blocos retidos"
+    )
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(
+                {
+                    "requests": requests,
+                    "concurrency": concurrency,
+                    "latency_ms": latency_ms,
+                    "slow_rate": slow_rate,
+                    "slow_ms": slow_ms,
+                    "results": results,
+                    "statuses": dict(statuses),
+                    "allocations": allocations,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latência simulada dos microsserviços")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fração das chamadas com --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="latência das chamadas lentas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="output", help="salva o resultado para comparar entre commits")
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.requests, args.concurrency, args.latency_ms, args.slow_rate, args.slow_ms, args.seed, args.output,
+    ))
@@ -0,0 +1,109 @@
+"""
+Microbenchmark da verificação de um token JWT
+
+Compara o custo por token (sem o cache de tokens) de:
+- jose HS256: caminho atual do gateway (JWT_SECRET compartilhado)
+- jose ES256: o mesmo token assimétrico verificado pelo python-jose
+- JWKS ES256 / JWKS EdDSA: app/services/jwks.py (cryptography direto, chave do JWKS já desserializada)
+
+Uso (a partir de backend/api-gateway):
+    python -m benchmarks.bench_jwt [--tokens 5000]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwt
+
+from app.services.jwks import JwksKeySet, verify_token
+
+SECRET = "default-secret-change-in-production"
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def claims(index: int) -> dict:
+    return {"sub": str(index), "role": "comum", "exp": int(time.time()) + 3600, "type": "access"}
+
+
+async def measure(verify: Callable[[str], Awaitable], tokens: List[str]) -> List[int]:
+    samples = []
+    for token in tokens:
+        start = time.perf_counter_ns()
+        await verify(token)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def percentile(samples: List[int], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] / 1000
+
+
+async def main(count: int) -> None:
+    ec_private = ec.generate_private_key(ec.SECP256R1())
+    ec_pem = ec_private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    ec_public_pem = ec_private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    numbers = ec_private.public_key().public_numbers()
+    ed_private = ed25519.Ed25519PrivateKey.generate()
+    ed_public = ed_private.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+    key_set = JwksKeySet("http://auth-service/.well-known/jwks.json")
+    key_set.load({"keys": [
+        {"kty": "EC", "crv": "P-256", "kid": "ec", "x": b64(numbers.x.to_bytes(32, "big")),
+         "y": b64(numbers.y.to_bytes(32, "big"))},
+        {"kty": "OKP", "crv": "Ed25519", "kid": "ed", "x": b64(ed_public)},
+    ]})
+
+    def eddsa_token(index: int) -> str:
+        header = b64(json.dumps({"alg": "EdDSA", "typ": "JWT", "kid": "ed"}).encode())
+        body = b64(json.dumps(claims(index)).encode())
+        return f"{header}.{body}.{b64(ed_private.sign(f'{header}.{body}'.encode()))}"
+
+    # Tokens distintos: nenhum caminho se beneficia de memo
+    hs256 = [jwt.encode(claims(i), SECRET, algorithm="HS256") for i in range(count)]
+    es256 = [jwt.encode(claims(i), ec_pem, algorithm="ES256", headers={"kid": "ec"}) for i in range(count)]
+    eddsa = [eddsa_token(i) for i in range(count)]
+
+    async def jose_hs256(token):
+        return jwt.decode(token, SECRET, algorithms=["HS256"])
+
+    async def jose_es256(token):
+        return jwt.decode(token, ec_public_pem, algorithms=["ES256"])
+
+    async def jwks_verify(token):
+        return await verify_token(token, key_set)
+
+    print(f"{'verificação':18} {'p50 (µs)':>10} {'p99 (µs)':>10} {'média (µs)':>11}")
+    for name, verify, tokens in (
+        ("jose HS256", jose_hs256, hs256),
+        ("jose ES256", jose_es256, es256),
+        ("JWKS ES256", jwks_verify, es256),
+        ("JWKS EdDSA", jwks_verify, eddsa),
+    ):
+        await measure(verify, tokens[: min(200, count)])  # aquecimento
+        samples = await measure(verify, tokens)
+        print(
+            f"{name:18} {percentile(samples, 50):>10.1f} "
+            f"{percentile(samples, 99):>10.1f} {statistics.mean(samples) / 1000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens))
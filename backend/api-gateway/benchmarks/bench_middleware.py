@@ -0,0 +1,152 @@
+"""
+Microbenchmark dos middlewares de autenticação/autorização do gateway
+
+Compara o overhead por requisição (p50/p99) da implementação antiga, baseada em
+BaseHTTPMiddleware, com os middlewares ASGI puros de app/middleware.
+
+Uso (a partir de backend/api-gateway):
+    python -m benchmarks.bench_middleware [--requests 5000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List
+
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.middleware.casbin_authz import CasbinAuthzMiddleware, PUBLIC_PREFIXES
+from app.middleware.jwt_auth import JwtAuthMiddleware, PUBLIC_ROUTES
+from app.services.public_routes import PublicRoutes
+
+
+async def endpoint(scope, receive, send):
+    """Aplicação ASGI mínima (simula o router sem custo)"""
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class LegacyJwtAuthMiddleware(BaseHTTPMiddleware):
+    """Réplica da implementação anterior (BaseHTTPMiddleware) para comparação"""
+
+    def __init__(self, app, public_routes=PUBLIC_ROUTES):
+        super().__init__(app)
+        self.public_routes = PublicRoutes(public_routes)
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        path = request.url.path
+        if self.public_routes.matches(path, request.method):
+            return await call_next(request)
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return JSONResponse(status_code=401, content={"detail": "Token não fornecido"})
+        payload = jwt.decode(auth_header.split(" ")[1], settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        request.state.user_id = payload.get("sub") or payload.get("userId")
+        request.state.user_role = payload.get("role", "comum")
+        request.state.user = payload
+        return await call_next(request)
+
+
+class LegacyCasbinAuthzMiddleware(BaseHTTPMiddleware):
+    """Réplica da implementação anterior (BaseHTTPMiddleware) para comparação"""
+
+    def __init__(self, app, public_prefixes):
+        super().__init__(app)
+        self.inner = CasbinAuthzMiddleware(app, public_prefixes)
+        self.inner._init_enforcer()
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        path = request.url.path
+        if self.inner.public_routes.matches(path, request.method):
+            return await call_next(request)
+        user_role = getattr(request.state, "user_role", None)
+        if not user_role:
+            return JSONResponse(status_code=403, content={"detail": "Acesso negado: autenticação necessária"})
+        allowed = self.inner.enforcer.enforce(user_role, path, request.method)
+        if not allowed:
+            parts = path.split("/")
+            if len(parts) > 3:
+                allowed = self.inner.enforcer.enforce(user_role, "/".join(parts[:-1]) + "/*", request.method)
+        if not allowed:
+            return JSONResponse(status_code=403, content={"detail": "Acesso negado"})
+        return await call_next(request)
+
+
+def build_stack(legacy: bool):
+    """Monta JWT (externo) -> Casbin -> endpoint com as listas públicas reais"""
+    if legacy:
+        casbin = LegacyCasbinAuthzMiddleware(endpoint, PUBLIC_PREFIXES)
+        return LegacyJwtAuthMiddleware(casbin, PUBLIC_ROUTES)
+    casbin = CasbinAuthzMiddleware(endpoint, PUBLIC_PREFIXES)
+    casbin._init_enforcer()
+    return JwtAuthMiddleware(casbin, PUBLIC_ROUTES)
+
+
+def make_scope(path: str, token: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"gateway"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("gateway", 3000),
+    }
+
+
+async def run(app, path: str, token: str, requests: int) -> List[int]:
+    """Executa `requests` chamadas e devolve a latência de cada uma em ns"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    samples = []
+    for _ in range(requests):
+        scope = make_scope(path, token)
+        start = time.perf_counter_ns()
+        await app(scope, receive, send)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def percentile(samples: List[int], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] / 1000
+
+
+async def main(requests: int) -> None:
+    token = jwt.encode({"sub": "1", "role": "comum"}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    scenarios = [
+        ("rota pública", "/health"),
+        ("rota protegida (JWT + Casbin)", "/api/teams/123"),
+    ]
+    print(f"{'cenário':32} {'implementação':16} {'p50 (µs)':>10} {'p99 (µs)':>10} {'média (µs)':>11}")
+    for label, path in scenarios:
+        for legacy in (True, False):
+            app = build_stack(legacy)
+            await run(app, path, token, min(500, requests))  # aquecimento
+            samples = await run(app, path, token, requests)
+            name = "BaseHTTP" if legacy else "ASGI puro"
+            print(
+                f"{label:32} {name:16} {percentile(samples, 50):>10.1f} "
+                f"{percentile(samples, 99):>10.1f} {statistics.mean(samples) / 1000:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
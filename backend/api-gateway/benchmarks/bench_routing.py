@@ -0,0 +1,143 @@
+"""
+Microbenchmark da resolução de rotas do gateway
+
+Compara, por requisição, o router antigo (um `api_route` por prefixo,
+testados em ordem com regex, seguido de ProxyService._build_target_url) com a
+trie de prefixos de app/services/route_table.py e suas URLs pré-computadas.
+
+Uso (a partir de backend/api-gateway):
+    python -m benchmarks.bench_routing [--requests 20000]
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+from fastapi import APIRouter
+from starlette.requests import Request
+from starlette.routing import Match
+
+from app.services.proxy import ProxyService
+from app.services.route_table import ROUTE_TABLE, RouteTable
+
+ALL = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+# Réplica dos handlers antigos: (path, métodos, serviço, função que monta o path no serviço)
+LEGACY_ROUTES: List[Tuple[str, List[str], str, Callable[[str], str]]] = [
+    ("/auth/{path:path}", ALL, "auth", lambda p: p),
+    ("/password/forgot", ["POST"], "user", lambda p: "password/forgot"),
+    ("/password/reset", ["POST"], "user", lambda p: "password/reset"),
+    ("/password/validate-token", ["GET"], "user", lambda p: "password/validate-token"),
+    ("/users", ["POST"], "user", lambda p: ""),
+    ("/users/{path:path}", ALL, "user", lambda p: p),
+    ("/user/{path:path}", ALL, "user", lambda p: p),
+    ("/api/quiz/{path:path}", ["GET", "POST", "PUT", "DELETE", "OPTIONS"], "quiz", lambda p: f"quizzes/{p}"),
+    ("/api/leaderboard/{path:path}", ["GET", "OPTIONS"], "quiz", lambda p: f"api/leaderboard/{p}"),
+    ("/quiz/{path:path}", ALL, "quiz", lambda p: p),
+    ("/teams/{path:path}", ALL, "quiz", lambda p: f"teams/{p}" if p else "teams"),
+    ("/teams", ALL, "quiz", lambda p: "teams"),
+    ("/questions/{path:path}", ALL, "quiz", lambda p: f"questions/{p}" if p else "questions"),
+    ("/questions", ALL, "quiz", lambda p: "questions"),
+    ("/answers/{path:path}", ALL, "quiz", lambda p: f"answers/{p}" if p else "answers"),
+    ("/answers", ALL, "quiz", lambda p: "answers"),
+    ("/quizzes-admin/{path:path}", ALL, "quiz", lambda p: f"quizzes-admin/{p}" if p else "quizzes-admin"),
+    ("/quizzes-admin", ALL, "quiz", lambda p: "quizzes-admin"),
+]
+
+# Mistura de tráfego: do primeiro ao último handler da lista antiga
+SAMPLE_REQUESTS = [
+    ("POST", "/api/auth/login"),
+    ("GET", "/api/users/42"),
+    ("POST", "/api/api/quiz/answer"),
+    ("GET", "/api/api/leaderboard/general"),
+    ("GET", "/api/teams"),
+    ("GET", "/api/questions/65f0c2"),
+    ("GET", "/api/quizzes-admin"),
+]
+
+
+def build_legacy_router():
+    router = APIRouter()
+
+    async def endpoint():
+        return None
+
+    for path, methods, _, _ in LEGACY_ROUTES:
+        router.add_api_route(path, endpoint, methods=methods)
+    prefixed = APIRouter()
+    prefixed.include_router(router, prefix="/api")
+    # Mesmo índice da réplica para achar serviço e montagem do path
+    return list(zip(prefixed.routes, LEGACY_ROUTES))
+
+
+def make_scope(method: str, path: str) -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+    }
+
+
+def legacy_resolve(routes, proxy: ProxyService, scope: dict) -> str:
+    """Laço do Starlette Router + montagem antiga da URL"""
+    for route, (_, _, service, build_path) in routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            path = build_path(child_scope["path_params"].get("path", ""))
+            request = Request(scope)
+            return proxy._build_target_url(service, proxy.SERVICE_URLS[service], path, request)
+    raise LookupError(scope["path"])
+
+
+def table_resolve(table: RouteTable, scope: dict) -> str:
+    route, remainder = table.lookup(scope["path"])
+    return table.target_url(route, remainder, "")
+
+
+def measure(resolve: Callable[[dict], str], scopes: List[dict], requests: int) -> List[int]:
+    samples = []
+    for index in range(requests):
+        scope = scopes[index % len(scopes)]
+        start = time.perf_counter_ns()
+        resolve(scope)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def percentile(samples: List[int], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] / 1000
+
+
+def main(requests: int) -> None:
+    proxy = ProxyService()
+    legacy_routes = build_legacy_router()
+    table = RouteTable(ROUTE_TABLE, ProxyService.SERVICE_URLS)
+    scopes = [make_scope(method, path) for method, path in SAMPLE_REQUESTS]
+
+    # As duas implementações precisam chegar à mesma URL
+    for scope in scopes:
+        assert legacy_resolve(legacy_routes, proxy, scope) == table_resolve(table, scope), scope["path"]
+
+    print(f"{'implementação':24} {'p50 (µs)':>10} {'p99 (µs)':>10} {'média (µs)':>11}")
+    for name, resolve in (
+        ("router antigo", lambda scope: legacy_resolve(legacy_routes, proxy, scope)),
+        ("trie de prefixos", lambda scope: table_resolve(table, scope)),
+    ):
+        measure(resolve, scopes, min(2000, requests))  # aquecimento
+        samples = measure(resolve, scopes, requests)
+        print(
+            f"{name:24} {percentile(samples, 50):>10.2f} "
+            f"{percentile(samples, 99):>10.2f} {statistics.mean(samples) / 1000:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,117 @@
+"""
+Microsserviços simulados para os benchmarks do gateway
+
+Cada serviço (auth, user, quiz) é um handler em processo plugado no
+httpx.AsyncClient do ProxyService via MockTransport: o gateway roda inteiro
+(middlewares, tabela de rotas, cache, compressão, breakers), só a rede com os
+microsserviços sai do caminho. As respostas são fixas e montadas uma vez.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from jose import jwt
+
+from app.config import settings
+from app.services.proxy import ProxyService
+
+
+def mint_token(user_id: str = "1", role: str = "comum", ttl_seconds: int = 3600) -> str:
+    """JWT assinado com o mesmo JWT_SECRET/JWT_ALGORITHM que o gateway valida"""
+    now = int(time.time())
+    payload = {"sub": user_id, "role": role, "iat": now, "exp": now + ttl_seconds}
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+TEAMS = [{"id": f"team-{index}", "name": f"Time {index}", "country": "Brasil"} for index in range(20)]
+QUESTIONS = [
+    {
+        "id": f"question-{index}",
+        "statement": f"Qual time venceu o campeonato de {1990 + index}?",
+        "options": ["Time A", "Time B", "Time C", "Time D"],
+        "team_id": f"team-{index % 20}",
+    }
+    for index in range(50)
+]
+LEADERBOARD = [{"user_id": str(index), "name": f"Jogador {index}", "points": 1000 - index} for index in range(50)]
+
+# (método, path no microsserviço) -> (status, corpo)
+ROUTES: Dict[str, Dict[Tuple[str, str], Tuple[int, bytes]]] = {
+    "auth": {
+        ("POST", "/auth/logout"): (200, _json({"message": "Logout realizado"})),
+    },
+    "user": {
+        ("GET", "/users/1"): (200, _json({"id": "1", "name": "Jogador 1", "email": "jogador1@example.com"})),
+    },
+    "quiz": {
+        ("GET", "/teams"): (200, _json(TEAMS)),
+        ("GET", "/questions"): (200, _json(QUESTIONS)),
+        ("POST", "/questions"): (201, _json(QUESTIONS[0])),
+        ("POST", "/quizzes/start"): (200, _json({"session_id": "session-1", "question": QUESTIONS[0]})),
+        ("POST", "/quizzes/answer"): (200, _json({"correct": True, "points": 10, "next_question": QUESTIONS[1]})),
+        ("GET", "/api/leaderboard/general"): (200, _json(LEADERBOARD)),
+    },
+}
+
+NOT_FOUND = (404, _json({"detail": "Not Found"}))
+
+
+class StubService:
+    """Handler do MockTransport de um microsserviço"""
+
+    def __init__(self, service: str, latency_ms: float = 0.0, slow_rate: float = 0.0, slow_ms: float = 0.0):
+        self.service = service
+        self.routes = ROUTES[service]
+        self.latency = latency_ms / 1000
+        # Cauda de latência: uma fração das chamadas demora slow_ms
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000
+        self._random = random.Random(service)
+        self.calls = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        latency = self.latency
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            latency = self.slow
+        if latency:
+            await asyncio.sleep(latency)
+        if self.service == "auth" and request.url.path == "/auth/login":
+            status_code, body = 200, _json({"access_token": mint_token(), "token_type": "bearer"})
+        else:
+            status_code, body = self.routes.get((request.method, request.url.path), NOT_FOUND)
+
+        async def chunks():
+            # Corpo em stream, como o de uma conexão real
+            yield body
+
+        return httpx.Response(
+            status_code,
+            headers={"content-type": "application/json", "content-length": str(len(body))},
+            content=chunks(),
+        )
+
+
+def install_stubs(
+    proxy: ProxyService,
+    latency_ms: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_ms: float = 0.0,
+) -> Dict[str, StubService]:
+    """Troca os clientes HTTP do ProxyService pelos serviços simulados"""
+    stubs = {}
+    for service in proxy.SERVICE_URLS:
+        stub = stubs[service] = StubService(service, latency_ms, slow_rate, slow_ms)
+        proxy.clients[service] = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    return stubs
+
+
+def stub_calls(stubs: Optional[Dict[str, StubService]]) -> Dict[str, int]:
+    return {service: stub.calls for service, stub in (stubs or {}).items()}
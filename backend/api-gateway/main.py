@@ -7,20 +7,50 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.drain import DrainMiddleware
 from app.middleware.jwt_auth import JwtAuthMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.tracing import TracingMiddleware
 from app.middleware.casbin_authz import CasbinAuthzMiddleware
-from app.routers import gateway
+from app.routers import gateway, admin, batch, health, metrics
+from app.services.access_log import start_logging, stop_logging
+from app.services import jwks, rate_limit
+from app.services.drain import drain_controller
+from app.services.policy_store import policy_store
+from app.services.tracing import tracer
 from app.config import settings
 
 # Configurar middlewares de forma global
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    if settings.ACCESS_LOG_ENABLED:
+        start_logging()
+    if jwks.key_set is not None:
+        # Chaves públicas do auth-service (ES256/EdDSA); recarga em background
+        await jwks.key_set.start()
+    # Políticas Casbin compiladas antes da primeira requisição; policy.csv observado para recarga
+    await policy_store.start(watch=settings.CASBIN_POLICY_WATCH)
     print(f"API Gateway iniciado na porta {settings.PORT}")
     print(f"Documentação disponível em: http://localhost:{settings.PORT}/docs")
     yield
-    # Shutdown
-    print("API Gateway encerrado")
+    # Shutdown: o servidor já parou de aceitar conexões, então não há espera de readiness
+    # (para drenar antes, com readiness desligada, use POST /api/gateway/drain)
+    report = await drain_controller.drain(
+        grace_seconds=0,
+        timeout_seconds=settings.DRAIN_TIMEOUT_SECONDS,
+        close=gateway.proxy_service.close,
+    )
+    print(f"API Gateway encerrado (drenagem: {report})")
+    if jwks.key_set is not None:
+        await jwks.key_set.stop()
+    await policy_store.stop()
+    if rate_limit.rate_limiter is not None:
+        await rate_limit.rate_limiter.backend.close()
+    tracer.close()
+    stop_logging()
 
 
 app = FastAPI(
@@ -42,12 +72,31 @@ app.add_middleware(
 # Adicionar middlewares de autenticação e autorização
 # IMPORTANTE: Ordem de execução - JWT executa primeiro para extrair user_role,
 # depois Casbin verifica permissões baseado no role
-# No FastAPI/Starlette, middlewares executam na ordem de adição quando a requisição entra
-app.add_middleware(JwtAuthMiddleware)  # Executa primeiro - extrai user_role
+# No FastAPI/Starlette, o último middleware adicionado é o mais externo,
+# ou seja, é o primeiro a receber a requisição
 app.add_middleware(CasbinAuthzMiddleware)  # Executa depois - verifica permissões
+if settings.RATE_LIMIT_ENABLED:
+    # Entre JWT e Casbin: precisa do user_id e recusa excesso antes da autorização
+    app.add_middleware(RateLimitMiddleware)
+app.add_middleware(JwtAuthMiddleware)  # Executa primeiro - extrai user_role
+# Conta requisições em andamento e recusa novas durante a drenagem
+app.add_middleware(DrainMiddleware)
+# Span raiz e X-Request-ID (dentro do access log, que registra os dois)
+app.add_middleware(TracingMiddleware)
+# Access log por fora de tudo: mede autenticação, autorização e proxy
+app.add_middleware(AccessLogMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
-# Registrar rotas do gateway
-app.include_router(gateway.router, prefix="/api")
+# Registrar rotas próprias do gateway
+app.include_router(health.router)
+app.include_router(admin.router, prefix="/api")
+app.include_router(batch.router, prefix="/api")
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+# Proxy para os microsserviços (tabela de prefixos); por último, para não
+# encobrir as rotas acima
+app.router.routes.append(gateway.dispatcher)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+Testes do access log estruturado (um registro JSON por requisição)
+"""
+import io
+import json
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.jwt_auth import JwtAuthMiddleware
+from app.services.access_log import LogPipeline, annotate
+
+
+async def endpoint(request):
+    annotate(request.scope, upstream="quiz")
+    return PlainTextResponse("ok")
+
+
+def make_app(sample_rate: float):
+    app = Starlette(routes=[Route("/api/teams", endpoint, methods=["GET", "POST"])])
+    return AccessLogMiddleware(
+        JwtAuthMiddleware(app, public_routes=("/api/teams",)),
+        sample_rate=sample_rate,
+        always_log_errors=True,
+    )
+
+
+async def run_requests(app, requests):
+    output = io.StringIO()
+    pipeline = LogPipeline(stream=output)
+    pipeline.start()
+    try:
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            for method, path, body in requests:
+                await client.request(method, path, content=body)
+    finally:
+        pipeline.stop()
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+async def test_one_record_per_request_with_annotations():
+    records = await run_requests(make_app(1.0), [("POST", "/api/teams", b"12345")])
+
+    assert len(records) == 1
+    record = records[0]
+    assert record["type"] == "access"
+    assert (record["method"], record["path"], record["status"]) == ("POST", "/api/teams", 200)
+    assert (record["bytes_in"], record["bytes_out"]) == (5, 2)
+    assert (record["authn"], record["upstream"], record["client"]) == ("public", "quiz", "10.0.0.1")
+    assert record["duration_ms"] >= 0
+
+
+async def test_sampling_keeps_errors():
+    records = await run_requests(
+        make_app(0.0),
+        [("GET", "/api/teams", b""), ("GET", "/api/users/1", b"")],
+    )
+
+    assert [(r["path"], r["status"], r["authn"]) for r in records] == [("/api/users/1", 401, "missing")]
@@ -0,0 +1,71 @@
+"""
+Testes das operações administrativas do gateway (drenagem e recarga de políticas)
+"""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routers import admin
+
+
+class FakeDrain:
+    def __init__(self):
+        self.calls = 0
+
+    async def drain(self, **kwargs):
+        self.calls += 1
+        return {"drained": 0}
+
+
+class FakeStore:
+    def __init__(self):
+        self.reloads = 0
+
+    async def reload(self):
+        self.reloads += 1
+        return True
+
+    def stats(self):
+        return {"version": 1}
+
+
+def with_role(app, role):
+    """Simula o JwtAuthMiddleware (role no scope["state"]); None = sem token"""
+    async def wrapper(scope, receive, send):
+        if role is not None:
+            scope.setdefault("state", {})["user_role"] = role
+        await app(scope, receive, send)
+
+    return wrapper
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    drain, store = FakeDrain(), FakeStore()
+    monkeypatch.setattr(admin, "drain_controller", drain)
+    monkeypatch.setattr(admin, "policy_store", store)
+    return drain, store
+
+
+def make_client(role) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=with_role(app, role)), base_url="http://gateway")
+
+
+@pytest.mark.parametrize("role, status_code", [(None, 401), ("comum", 403)])
+async def test_drain_and_reload_require_admin(fakes, role, status_code):
+    drain, store = fakes
+    async with make_client(role) as client:
+        assert (await client.post("/api/gateway/drain")).status_code == status_code
+        assert (await client.post("/api/gateway/policies/reload")).status_code == status_code
+    # Nada foi executado: o gateway continua recebendo tráfego
+    assert (drain.calls, store.reloads) == (0, 0)
+
+
+async def test_admin_can_drain_and_reload(fakes):
+    drain, store = fakes
+    async with make_client("admin") as client:
+        assert (await client.post("/api/gateway/drain")).json() == {"drained": 0}
+        assert (await client.post("/api/gateway/policies/reload")).json() == {"reloaded": True, "version": 1}
+    assert (drain.calls, store.reloads) == (1, 1)
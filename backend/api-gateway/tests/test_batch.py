@@ -0,0 +1,97 @@
+"""
+Testes do POST /api/batch
+"""
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from jose import jwt
+
+from app.config import settings
+from app.middleware.jwt_auth import JwtAuthMiddleware
+from app.routers import batch
+from app.routers.gateway import proxy_service
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/api/leaderboard/general":
+        status_code, payload = 500, {"detail": "erro no ranking"}
+    else:
+        status_code, payload = 200, {"path": request.url.path, "query": request.url.query.decode()}
+    body = json.dumps(payload).encode()
+
+    async def chunks():
+        yield body
+
+    return httpx.Response(
+        status_code, headers={"content-type": "application/json", "content-length": str(len(body))}, content=chunks()
+    )
+
+
+@pytest.fixture
+def batch_app(monkeypatch):
+    monkeypatch.setitem(proxy_service.clients, "quiz", httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+    monkeypatch.setattr(proxy_service, "response_cache", None)
+    app = FastAPI()
+    app.include_router(batch.router, prefix="/api")
+    return app
+
+
+@pytest.fixture
+def client(batch_app):
+    # Os itens passam pelas políticas do role do token do lote
+    token = jwt.encode({"sub": "1", "role": "comum"}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=JwtAuthMiddleware(batch_app, cache=None, key_set=None)),
+        base_url="http://gateway",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+async def test_items_run_independently_with_own_status(client):
+    response = await client.post(
+        "/api/batch",
+        json={
+            "requests": [
+                {"id": "teams", "path": "/api/teams?page=2"},
+                {"id": "ranking", "path": "/api/api/leaderboard/general"},
+                {"id": "desconhecida", "path": "/api/nao-existe"},
+                {"id": "metodo", "method": "PATCH", "path": "/api/api/leaderboard/general"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = {item["id"]: item for item in response.json()["responses"]}
+    assert [item["id"] for item in response.json()["responses"]] == ["teams", "ranking", "desconhecida", "metodo"]
+
+    assert results["teams"]["status"] == 200
+    assert results["teams"]["body"] == {"path": "/teams", "query": "page=2"}
+    assert results["ranking"]["status"] == 500
+    assert results["desconhecida"]["status"] == 404
+    assert results["metodo"]["status"] == 405
+    assert results["metodo"]["headers"]["allow"] == "GET, OPTIONS"
+
+
+async def test_rejects_batches_over_the_limit(client):
+    items = [{"path": "/api/teams"}] * (settings.BATCH_MAX_ITEMS + 1)
+    response = await client.post("/api/batch", json={"requests": items})
+    assert response.status_code == 413
+
+
+async def test_items_are_authorized_with_the_batch_role(client, batch_app):
+    items = {"requests": [{"id": "criar", "method": "POST", "path": "/api/teams"}, {"id": "ler", "path": "/api/teams"}]}
+
+    results = {item["id"]: item for item in (await client.post("/api/batch", json=items)).json()["responses"]}
+    assert results["criar"]["status"] == 403
+    assert results["ler"]["status"] == 200
+
+    # Sem token o lote é barrado no JWT; e, se chegasse ao router, cada item seria recusado
+    anonymous = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=JwtAuthMiddleware(batch_app, cache=None, key_set=None)),
+        base_url="http://gateway",
+    )
+    assert (await anonymous.post("/api/batch", json=items)).status_code == 401
+    bypass = httpx.AsyncClient(transport=httpx.ASGITransport(app=batch_app), base_url="http://gateway")
+    statuses = [item["status"] for item in (await bypass.post("/api/batch", json=items)).json()["responses"]]
+    assert statuses == [401, 401]
@@ -0,0 +1,91 @@
+"""
+Testes do circuit breaker por microsserviço
+"""
+import httpx
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services.circuit_breaker import BreakerState, CircuitBreaker
+from app.services.proxy import ProxyService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "quiz", window_size=4, min_calls=4, failure_rate_threshold=0.5,
+        slow_call_seconds=1.0, slow_call_rate_threshold=1.0,
+        open_seconds=10, half_open_max_calls=2, clock=clock,
+    )
+
+
+def test_opens_on_error_rate_and_closes_after_probes():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for failed in (False, True, False, True):
+        assert breaker.allow()
+        breaker.record(failed, 0.01)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.allow()  # apenas half_open_max_calls chamadas de teste
+    breaker.record(False, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_slow_calls_open_and_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(False, 2.0)
+    assert breaker.state == BreakerState.OPEN
+
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record(True, 0.01)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.retry_after() == 10
+
+
+async def test_proxy_fails_fast_while_open():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.url.path)
+        raise httpx.ConnectError("connection refused")
+
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.breakers["quiz"] = make_breaker(FakeClock())
+    # Sem retries de conexão: uma tentativa por chamada
+    proxy.hedger = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    def request() -> Request:
+        scope = {"type": "http", "method": "POST", "path": "/api/answers", "query_string": b"", "headers": []}
+        return Request(scope, receive)
+
+    for _ in range(4):
+        with pytest.raises(HTTPException) as exc:
+            await proxy.proxy_request("quiz", "answers", request())
+        assert exc.value.status_code == 502
+
+    with pytest.raises(HTTPException) as exc:
+        await proxy.proxy_request("quiz", "answers", request())
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "10"}
+    assert len(calls) == 4
+    assert proxy.breaker_stats()["quiz"]["state"] == "open"
@@ -0,0 +1,149 @@
+"""
+Testes da compressão de respostas na borda (EdgeCompressor + ProxyService)
+"""
+import gzip
+import json
+
+import httpx
+from fastapi.responses import Response, StreamingResponse
+from starlette.requests import Request
+
+from app.config import settings
+from app.services.compression import EdgeCompressor
+from app.services.proxy import ProxyService
+from app.services.response_cache import ResponseCache
+
+PAYLOAD = json.dumps([{"id": index, "name": f"Time {index}"} for index in range(200)]).encode()
+
+
+def make_request(method: str, path: str, headers=None) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    return Request(scope, receive)
+
+
+def test_negotiate_respects_q_values():
+    compressor = EdgeCompressor()
+    compressor.encodings = ("br", "gzip")
+    assert compressor.negotiate("gzip, deflate, br") == "br"
+    assert compressor.negotiate("br;q=0.5, gzip") == "gzip"
+    assert compressor.negotiate("br;q=0, *") == "gzip"
+    assert compressor.negotiate("identity") is None
+    assert compressor.negotiate(None) is None
+
+
+async def test_skips_small_and_already_encoded_bodies():
+    compressor = EdgeCompressor(min_bytes=1024)
+    small = Response(content=b"{}", media_type="application/json")
+    assert await compressor.compress(small, "gzip") is small
+
+    encoded = Response(content=PAYLOAD, media_type="application/json", headers={"content-encoding": "br"})
+    assert await compressor.compress(encoded, "gzip") is encoded
+
+    image = Response(content=PAYLOAD, media_type="image/png")
+    assert await compressor.compress(image, "gzip") is image
+
+
+async def test_large_bodies_are_compressed_off_loop():
+    compressor = EdgeCompressor(min_bytes=1024, offload_bytes=len(PAYLOAD))
+    response = await compressor.compress(Response(content=PAYLOAD, media_type="application/json"), "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(response.body)
+    assert gzip.decompress(response.body) == PAYLOAD
+    assert compressor.offloaded == 1
+
+
+async def test_cached_get_reuses_compressed_body():
+    calls = []
+
+    def handler(request: httpx.Request):
+        # O gateway negocia a codificação: o microsserviço não recebe Accept-Encoding
+        calls.append(request.headers.get("accept-encoding"))
+
+        async def chunks():
+            yield PAYLOAD
+
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json", "content-length": str(len(PAYLOAD))},
+            content=chunks(),
+        )
+
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.response_cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    proxy.compressor = EdgeCompressor(min_bytes=1024)
+
+    headers = {"accept-encoding": "gzip"}
+    first = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams", headers))
+    second = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams", headers))
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.body == first.body
+    assert gzip.decompress(second.body) == PAYLOAD
+    assert proxy.compressor.cache_hits == 1
+    assert calls == ["identity"]
+
+    # ETag próprio da versão gzip: o cliente revalida com ele e recebe 304
+    revalidated = await proxy.proxy_request(
+        "quiz", "teams", make_request("GET", "/api/teams", {**headers, "if-none-match": first.headers["etag"]})
+    )
+    assert first.headers["etag"].endswith('-gzip"')
+    assert revalidated.status_code == 304
+
+    identity = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    assert identity.body == PAYLOAD
+    assert "content-encoding" not in identity.headers
+
+
+async def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    # Acima de PROXY_STREAM_THRESHOLD_BYTES: o proxy repassa em streaming
+    payload = json.dumps([{"id": index, "name": f"Time {index}"} for index in range(5000)]).encode()
+    assert len(payload) > settings.PROXY_STREAM_THRESHOLD_BYTES
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.headers.get("accept-encoding"))
+
+        async def chunks():
+            for start in range(0, len(payload), 16384):
+                yield payload[start:start + 16384]
+
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json", "content-length": str(len(payload))},
+            content=chunks(),
+        )
+
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.response_cache = None
+    proxy.compressor = EdgeCompressor(min_bytes=1024)
+
+    response = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams", {"accept-encoding": "gzip"}))
+    assert isinstance(response, StreamingResponse)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in response.headers
+
+    parts = [chunk async for chunk in response.body_iterator]
+    assert len(parts) > 1  # um pedaço comprimido por chunk do microsserviço, sem bufferizar
+    body = b"".join(parts)
+    assert gzip.decompress(body) == payload
+    assert len(body) < len(payload) // 4
+    assert calls == ["identity"]
+    stats = proxy.compressor.stats()
+    assert (stats["streamed"], stats["bytes_in"], stats["bytes_out"]) == (1, len(payload), len(body))
+
+    # Cliente sem gzip recebe o stream original
+    plain = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    assert b"".join([chunk async for chunk in plain.body_iterator]) == payload
+    assert "content-encoding" not in plain.headers
@@ -0,0 +1,84 @@
+"""
+Testes da drenagem do gateway (DrainController + DrainMiddleware)
+"""
+import asyncio
+
+from app.middleware.drain import DrainMiddleware
+from app.routers import health
+from app.services.drain import DrainController
+
+
+def make_scope(path: str) -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+
+
+async def call(app, path: str) -> int:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(make_scope(path), receive, send)
+    return messages[0]["status"]
+
+
+def make_app(release: asyncio.Event):
+    async def endpoint(scope, receive, send):
+        if scope["path"] == "/lenta":
+            await asyncio.sleep(60)
+        else:
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return endpoint
+
+
+async def test_drain_waits_for_in_flight_then_aborts_and_closes():
+    controller = DrainController()
+    release = asyncio.Event()
+    app = DrainMiddleware(make_app(release), controller)
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    quick = asyncio.create_task(call(app, "/api/teams"))
+    slow = asyncio.create_task(call(app, "/lenta"))
+    await asyncio.sleep(0)
+    assert controller.in_flight == 2
+
+    drain = controller.drain(grace_seconds=0, timeout_seconds=0.2, close=close)
+    await asyncio.sleep(0.01)
+    # Requisição nova durante a drenagem é recusada; sondas continuam respondendo
+    assert await call(app, "/api/teams") == 503
+    release.set()
+
+    report = await drain
+    assert await quick == 200
+    assert slow.cancelled()
+    assert (report["drained"], report["aborted"], report["refused"]) == (1, 1, 1)
+    assert closed == [True]
+    # Idempotente: o lifespan recebe o mesmo relatório
+    assert await controller.drain(grace_seconds=0, timeout_seconds=1) is report
+
+
+async def test_readiness_flips_before_requests_are_refused(monkeypatch):
+    controller = DrainController()
+    monkeypatch.setattr(health, "drain_controller", controller)
+    release = asyncio.Event()
+    release.set()
+    app = DrainMiddleware(make_app(release), controller)
+
+    assert (await health.ready()) == {"status": "ready"}
+    drain = controller.drain(grace_seconds=0.1, timeout_seconds=1)
+    await asyncio.sleep(0.01)
+
+    # Período de graça: fora do balanceador, mas ainda atendendo
+    assert (await health.ready()).status_code == 503
+    assert await call(app, "/api/teams") == 200
+    await drain
+    assert await call(app, "/api/teams") == 503
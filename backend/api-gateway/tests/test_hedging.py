@@ -0,0 +1,106 @@
+"""
+Testes do hedging e dos retries de conexão (UpstreamHedger)
+"""
+import asyncio
+
+import httpx
+
+from starlette.requests import Request
+
+from app.services.hedging import UpstreamHedger, hedge_key
+from app.services.proxy import ProxyService
+
+
+def make_hedger(**overrides) -> UpstreamHedger:
+    options = {"hedge_min_samples": 5, "hedge_min_delay_seconds": 0.01, "retry_backoff_seconds": 0.001}
+    options.update(overrides)
+    return UpstreamHedger(**options)
+
+
+async def test_slow_get_is_hedged_and_loser_cancelled():
+    hedger = make_hedger()
+    key = hedge_key("GET", "/api/api/leaderboard/global")
+    for _ in range(5):
+        hedger._window(key).observe(0.005)
+    cancelled = []
+    calls = 0
+
+    async def attempt():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return httpx.Response(200, content=b"hedge")
+
+    response = await hedger.call("quiz", attempt, replayable=True, key=key)
+    await asyncio.sleep(0)
+
+    assert response.content == b"hedge"
+    assert (hedger.hedges, hedger.hedge_wins) == (1, 1)
+    assert cancelled == [True]
+    # Escritas e rotas fora da lista nunca são duplicadas
+    assert hedge_key("POST", "/api/questions") is None
+    assert hedge_key("GET", "/api/teams") is None
+
+
+async def test_connect_errors_are_retried_within_budget():
+    hedger = make_hedger(retry_attempts=2, budget_max_tokens=2, budget_ratio=0)
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise httpx.ConnectError("recusada")
+        return httpx.Response(200)
+
+    assert (await hedger.call("quiz", flaky, replayable=True)).status_code == 200
+    assert hedger.retries == 2
+
+    async def down():
+        raise httpx.ConnectError("recusada")
+
+    # Orçamento gasto: a falha volta na primeira tentativa, sem novo retry
+    try:
+        await hedger.call("quiz", down, replayable=True)
+    except httpx.ConnectError:
+        pass
+    assert (hedger.retries, hedger.budget_exhausted) == (2, 1)
+
+
+def make_request() -> Request:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "method": "GET", "path": "/api/questions", "query_string": b"", "headers": []}
+    return Request(scope, receive)
+
+
+async def test_proxy_retries_connect_error_once_for_the_breaker():
+    calls = []
+
+    async def body():
+        yield b"[]"
+
+    def handler(request: httpx.Request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            raise httpx.ConnectError("recusada")
+        return httpx.Response(200, headers={"content-length": "2"}, content=body())
+
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.response_cache = None
+    proxy.hedger = make_hedger()
+
+    response = await proxy.proxy_request("quiz", "questions", make_request())
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    # Uma chamada lógica para o circuit breaker e o contador de em andamento
+    assert len(proxy.breakers["quiz"]._window) == 1
+    assert proxy.in_flight["quiz"] == 0
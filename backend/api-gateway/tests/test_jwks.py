@@ -0,0 +1,97 @@
+"""
+Testes da verificação de JWT assimétrico com JWKS (app/services/jwks.py)
+"""
+import base64
+import json
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.services.jwks import JwksKeySet, verify_token
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def ec_key(kid: str):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    numbers = private_key.public_key().public_numbers()
+    jwk = {
+        "kty": "EC", "crv": "P-256", "kid": kid, "alg": "ES256", "use": "sig",
+        "x": b64(numbers.x.to_bytes(32, "big")), "y": b64(numbers.y.to_bytes(32, "big")),
+    }
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return pem, jwk
+
+
+def es256_token(pem: str, kid: str, **claims) -> str:
+    payload = {"sub": "1", "role": "comum", "exp": int(time.time()) + 60, **claims}
+    return jwt.encode(payload, pem, algorithm="ES256", headers={"kid": kid})
+
+
+async def test_es256_token_is_verified_by_kid():
+    pem, jwk = ec_key("chave-1")
+    key_set = JwksKeySet("http://auth/.well-known/jwks.json")
+    key_set.load({"keys": [jwk]})
+
+    payload = await verify_token(es256_token(pem, "chave-1"), key_set)
+    assert payload["sub"] == "1"
+
+    header, body, signature = es256_token(pem, "chave-1").split(".")
+    forged = b64(json.dumps({"sub": "1", "role": "admin", "exp": int(time.time()) + 60}).encode())
+    with pytest.raises(JWTError):
+        await verify_token(f"{header}.{forged}.{signature}", key_set)
+    with pytest.raises(ExpiredSignatureError):
+        await verify_token(es256_token(pem, "chave-1", exp=int(time.time()) - 10), key_set)
+    # HS256 com a chave pública como segredo (confusão de algoritmo) é recusado
+    with pytest.raises(JWTError):
+        await verify_token(jwt.encode({"sub": "1"}, "segredo", algorithm="HS256", headers={"kid": "chave-1"}), key_set)
+
+
+async def test_eddsa_token_is_verified():
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    public_bytes = private_key.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    key_set = JwksKeySet("http://auth/.well-known/jwks.json")
+    key_set.load({"keys": [{"kty": "OKP", "crv": "Ed25519", "kid": "ed", "x": b64(public_bytes)}]})
+
+    header = b64(json.dumps({"alg": "EdDSA", "kid": "ed"}).encode())
+    body = b64(json.dumps({"sub": "7", "exp": int(time.time()) + 60}).encode())
+    signature = b64(private_key.sign(f"{header}.{body}".encode()))
+    assert (await verify_token(f"{header}.{body}.{signature}", key_set))["sub"] == "7"
+
+
+async def test_unknown_kid_refreshes_at_most_once_per_interval():
+    old_pem, old_jwk = ec_key("antiga")
+    new_pem, new_jwk = ec_key("nova")
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"keys": [old_jwk, new_jwk]})
+
+    now = [1000.0]
+    key_set = JwksKeySet("http://auth/.well-known/jwks.json", min_refresh_seconds=30, clock=lambda: now[0])
+    key_set._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    key_set.load({"keys": [old_jwk]})
+
+    # Chave rotacionada: kid novo dispara a recarga do JWKS
+    assert (await verify_token(es256_token(new_pem, "nova"), key_set))["sub"] == "1"
+    assert calls == ["/.well-known/jwks.json"]
+
+    # Kids inexistentes não geram uma chamada por token
+    for _ in range(3):
+        with pytest.raises(JWTError):
+            await verify_token(es256_token(new_pem, "inventada"), key_set)
+    assert len(calls) == 1
+    now[0] += 31
+    with pytest.raises(JWTError):
+        await verify_token(es256_token(new_pem, "inventada"), key_set)
+    assert len(calls) == 2
@@ -0,0 +1,33 @@
+"""
+Testes das métricas no formato de texto do Prometheus
+"""
+from app.services.metrics import Counter, Histogram, MetricsRegistry, status_class
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("upstream_seconds", "Latência", ("service",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "quiz")
+
+    lines = registry.render().splitlines()
+
+    assert 'upstream_seconds_bucket{service="quiz",le="0.1"} 1' in lines
+    assert 'upstream_seconds_bucket{service="quiz",le="1"} 3' in lines
+    assert 'upstream_seconds_bucket{service="quiz",le="+Inf"} 4' in lines
+    assert 'upstream_seconds_count{service="quiz"} 4' in lines
+    assert histogram.count("quiz") == 4
+
+
+def test_counter_labels_and_status_class():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("requests_total", "Requisições", ("route", "status_class")))
+    counter.inc("/api/teams", status_class(204))
+    counter.inc("/api/teams", status_class(200))
+    counter.inc("/api/quiz/{path}", status_class(503), amount=2)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/api/teams",status_class="2xx"} 2' in text
+    assert 'requests_total{route="/api/quiz/{path}",status_class="5xx"} 2' in text
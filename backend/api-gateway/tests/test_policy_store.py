@@ -0,0 +1,60 @@
+"""
+Testes da recarga a quente das políticas Casbin (PolicyStore)
+"""
+import asyncio
+import os
+
+from app.config import settings
+from app.services.policy_store import PolicyStore
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, settings.CASBIN_MODEL_PATH)
+
+POLICY = "p, admin, /api/teams, GET\n"
+
+
+def make_store(tmp_path, content: str = POLICY, poll_seconds: float = 0.01) -> PolicyStore:
+    policy_path = tmp_path / "policy.csv"
+    policy_path.write_text(content)
+    return PolicyStore(MODEL_PATH, str(policy_path), poll_seconds=poll_seconds)
+
+
+async def test_reload_swaps_table_and_keeps_it_on_bad_file(tmp_path):
+    store = make_store(tmp_path)
+    await store.start(watch=False)
+    before = store.decisions
+    assert not before.is_allowed("admin", "/api/teams", "POST")
+
+    (tmp_path / "policy.csv").write_text(POLICY + "p, admin, /api/teams, POST\n")
+    assert await store.reload() is True
+    # Quem já tinha a tabela antiga continua com ela; as próximas leituras veem a nova
+    assert not before.is_allowed("admin", "/api/teams", "POST")
+    assert store.decisions.is_allowed("admin", "/api/teams", "POST")
+    assert store.stats()["version"] == 2
+
+    # Arquivo vazio (ex: truncado no deploy) não derruba a autorização
+    (tmp_path / "policy.csv").write_text("")
+    assert await store.reload() is False
+    assert store.decisions.is_allowed("admin", "/api/teams", "POST")
+    stats = store.stats()
+    assert (stats["version"], stats["failures"], stats["reloads"]) == (2, 1, 1)
+    assert "nenhuma política" in stats["last_error"]
+
+
+async def test_watcher_reloads_after_file_settles(tmp_path):
+    store = make_store(tmp_path)
+    await store.start()
+    try:
+        stat = os.stat(tmp_path / "policy.csv")
+        (tmp_path / "policy.csv").write_text(POLICY + "p, comum, /api/teams, GET\n")
+        # Garante mtime diferente mesmo em sistemas de arquivos com resolução grossa
+        os.utime(tmp_path / "policy.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        for _ in range(100):
+            if store.stats()["version"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert store.decisions.is_allowed("comum", "/api/teams", "GET")
+        assert store.stats()["watching"] is True
+    finally:
+        await store.stop()
+    assert store.stats()["watching"] is False
@@ -0,0 +1,83 @@
+"""
+Testes do modo streaming do ProxyService (sem microsserviços reais)
+"""
+import httpx
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from app.services.proxy import ProxyService
+
+
+def make_request(method: str = "GET", body: bytes = b"", headers=None) -> Request:
+    raw_headers = [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+    chunks = [body]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/api/questions",
+        "query_string": b"",
+        "headers": raw_headers,
+    }
+    return Request(scope, receive)
+
+
+def upstream_response(status_code: int, payload: bytes) -> httpx.Response:
+    """Resposta com corpo em stream, como a de uma conexão real"""
+    async def chunks():
+        for start in range(0, len(payload), 4096):
+            yield payload[start:start + 4096]
+
+    return httpx.Response(status_code, headers={"content-length": str(len(payload))}, content=chunks())
+
+
+def make_proxy(handler) -> ProxyService:
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.stream_threshold = 1024
+    return proxy
+
+
+async def test_small_response_is_buffered():
+    proxy = make_proxy(lambda request: upstream_response(200, b'{"ok": true}'))
+
+    response = await proxy.proxy_request("quiz", "questions", make_request())
+
+    assert not isinstance(response, StreamingResponse)
+    assert response.body == b'{"ok": true}'
+
+
+async def test_large_response_is_streamed():
+    payload = b"x" * 10_000
+    proxy = make_proxy(lambda request: upstream_response(200, payload))
+
+    response = await proxy.proxy_request("quiz", "questions", make_request())
+
+    assert isinstance(response, StreamingResponse)
+    assert proxy.in_flight["quiz"] == 1
+    received = b"".join([chunk async for chunk in response.body_iterator])
+    assert received == payload
+    assert proxy.in_flight["quiz"] == 0
+
+
+async def test_large_request_body_is_streamed_upstream():
+    seen = {}
+
+    async def handler(request: httpx.Request):
+        # Corpo em stream vai como chunked (sem content-length fixo)
+        seen["streamed"] = request.headers.get("transfer-encoding") == "chunked"
+        seen["body"] = await request.aread()
+        return upstream_response(201, b"{}")
+
+    proxy = make_proxy(handler)
+    body = b"y" * 5000
+    request = make_request("POST", body, {"content-length": str(len(body)), "content-type": "application/json"})
+
+    response = await proxy.proxy_request("quiz", "questions", request)
+
+    assert response.status_code == 201
+    assert seen == {"streamed": True, "body": body}
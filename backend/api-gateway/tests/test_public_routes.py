@@ -0,0 +1,112 @@
+"""
+Testes das rotas públicas do JWT/Casbin ("/" não libera o gateway inteiro)
+"""
+import httpx
+from jose import jwt
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.config import settings
+from app.middleware.casbin_authz import PUBLIC_PREFIXES, CasbinAuthzMiddleware, authorize
+from app.middleware.jwt_auth import PUBLIC_ROUTES, JwtAuthMiddleware
+from app.services.public_routes import PublicRoutes
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def make_client() -> httpx.AsyncClient:
+    paths = [
+        "/", "/health", "/api/teams", "/api/teams/{id}", "/api/users", "/api/users/{id}", "/api/auth/login",
+        "/api/users/password/forgot", "/api/users/password/reset", "/api/users/password/validate-token",
+    ]
+    app = Starlette(routes=[Route(path, endpoint, methods=["GET", "POST"]) for path in paths])
+    stack = JwtAuthMiddleware(CasbinAuthzMiddleware(app), cache=None, key_set=None)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=stack), base_url="http://gateway")
+
+
+def test_root_is_exact_and_prefixes_end_with_slash():
+    routes = PublicRoutes(["/", "/health", "/api/auth/", "POST /api/users"])
+
+    assert routes.matches("/", "GET")
+    assert routes.matches("/health", "GET")
+    assert routes.matches("/api/auth/login", "POST")
+    assert routes.matches("/api/users", "POST")
+    assert not routes.matches("/api/teams", "GET")
+    assert not routes.matches("/healthz", "GET")
+    assert not routes.matches("/api/users", "GET")
+    assert not routes.matches("/api/users/1", "POST")
+
+
+async def test_protected_route_without_token_is_rejected():
+    async with make_client() as client:
+        assert (await client.get("/api/teams")).status_code == 401
+        assert (await client.get("/api/teams/123")).status_code == 401
+        assert (await client.get("/api/users/1")).status_code == 401
+        # Continuam públicas: raiz, sondas, login e o cadastro (só POST)
+        assert (await client.get("/")).status_code == 200
+        assert (await client.get("/health")).status_code == 200
+        assert (await client.post("/api/auth/login")).status_code == 200
+        assert (await client.post("/api/users")).status_code == 200
+        assert (await client.get("/api/users")).status_code == 401
+
+
+async def test_token_still_goes_through_policies():
+    token = jwt.encode({"sub": "1", "role": "comum"}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with make_client() as client:
+        assert (await client.get("/api/teams", headers=headers)).status_code == 200
+        assert (await client.post("/api/teams", headers=headers)).status_code == 403
+
+
+def test_authorize_only_skips_real_public_routes():
+    decisions = CasbinAuthzMiddleware(None).decisions
+
+    assert authorize(decisions, "/", "GET", None) == ("public", None)
+    assert authorize(decisions, "/api/teams", "GET", None)[0] == "unauthenticated"
+    assert authorize(decisions, "/api/gateway/drain", "POST", "comum")[0] == "denied"
+    assert "/" in PUBLIC_ROUTES and "/" in PUBLIC_PREFIXES
+
+
+async def test_password_recovery_from_the_app_is_public():
+    async with make_client() as client:
+        assert (await client.post("/api/users/password/forgot")).status_code == 200
+        assert (await client.post("/api/users/password/reset")).status_code == 200
+        assert (await client.get("/api/users/password/validate-token")).status_code == 200
+        # Só os métodos do fluxo de recuperação
+        assert (await client.get("/api/users/password/forgot")).status_code == 401
+
+
+def test_internal_user_routes_are_denied_for_every_role():
+    decisions = CasbinAuthzMiddleware(None).decisions
+
+    for role in ("comum", "admin"):
+        assert authorize(decisions, "/api/users/internal/by-email", "GET", role)[0] == "denied"
+        assert authorize(decisions, "/api/user/internal/by-email", "GET", role)[0] == "denied"
+        assert authorize(decisions, "/api/users/internal/7/password", "PATCH", role)[0] == "denied"
+    assert authorize(decisions, "/api/users/7", "GET", "comum")[0] == "allowed"
+    assert authorize(decisions, "/api/users/7/extra", "GET", "comum")[0] == "denied"
+
+
+def test_comum_only_reaches_the_game_endpoints_of_the_quiz_service():
+    decisions = CasbinAuthzMiddleware(None).decisions
+
+    for method, path in [
+        ("POST", "/api/api/quiz/start"),
+        ("GET", "/api/api/quiz/current"),
+        ("POST", "/api/api/quiz/answer"),
+        ("POST", "/api/api/quiz/abandon/abc123"),
+        ("POST", "/api/api/quiz/invite"),
+        ("GET", "/api/api/leaderboard/general"),
+    ]:
+        assert authorize(decisions, path, method, "comum")[0] == "allowed", (method, path)
+    for method, path in [
+        ("POST", "/api/quiz/questions"),
+        ("POST", "/api/quiz/quizzes-admin"),
+        ("GET", "/api/quiz/quizzes-admin"),
+        ("POST", "/api/api/quiz/abandon/abc123/extra"),
+        ("DELETE", "/api/api/quiz/current"),
+    ]:
+        assert authorize(decisions, path, method, "comum")[0] == "denied", (method, path)
@@ -0,0 +1,110 @@
+"""
+Testes do rate limiting por token bucket
+"""
+import httpx
+import pytest
+from jose import jwt
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.config import settings
+from app.middleware.jwt_auth import JwtAuthMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.rate_limit import LocalRateLimitBackend, RateLimitBackend, RateLimiter, RateLimitRule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rate_limit_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_bucket_refills_at_rate():
+    clock = FakeClock()
+    backend = LocalRateLimitBackend(clock=clock)
+
+    assert [backend.acquire_now("k", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert backend.acquire_now("k", rate=2, burst=3) == 0.5
+
+    clock.now = 0.5
+    assert backend.acquire_now("k", rate=2, burst=3) == 0
+
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    backend = LocalRateLimitBackend(idle_seconds=10, max_buckets=2, clock=clock)
+    for key in ("a", "b", "c"):
+        backend.acquire_now(key, rate=1, burst=1)
+    assert len(backend) == 2  # limite de baldes
+
+    clock.now = 11
+    backend.acquire_now("d", rate=1, burst=1)
+    assert len(backend) == 1
+
+
+async def test_middleware_limits_per_user_and_group():
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    async def set_user(scope, receive, send):
+        # Simula o JwtAuthMiddleware
+        if scope["path"].startswith("/api/quiz/"):
+            scope.setdefault("state", {})["user_id"] = dict(scope["headers"])[b"x-user"].decode()
+        await limited(scope, receive, send)
+
+    limiter = RateLimiter(LocalRateLimitBackend(), groups=[("/api/quiz/", "gameplay")])
+    limiter.rules["gameplay"] = RateLimitRule("gameplay", rate=0.001, burst=2)
+    limiter.rules["default"] = RateLimitRule("default", rate=0.001, burst=1)
+    app = Starlette(routes=[Route("/{path:path}", endpoint, methods=["POST"])])
+    limited = RateLimitMiddleware(app, limiter=limiter)
+
+    transport = httpx.ASGITransport(app=set_user)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        answers = [
+            (await client.post("/api/quiz/answer", headers={"x-user": user})).status_code
+            for user in ("1", "1", "1", "2")
+        ]
+        public = [(await client.post("/api/teams", headers={"x-user": "-"})).status_code for _ in range(2)]
+        rejected = await client.post("/api/quiz/answer", headers={"x-user": "1"})
+
+    assert answers == [200, 200, 429, 200]
+    assert public == [200, 429]
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert limiter.rejected == {"gameplay": 2, "default": 1}
+
+
+async def test_authenticated_requests_are_keyed_by_jwt_user_id():
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    backend = LocalRateLimitBackend()
+    limiter = RateLimiter(backend, groups=[])
+    limiter.rules["default"] = RateLimitRule("default", rate=0.001, burst=1)
+    app = Starlette(routes=[Route("/{path:path}", endpoint)])
+    # Mesma ordem do main.py: o JWT (externo) preenche o user_id antes do rate limit
+    stack = JwtAuthMiddleware(RateLimitMiddleware(app, limiter=limiter), cache=None, key_set=None)
+
+    def auth(user_id: str) -> dict:
+        token = jwt.encode({"sub": user_id, "role": "comum"}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+        return {"Authorization": f"Bearer {token}"}
+
+    # Todos atrás do mesmo IP (ex: NAT): cada usuário tem o próprio balde
+    transport = httpx.ASGITransport(app=stack, client=("10.0.0.1", 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        statuses = [
+            (await client.get("/api/teams", headers=auth(user))).status_code for user in ("1", "2", "1")
+        ]
+        # Rota pública (sem user_id): o balde é do IP
+        public = (await client.get("/api/auth/login")).status_code
+
+    assert statuses == [200, 200, 429]
+    assert public == 200
+    assert sorted(backend._buckets) == ["default:ip:10.0.0.1", "default:u:1", "default:u:2"]
@@ -0,0 +1,104 @@
+"""
+Testes do cache de respostas do gateway (ResponseCache + ProxyService)
+"""
+import json
+
+import httpx
+from starlette.requests import Request
+
+from app.services.proxy import ProxyService
+from app.services.response_cache import ResponseCache
+
+
+def make_request(method: str, path: str, headers=None) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    return Request(scope, receive)
+
+
+def make_proxy(handler) -> ProxyService:
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.response_cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    return proxy
+
+
+def upstream_json(payload, headers) -> httpx.Response:
+    """Resposta com corpo em stream, como a de uma conexão real"""
+    body = json.dumps(payload).encode()
+
+    async def chunks():
+        yield body
+
+    return httpx.Response(200, headers={**headers, "content-length": str(len(body))}, content=chunks())
+
+
+def counting_handler(calls, etag=None):
+    def handler(request: httpx.Request):
+        calls.append((request.method, request.url.path, request.headers.get("if-none-match")))
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        headers = {"etag": etag} if etag else {}
+        return upstream_json({"call": len(calls)}, headers)
+    return handler
+
+
+async def test_get_is_served_from_cache_until_write():
+    calls = []
+    proxy = make_proxy(counting_handler(calls))
+
+    first = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    second = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.body == first.body
+    assert len(calls) == 1
+
+    await proxy.proxy_request("quiz", "teams", make_request("POST", "/api/teams"))
+    third = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    assert third.headers["x-cache"] == "MISS"
+    assert len(calls) == 3
+
+
+async def test_client_if_none_match_gets_304():
+    proxy = make_proxy(counting_handler([]))
+    first = await proxy.proxy_request("quiz", "questions", make_request("GET", "/api/questions"))
+
+    again = await proxy.proxy_request(
+        "quiz", "questions", make_request("GET", "/api/questions", {"if-none-match": first.headers["etag"]})
+    )
+
+    assert again.status_code == 304
+    assert again.body == b""
+
+
+async def test_stale_entry_is_revalidated_with_upstream_etag():
+    calls = []
+    proxy = make_proxy(counting_handler(calls, etag='"v1"'))
+    proxy.response_cache.ttl_seconds = 0
+
+    first = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+    second = await proxy.proxy_request("quiz", "teams", make_request("GET", "/api/teams"))
+
+    assert second.headers["x-cache"] == "REVALIDATED"
+    assert second.body == first.body
+    assert calls[1][2] == '"v1"'
+    assert proxy.in_flight["quiz"] == 0
+
+
+def test_question_write_invalidates_quizzes_and_lru_bound():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.store(cache.make_key(None, "/api/teams", ""), 200, b"[]", {})
+    cache.store(cache.make_key(None, "/api/quizzes-admin", ""), 200, b"[]", {})
+    cache.store(cache.make_key(None, "/api/questions/1", ""), 200, b"{}", {})
+    assert cache.stats()["size"] == 2  # /api/teams saiu pelo LRU
+
+    assert cache.invalidate_resource("/api/questions") == 2
+    assert cache.stats()["size"] == 0
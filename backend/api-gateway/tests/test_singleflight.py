@@ -0,0 +1,140 @@
+"""
+Testes da coalescência de GETs concorrentes (SingleFlight + ProxyService)
+"""
+import asyncio
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.routers.gateway import GatewayDispatcher
+from app.services.proxy import ProxyService
+from app.services.route_table import ROUTE_TABLE, RouteTable
+from app.services.singleflight import SingleFlight
+
+
+def make_request(path: str, headers=None) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    return Request(scope, receive)
+
+
+def slow_upstream(calls, release: asyncio.Event):
+    async def handler(request: httpx.Request):
+        calls.append(request.headers.get("authorization"))
+        await release.wait()
+
+        async def chunks():
+            yield b'{"ranking": []}'
+
+        return httpx.Response(200, headers={"content-length": "15"}, content=chunks())
+    return handler
+
+
+async def test_concurrent_identical_gets_share_one_upstream_call():
+    calls, release = [], asyncio.Event()
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream(calls, release)))
+
+    tasks = [
+        asyncio.create_task(proxy.proxy_request("quiz", "api/leaderboard/general", make_request("/api/leaderboard/general")))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert {r.body for r in responses} == {b'{"ranking": []}'}
+    assert proxy.singleflight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "fallbacks": 0}
+    assert proxy.in_flight["quiz"] == 0
+
+
+async def test_different_tokens_are_not_coalesced_on_user_routes():
+    calls, release = [], asyncio.Event()
+    proxy = ProxyService()
+    proxy.clients["user"] = httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream(calls, release)))
+
+    tasks = [
+        asyncio.create_task(proxy.proxy_request(
+            "user", "7", make_request("/api/users/7", {"authorization": f"Bearer {token}"}),
+        ))
+        for token in ("a", "b")
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert sorted(calls) == ["Bearer a", "Bearer b"]
+
+
+async def test_different_tokens_share_one_call_on_user_independent_routes():
+    calls, release = [], asyncio.Event()
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream(calls, release)))
+    dispatcher = GatewayDispatcher(RouteTable(ROUTE_TABLE, proxy.SERVICE_URLS), proxy)
+    route, remainder = dispatcher.table.lookup("/api/api/leaderboard/general")
+    assert not route.user_scoped
+
+    tasks = [
+        asyncio.create_task(dispatcher.forward(
+            route, remainder,
+            make_request("/api/api/leaderboard/general", {"authorization": f"Bearer {token}"}),
+        ))
+        for token in ("a", "b", "c")
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert {r.body for r in responses} == {b'{"ranking": []}'}
+    assert proxy.singleflight.stats()["coalesced"] == 2
+
+
+async def test_leader_error_reaches_followers():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def failing():
+        started.set()
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    leader = asyncio.create_task(flight.do("k", failing))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", failing))
+
+    for task in (leader, follower):
+        with pytest.raises(RuntimeError):
+            await task
+    assert flight.stats()["coalesced"] == 1
+
+
+async def test_follower_runs_its_own_call_when_leader_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "own"
+
+    leader = asyncio.create_task(flight.do("k", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == ("own", False)
+    assert flight.stats()["fallbacks"] == 1
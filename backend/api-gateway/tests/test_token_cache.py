@@ -0,0 +1,51 @@
+"""
+Testes do cache de tokens verificados do JWT middleware
+"""
+import time
+
+from app.services.token_cache import TokenCache
+
+
+def test_put_and_get_returns_identity():
+    cache = TokenCache(max_size=10)
+    cache.put("token-a", {"sub": "1", "role": "admin", "exp": time.time() + 60})
+
+    identity = cache.get("token-a")
+
+    assert identity is not None
+    assert identity.user_id == "1"
+    assert identity.user_role == "admin"
+    assert cache.stats()["hits"] == 1
+
+
+def test_entry_expires_with_token_exp():
+    cache = TokenCache(max_size=10)
+    cache.put("token-a", {"sub": "1", "exp": time.time() - 1})
+
+    assert cache.get("token-a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_respects_max_size():
+    cache = TokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "1", "exp": exp})
+    cache.put("b", {"sub": "2", "exp": exp})
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.put("c", {"sub": "3", "exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_on_logout_drops_all_user_tokens():
+    cache = TokenCache(max_size=10)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "1", "exp": exp})
+    cache.put("b", {"sub": "1", "exp": exp})
+    cache.put("c", {"sub": "2", "exp": exp})
+
+    assert cache.invalidate_on_logout("a") == 2
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
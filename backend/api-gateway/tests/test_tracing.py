@@ -0,0 +1,89 @@
+"""
+Testes do tracing distribuído (traceparent, X-Request-ID e exportação de spans)
+"""
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.middleware.tracing import TracingMiddleware
+from app.services import proxy as proxy_module
+from app.services.proxy import ProxyService
+from app.services.tracing import SpanExporter, Tracer, parse_traceparent
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_traceparent_parsing():
+    context = parse_traceparent(PARENT)
+    assert context == ("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+    assert parse_traceparent("00-" + "0" * 32 + "-b7ad6b7169203331-01") is None
+    assert parse_traceparent("ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01") is None
+    assert parse_traceparent("lixo") is None
+    # Request ID de fora com caracteres inválidos é trocado por um novo
+    assert Tracer.extract({"X-Request-ID": "a b\n"}) == (None, None)
+
+
+async def test_gateway_continues_trace_and_forwards_context(monkeypatch):
+    exporter = ListExporter()
+    tracer = Tracer("api-gateway", exporter)
+    monkeypatch.setattr(proxy_module, "tracer", tracer)
+    seen = {}
+
+    async def body():
+        yield b"[]"
+
+    def handler(request: httpx.Request):
+        seen.update(request.headers)
+        return httpx.Response(200, headers={"content-length": "2"}, content=body())
+
+    proxy = ProxyService()
+    proxy.clients["quiz"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy.response_cache = None
+
+    app = FastAPI()
+
+    @app.get("/api/api/leaderboard/global")
+    async def leaderboard(request: Request):
+        return await proxy.proxy_request("quiz", "api/leaderboard/global", request)
+
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gw") as client:
+        response = await client.get(
+            "/api/api/leaderboard/global", headers={"traceparent": PARENT, "x-request-id": "req-42"},
+        )
+
+    assert response.headers["x-request-id"] == "req-42"
+    upstream = parse_traceparent(seen["traceparent"])
+    assert upstream.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert seen["x-request-id"] == "req-42"
+
+    client_span, server_span = exporter.spans
+    assert server_span["parent_id"] == "b7ad6b7169203331"
+    assert client_span["parent_id"] == server_span["span_id"]
+    assert upstream.span_id == client_span["span_id"]
+    assert (client_span["kind"], client_span["attributes"]["http.status_code"]) == ("client", 200)
+
+
+def test_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "traces" / "gateway.jsonl"
+    tracer = Tracer("api-gateway", SpanExporter(path=str(path), flush_seconds=0.05))
+
+    with tracer.span("GET /api/teams", "server") as root:
+        with tracer.span("GET quiz", "client"):
+            pass
+    tracer.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["GET quiz", "GET /api/teams"]
+    assert {span["trace_id"] for span in spans} == {root.trace_id}
+    assert spans[0]["parent_id"] == root.span_id
+    assert tracer.stats()["exported"] == 2
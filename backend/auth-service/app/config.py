@@ -16,7 +16,10 @@ class Settings(BaseSettings):
     
     # JWT Config
     JWT_SECRET: str = "default-secret-change-in-production"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256 (JWT_SECRET) ou ES256 (chave privada + JWKS)
+    # ES256: chave privada EC P-256 em PEM (sem arquivo, gera uma chave temporária) e kid opcional
+    JWT_PRIVATE_KEY_PATH: str = ""
+    JWT_KEY_ID: str = ""
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
@@ -37,6 +40,15 @@ class Settings(BaseSettings):
     # Frontend URL para links de reset
     FRONTEND_URL: str = "https://seuapp.com"
     
+    # Tracing distribuído (traceparent + X-Request-ID, ver app/tracing.py). Spans em JSON
+    # por linha no arquivo e/ou em lotes para o coletor; sem nenhum dos dois, só propaga
+    TRACE_SERVICE_NAME: str = "auth-service"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -8,6 +8,7 @@ import logging
 from typing import Dict, Any, Optional
 
 from app.config import settings
+from app.tracing import producer_span
 
 logger = logging.getLogger(__name__)
 
@@ -57,14 +58,16 @@ class RabbitMQProducer:
             channel = await cls._get_channel()
             exchange = await channel.get_exchange(settings.RABBITMQ_EXCHANGE)
             
-            await exchange.publish(
-                aio_pika.Message(
-                    body=json.dumps(message).encode(),
-                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                    content_type="application/json"
-                ),
-                routing_key=routing_key 
-            )
+            with producer_span(settings.RABBITMQ_EXCHANGE, routing_key) as headers:
+                await exchange.publish(
+                    aio_pika.Message(
+                        body=json.dumps(message).encode(),
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        content_type="application/json",
+                        headers=headers,
+                    ),
+                    routing_key=routing_key 
+                )
             logger.info(f"📤 Evento enviado: {routing_key}")
             return True
         except Exception as e:
@@ -0,0 +1,15 @@
+"""
+Rotas /.well-known do Auth Service (JWKS)
+"""
+from fastapi import APIRouter, Response
+
+from app.services.signing_keys import jwks
+
+router = APIRouter(prefix="/.well-known")
+
+
+@router.get("/jwks.json")
+async def get_jwks(response: Response):
+    """Chaves públicas para verificar os tokens (ES256); vazio com HS256"""
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return jwks()
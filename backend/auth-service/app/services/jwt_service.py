@@ -6,6 +6,18 @@ from typing import Optional, Dict, Any
 from jose import jwt
 
 from app.config import settings
+from app.services.signing_keys import signing_key
+
+
+def _signing_args() -> Dict[str, Any]:
+    """Chave e header kid para jwt.encode (chave privada com ES256, JWT_SECRET com HS256)"""
+    if signing_key is None:
+        return {"key": settings.JWT_SECRET}
+    return {"key": signing_key.private_pem, "headers": {"kid": signing_key.kid}}
+
+
+def _verification_key() -> str:
+    return signing_key.public_pem if signing_key is not None else settings.JWT_SECRET
 
 
 class JwtService:
@@ -38,8 +50,8 @@ class JwtService:
         
         encoded_jwt = jwt.encode(
             to_encode,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
+            algorithm=settings.JWT_ALGORITHM,
+            **_signing_args()
         )
         
         return encoded_jwt
@@ -66,8 +78,8 @@ class JwtService:
         
         encoded_jwt = jwt.encode(
             to_encode,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
+            algorithm=settings.JWT_ALGORITHM,
+            **_signing_args()
         )
         
         return encoded_jwt
@@ -86,7 +98,7 @@ class JwtService:
         try:
             payload = jwt.decode(
                 token,
-                settings.JWT_SECRET,
+                _verification_key(),
                 algorithms=[settings.JWT_ALGORITHM]
             )
             return payload
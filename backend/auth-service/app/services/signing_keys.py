@@ -0,0 +1,93 @@
+"""
+Chave de assinatura dos tokens JWT e JWKS público
+
+Com JWT_ALGORITHM=ES256 os tokens são assinados com uma chave privada P-256
+que só o auth-service conhece; quem verifica (gateway) busca a chave pública
+em GET /.well-known/jwks.json e escolhe a chave pelo `kid` do header do token.
+Com HS256 (padrão) nada muda: todos continuam usando o JWT_SECRET.
+
+A chave privada vem de JWT_PRIVATE_KEY_PATH (PEM). Sem o arquivo, uma chave
+temporária é gerada na inicialização - serve para desenvolvimento, mas os
+tokens deixam de valer quando o serviço reinicia e não funcionam com várias
+réplicas.
+"""
+import base64
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = frozenset(["ES256"])
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class SigningKey:
+    """Chave privada EC P-256 com o JWK público correspondente"""
+
+    def __init__(self, private_key: ec.EllipticCurvePrivateKey, kid: Optional[str] = None):
+        self.algorithm = "ES256"
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_key = private_key.public_key()
+        self.public_pem = public_key.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        numbers = public_key.public_numbers()
+        self._jwk = {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64url(numbers.x.to_bytes(32, "big")),
+            "y": _b64url(numbers.y.to_bytes(32, "big")),
+        }
+        self.kid = kid or self.thumbprint()
+
+    def thumbprint(self) -> str:
+        """Thumbprint do JWK (RFC 7638), usado como kid quando JWT_KEY_ID não é definido"""
+        canonical = json.dumps(self._jwk, sort_keys=True, separators=(",", ":")).encode()
+        return _b64url(hashlib.sha256(canonical).digest())
+
+    def public_jwk(self) -> Dict[str, str]:
+        return {**self._jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+def load_signing_key() -> Optional[SigningKey]:
+    """Chave configurada (None com algoritmos simétricos, que usam o JWT_SECRET)"""
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+
+    if settings.JWT_PRIVATE_KEY_PATH:
+        with open(settings.JWT_PRIVATE_KEY_PATH, "rb") as file:
+            private_key = serialization.load_pem_private_key(file.read(), password=None)
+        if not isinstance(private_key, ec.EllipticCurvePrivateKey) or private_key.curve.name != "secp256r1":
+            raise ValueError("JWT_PRIVATE_KEY_PATH deve conter uma chave EC P-256 para ES256")
+    else:
+        logger.warning(
+            "JWT_PRIVATE_KEY_PATH não definido: gerando chave %s temporária "
+            "(tokens deixam de valer ao reiniciar o serviço)",
+            settings.JWT_ALGORITHM,
+        )
+        private_key = ec.generate_private_key(ec.SECP256R1())
+
+    return SigningKey(private_key, settings.JWT_KEY_ID or None)
+
+
+signing_key: Optional[SigningKey] = load_signing_key()
+
+
+def jwks() -> Dict[str, List[Dict[str, str]]]:
+    """Conjunto de chaves públicas (vazio com HS256)"""
+    return {"keys": [signing_key.public_jwk()] if signing_key is not None else []}
@@ -6,6 +6,7 @@ import httpx
 from typing import Optional
 
 from app.config import settings
+from app.tracing import tracer
 from app.interfaces.user_service import IUserService, UserData
 
 
@@ -14,7 +15,12 @@ class UserServiceClient(IUserService):
     
     def __init__(self):
         self.base_url = settings.USER_SERVICE_URL
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # Repassa traceparent/X-Request-ID da requisição atual ao User Service
+        self.client = httpx.AsyncClient(timeout=10.0, event_hooks={"request": [self._propagate]})
+
+    @staticmethod
+    async def _propagate(request: httpx.Request) -> None:
+        tracer.inject(request.headers)
     
     async def get_user_by_email(self, email: str) -> Optional[UserData]:
         """
@@ -9,7 +9,8 @@ from fastapi.responses import RedirectResponse
 import uvicorn
 
 from app.config import settings
-from app.routers import auth
+from app.tracing import TracingMiddleware, tracer
+from app.routers import auth, well_known
 from app.database import engine, Base
 
 # SRP: este módulo controla apenas o ciclo de vida do serviço, mantendo a lógica de domínio nos routers.
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
     print(f"Documentação disponível em: http://localhost:{settings.PORT}/docs")
     yield
     # Shutdown
+    tracer.close()
     print("Auth Service encerrado")
 
 
@@ -40,8 +42,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span de cada requisição, continuando o trace do gateway (traceparent / X-Request-ID)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # Registrar rotas
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
+app.include_router(well_known.router, tags=["auth"])
 
 
 @app.get("/", tags=["health"])
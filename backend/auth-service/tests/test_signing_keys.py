@@ -0,0 +1,93 @@
+"""
+Testes da chave de assinatura ES256 e do JWKS publicado pelo auth-service
+"""
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import FastAPI
+from jose import jwt
+
+from app.config import settings
+from app.routers import well_known
+from app.services import jwt_service, signing_keys
+from app.services.jwt_service import JwtService
+from app.services.signing_keys import load_signing_key
+
+
+def write_key(path, curve=ec.SECP256R1()) -> str:
+    private_key = ec.generate_private_key(curve)
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return str(path)
+
+
+@pytest.fixture
+def es256(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "ES256")
+    monkeypatch.setattr(settings, "JWT_KEY_ID", "")
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_PATH", write_key(tmp_path / "jwt-es256.pem"))
+    return tmp_path
+
+
+def test_hs256_has_no_signing_key(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "HS256")
+    assert load_signing_key() is None
+
+
+def test_key_file_gives_the_same_kid_on_every_start(es256):
+    first, second = load_signing_key(), load_signing_key()
+
+    # Mesma chave persistente -> mesmo kid: tokens emitidos antes de um restart continuam válidos
+    assert first.kid == second.kid == first.thumbprint()
+    assert first.public_pem == second.public_pem
+    jwk = first.public_jwk()
+    assert (jwk["kty"], jwk["crv"], jwk["alg"], jwk["use"]) == ("EC", "P-256", "ES256", "sig")
+    assert "d" not in jwk  # nada da chave privada no JWKS
+
+
+def test_rejects_keys_of_another_curve(es256, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_PATH", write_key(es256 / "p384.pem", ec.SECP384R1()))
+    with pytest.raises(ValueError):
+        load_signing_key()
+
+
+def test_ephemeral_key_without_file(es256, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_PATH", "")
+    # Sem arquivo cada inicialização gera uma chave (e um kid) diferente
+    assert load_signing_key().kid != load_signing_key().kid
+
+
+async def test_jwks_endpoint_verifies_issued_tokens(es256, monkeypatch):
+    key = load_signing_key()
+    monkeypatch.setattr(signing_keys, "signing_key", key)
+    monkeypatch.setattr(jwt_service, "signing_key", key)
+
+    app = FastAPI()
+    app.include_router(well_known.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://auth") as client:
+        response = await client.get("/.well-known/jwks.json")
+
+    assert response.headers["cache-control"] == "public, max-age=300"
+    (jwk,) = response.json()["keys"]
+    assert jwk["kid"] == key.kid
+
+    token = JwtService.create_access_token({"sub": "1", "role": "comum"})
+    assert jwt.get_unverified_header(token)["kid"] == key.kid
+    # O gateway verifica só com o JWK público publicado
+    payload = jwt.decode(token, jwk, algorithms=["ES256"])
+    assert (payload["sub"], payload["type"]) == ("1", "access")
+    assert JwtService.verify_token(token)["role"] == "comum"
+
+
+async def test_jwks_is_empty_with_hs256(monkeypatch):
+    monkeypatch.setattr(signing_keys, "signing_key", None)
+    app = FastAPI()
+    app.include_router(well_known.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://auth") as client:
+        assert (await client.get("/.well-known/jwks.json")).json() == {"keys": []}
@@ -39,6 +39,15 @@ class Settings(BaseSettings):
     FRONTEND_BASE_URL: str = "http://localhost:3000"
     FRONTEND_RESET_PATH: str = "/reset-password"
     
+    # Tracing distribuído (traceparent + X-Request-ID, ver app/tracing.py). Spans em JSON
+    # por linha no arquivo e/ou em lotes para o coletor; sem nenhum dos dois, só propaga
+    TRACE_SERVICE_NAME: str = "notification-service"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
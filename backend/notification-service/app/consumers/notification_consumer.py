@@ -5,6 +5,7 @@ import aio_pika
 from typing import Dict, Any
 
 from app.config import settings
+from app.tracing import consumer_span
 from app.services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
@@ -96,7 +97,8 @@ class NotificationConsumer:
     # --- PROCESSADOR 1: BOAS VINDAS ---
     async def _on_welcome_message(self, message: aio_pika.IncomingMessage):
         """Processa apenas mensagens da fila de boas-vindas"""
-        async with message.process(): 
+        # Span do processamento, no mesmo trace de quem publicou o evento
+        async with message.process(), consumer_span(message):
             try:
                 body = message.body.decode()
                 data = json.loads(body)
@@ -121,7 +123,7 @@ class NotificationConsumer:
     # --- PROCESSADOR 2: RESET SENHA ---
     async def _on_reset_message(self, message: aio_pika.IncomingMessage):
         """Processa apenas mensagens da fila de reset"""
-        async with message.process():
+        async with message.process(), consumer_span(message):
             try:
                 body = message.body.decode()
                 data = json.loads(body)
@@ -137,7 +139,7 @@ class NotificationConsumer:
     # --- PROCESSADOR 3: NOVO QUIZ CRIADO ---
     async def _on_quiz_created_message(self, message: aio_pika.IncomingMessage):
         """Notifica usuários sobre novo quiz"""
-        async with message.process():
+        async with message.process(), consumer_span(message):
             try:
                 body = message.body.decode()
                 data = json.loads(body)
@@ -162,7 +164,7 @@ class NotificationConsumer:
     # --- PROCESSADOR 4: CONVITE DE AMIGO ---
     async def _on_invite_message(self, message: aio_pika.IncomingMessage):
         """Processa convites de amigos"""
-        async with message.process():
+        async with message.process(), consumer_span(message):
             try:
                 body = message.body.decode()
                 data = json.loads(body)
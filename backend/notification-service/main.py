@@ -10,6 +10,7 @@ import asyncio
 import logging
 
 from app.config import settings
+from app.tracing import TracingMiddleware, tracer
 from app.consumers.notification_consumer import NotificationConsumer
 
 # Configurar logging
@@ -42,6 +43,7 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 Encerrando Notification Service...")
     if consumer_instance:
         await consumer_instance.close()
+    tracer.close()
     logger.info("✅ Notification Service encerrado")
 
 app = FastAPI(
@@ -60,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span de cada requisição, continuando o trace do gateway (traceparent / X-Request-ID)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 @app.get("/", tags=["health"])
 async def root():
     """Health check endpoint"""
@@ -27,6 +27,38 @@ class Settings(BaseSettings):
     #ver isso aqui depois
     QUIZ_DB_NAME: str = "quiz_db"
     
+    # Aplica as migrações de índices (app/indexes.py) no startup
+    MONGO_INDEXES_AUTO_APPLY: bool = True
+    
+    # Tracing distribuído (traceparent + X-Request-ID, ver app/tracing.py). Spans em JSON
+    # por linha no arquivo e/ou em lotes para o coletor; sem nenhum dos dois, só propaga
+    TRACE_SERVICE_NAME: str = "quiz-service"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
+    # Cache do gabarito em memória (question_id -> resposta correta, ver app/services/answer_key_cache.py)
+    ANSWER_KEY_CACHE_SIZE: int = 10000
+    ANSWER_KEY_CACHE_TTL_SECONDS: float = 600.0
+    
+    # Pools de IDs de perguntas para o sorteio (ver app/services/question_pool.py); ressincronização completa
+    QUESTION_POOL_REFRESH_SECONDS: float = 300.0
+    
+    # Sessões em andamento em memória (ver app/services/session_store.py).
+    # SESSION_STORE_BACKEND: local (por processo) ou redis (compartilhado, pacote opcional `redis`)
+    # SESSION_WRITE_MODE: atomic (um find_one_and_update condicionado por resposta) ou
+    # write_behind (deltas acumulados; só com uma réplica)
+    SESSION_WRITE_MODE: str = "atomic"
+    SESSION_STORE_BACKEND: str = "local"
+    SESSION_STORE_REDIS_URL: str = "redis://redis:6379/1"
+    SESSION_STORE_MAX_SESSIONS: int = 10000
+    SESSION_STORE_TTL_SECONDS: float = 3600.0
+    # write_behind: flush periódico dos deltas e checkpoint a cada N respostas (1 = grava toda resposta)
+    SESSION_FLUSH_SECONDS: float = 1.0
+    SESSION_CHECKPOINT_EVERY: int = 5
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,288 @@
+"""
+Índices do MongoDB do Quiz Service (versionados)
+
+Cada Migration lista os índices a criar (e, se preciso, a remover) por coleção
+e, opcionalmente, um passo de preparação dos dados que roda antes (ex: limpar
+duplicatas que impediriam um índice único). No startup (lifespan do main.py) as
+migrações com versão maior que a registrada em `schema_migrations` são
+aplicadas em ordem e a versão é gravada ao final de cada uma. create_indexes é
+idempotente, então réplicas subindo juntas não conflitam. Uma falha é logada e
+o serviço sobe mesmo assim, com as migrações anteriores já registradas; a que
+falhou é tentada de novo no próximo startup.
+
+Relatório sem alterar nada (índices pendentes e plano das consultas quentes):
+
+    python -m app.indexes --dry-run
+    python -m app.indexes --explain
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.schemas.quiz_session import QuizStatus
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+MIGRATIONS_ID = "indexes"
+
+IN_PROGRESS = {"status": QuizStatus.IN_PROGRESS.value}
+COMPLETED = {"status": QuizStatus.COMPLETED.value}
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    indexes: Dict[str, List[IndexModel]]
+    drop: Optional[Dict[str, List[str]]] = None
+    # Ajuste dos dados antes dos índices; o retorno vai para o histórico da migração
+    prepare: Optional[Callable[[AsyncIOMotorDatabase], Awaitable[Dict[str, Any]]]] = None
+
+
+async def abandon_duplicate_in_progress(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Deixa no máximo uma sessão in_progress por usuário (a mais recente); as
+    demais viram abandoned. Sem isso o índice único da v2 não é criado.
+    """
+    cursor = db["quiz_sessions"].find(IN_PROGRESS, {"user_id": 1, "started_at": 1}).sort(
+        [("user_id", ASCENDING), ("started_at", DESCENDING)]
+    )
+    seen = set()
+    duplicates = []
+    async for doc in cursor:
+        if doc["user_id"] in seen:
+            duplicates.append(doc["_id"])
+        else:
+            seen.add(doc["user_id"])
+    if duplicates:
+        await db["quiz_sessions"].update_many(
+            {"_id": {"$in": duplicates}, **IN_PROGRESS},
+            {"$set": {"status": QuizStatus.ABANDONED.value, "finished_at": datetime.utcnow()}},
+        )
+        logger.warning(f"{len(duplicates)} sessões em andamento duplicadas marcadas como abandonadas")
+    return {"abandoned_duplicates": len(duplicates)}
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "índices das consultas de sessão, gabarito e quiz por time",
+        {
+            "quiz_sessions": [
+                # get_active_by_user e get_user_history (user_id + status, mais recentes primeiro)
+                IndexModel(
+                    [("user_id", ASCENDING), ("status", ASCENDING), ("started_at", DESCENDING)],
+                    name="user_status_started",
+                ),
+                # get_top_scores: só sessões concluídas, pontos desc / tempo asc
+                IndexModel(
+                    [("total_points", DESCENDING), ("total_time_seconds", ASCENDING)],
+                    name="top_scores",
+                    partialFilterExpression=COMPLETED,
+                ),
+                IndexModel(
+                    [("team_id", ASCENDING), ("total_points", DESCENDING), ("total_time_seconds", ASCENDING)],
+                    name="top_scores_by_team",
+                    partialFilterExpression=COMPLETED,
+                ),
+            ],
+            # get_by_question, get_correct_answer_by_question e gabarito em lote ($in)
+            "answers": [
+                IndexModel([("questionId", ASCENDING), ("correct", ASCENDING)], name="question_correct"),
+            ],
+            # get_by_team_id
+            "quizzes": [
+                IndexModel([("team_id", ASCENDING)], name="team_id"),
+            ],
+            # Perguntas de um time (sorteio e carga dos pools)
+            "questions": [
+                IndexModel([("team_id", ASCENDING)], name="team_id"),
+            ],
+        },
+    ),
+    Migration(
+        2,
+        "no máximo uma sessão em andamento por usuário (start_quiz concorrente)",
+        {
+            "quiz_sessions": [
+                IndexModel(
+                    [("user_id", ASCENDING)],
+                    name="one_in_progress_per_user",
+                    unique=True,
+                    partialFilterExpression=IN_PROGRESS,
+                ),
+            ],
+        },
+        prepare=abandon_duplicate_in_progress,
+    ),
+]
+
+LATEST_VERSION = max(migration.version for migration in MIGRATIONS)
+
+# Consultas quentes dos repositórios: (coleção, nome, filtro, ordenação)
+HOT_QUERIES: List[Tuple[str, str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("quiz_sessions", "get_active_by_user", {"user_id": 0, **IN_PROGRESS}, None),
+    (
+        "quiz_sessions",
+        "get_user_history",
+        {"user_id": 0, "status": {"$in": [QuizStatus.COMPLETED.value, QuizStatus.ABANDONED.value]}},
+        [("started_at", DESCENDING)],
+    ),
+    ("quiz_sessions", "get_top_scores", dict(COMPLETED), [("total_points", DESCENDING), ("total_time_seconds", ASCENDING)]),
+    (
+        "quiz_sessions",
+        "get_top_scores(team_id)",
+        {**COMPLETED, "team_id": ""},
+        [("total_points", DESCENDING), ("total_time_seconds", ASCENDING)],
+    ),
+    ("answers", "get_by_question", {"questionId": ""}, None),
+    ("answers", "get_correct_answer_ids", {"questionId": {"$in": [""]}, "correct": True}, None),
+    ("quizzes", "get_by_team_id", {"team_id": ""}, None),
+]
+
+
+async def applied_version(db: AsyncIOMotorDatabase) -> int:
+    doc = await db[MIGRATIONS_COLLECTION].find_one({"_id": MIGRATIONS_ID})
+    return doc.get("version", 0) if doc else 0
+
+
+async def _record(
+    db: AsyncIOMotorDatabase,
+    migration: Migration,
+    created: Dict[str, List[str]],
+    prepared: Optional[Dict[str, Any]] = None,
+) -> None:
+    entry = {
+        "version": migration.version,
+        "description": migration.description,
+        "indexes": created,
+        "applied_at": datetime.utcnow(),
+    }
+    if prepared:
+        entry["prepare"] = prepared
+    await db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": MIGRATIONS_ID},
+        {"$max": {"version": migration.version}, "$push": {"history": entry}},
+        upsert=True,
+    )
+
+
+async def apply_migrations(db: AsyncIOMotorDatabase) -> int:
+    """Aplica as migrações pendentes em ordem; retorna a versão em que o banco ficou"""
+    version = await applied_version(db)
+    for migration in sorted(MIGRATIONS, key=lambda item: item.version):
+        if migration.version <= version:
+            continue
+        try:
+            created: Dict[str, List[str]] = {}
+            prepared = await migration.prepare(db) if migration.prepare else None
+            for collection, names in (migration.drop or {}).items():
+                existing = await db[collection].index_information()
+                for name in names:
+                    if name in existing:
+                        await db[collection].drop_index(name)
+            for collection, models in migration.indexes.items():
+                created[collection] = await db[collection].create_indexes(models)
+        except Exception as e:
+            logger.error(f"Migração de índices v{migration.version} falhou (tentada de novo no próximo startup): {e}")
+            return version
+        await _record(db, migration, created, prepared)
+        version = migration.version
+        logger.info(f"Índices v{version} aplicados: {migration.description}")
+    return version
+
+
+async def dry_run(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Migrações pendentes e, por coleção, os índices que seriam criados/removidos"""
+    version = await applied_version(db)
+    pending = []
+    for migration in sorted(MIGRATIONS, key=lambda item: item.version):
+        if migration.version <= version:
+            continue
+        changes: Dict[str, Any] = {}
+        for collection, models in migration.indexes.items():
+            existing = await db[collection].index_information()
+            changes[collection] = {
+                "create": [model.document["name"] for model in models if model.document["name"] not in existing],
+                "existing": [model.document["name"] for model in models if model.document["name"] in existing],
+            }
+        for collection, names in (migration.drop or {}).items():
+            changes.setdefault(collection, {})["drop"] = names
+        pending.append({
+            "version": migration.version,
+            "description": migration.description,
+            "prepare": migration.prepare.__name__ if migration.prepare else None,
+            "changes": changes,
+        })
+    return {"applied_version": version, "latest_version": LATEST_VERSION, "pending": pending}
+
+
+def _plan_summary(plan: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Estágios (ex: FETCH > IXSCAN) e índices usados no winningPlan"""
+    stages: List[str] = []
+    indexes: List[str] = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if "queryPlan" in node:  # formato do SBE (MongoDB 7+)
+            node = node["queryPlan"]
+        stages.append(node.get("stage", "?"))
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        stack.extend(node.get("inputStages", []))
+        if "inputStage" in node:
+            stack.append(node["inputStage"])
+    return stages, indexes
+
+
+async def explain(db: AsyncIOMotorDatabase, queries: Sequence = HOT_QUERIES) -> List[Dict[str, Any]]:
+    """Plano escolhido pelo MongoDB para cada consulta quente (COLLSCAN = sem índice)"""
+    report = []
+    for collection, name, query, sort in queries:
+        cursor = db[collection].find(query).limit(10)
+        if sort:
+            cursor = cursor.sort(sort)
+        result = await cursor.explain()
+        stages, indexes = _plan_summary(result["queryPlanner"]["winningPlan"])
+        report.append({
+            "collection": collection,
+            "query": name,
+            "plan": " > ".join(stages),
+            "indexes": indexes,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def _main() -> None:
+    from app.database import close_db, get_database, init_db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="mostra as migrações pendentes sem aplicar")
+    parser.add_argument("--explain", action="store_true", help="plano das consultas quentes")
+    args = parser.parse_args()
+
+    await init_db()
+    db = get_database()
+    try:
+        if args.dry_run or args.explain:
+            report: Dict[str, Any] = {}
+            if args.dry_run:
+                report["migrations"] = await dry_run(db)
+            if args.explain:
+                report["explain"] = await explain(db)
+        else:
+            report = {"applied_version": await apply_migrations(db)}
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
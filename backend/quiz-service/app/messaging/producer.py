@@ -4,6 +4,7 @@ import asyncio
 import aio_pika
 from aio_pika.exceptions import AMQPConnectionError
 from app.config import settings
+from app.tracing import producer_span
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -63,12 +64,15 @@ class EventProducer:
                 return
 
         try:
-            message = aio_pika.Message(
-                body=json.dumps(payload).encode(),
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                content_type="application/json"
-            )
-            await exchange.publish(message, routing_key=routing_key)
+            # traceparent/X-Request-ID da requisição vão nos headers para o consumidor continuar o trace
+            with producer_span(exchange.name, routing_key) as headers:
+                message = aio_pika.Message(
+                    body=json.dumps(payload).encode(),
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    content_type="application/json",
+                    headers=headers,
+                )
+                await exchange.publish(message, routing_key=routing_key)
             logger.debug(f"📤 Evento enviado: {routing_key}")
         except Exception as e:
             logger.error(f"❌ Erro crítico ao publicar em {routing_key}: {e}")
@@ -3,6 +3,7 @@ import json
 import logging
 import aio_pika
 from app.config import settings
+from app.tracing import consumer_span
 from app.database import init_db, get_database
 from app.repositories.leaderboard_repository import LeaderboardRepository
 from app.repositories.quiz_session_repository import QuizSessionRepository
@@ -16,7 +17,8 @@ async def process_message(
     message: aio_pika.IncomingMessage, 
     service: LeaderboardService
 ):
-    async with message.process():
+    # Span do processamento, no mesmo trace da requisição que finalizou o quiz
+    async with message.process(), consumer_span(message):
         try:
             data = json.loads(message.body.decode())
             logger.info(f"📥 Recebido evento game.finished: {data['session_id']}")
@@ -44,6 +44,17 @@ class AnswerRepository:
         })
         return self._convert_id(answer) if answer else None
     
+    async def get_correct_answer_ids(self, question_ids: List[str]) -> Dict[str, str]:
+        """Mapa question_id -> id da resposta correta para várias perguntas (uma consulta)"""
+        cursor = self.collection.find(
+            {"questionId": {"$in": question_ids}, "correct": True},
+            {"_id": 1, "questionId": 1},
+        )
+        keys = {}
+        async for doc in cursor:
+            keys[doc["questionId"]] = str(doc["_id"])
+        return keys
+    
     async def create(self, answer_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria uma nova resposta"""
         result = await self.collection.insert_one(answer_data)
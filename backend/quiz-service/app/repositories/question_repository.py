@@ -1,7 +1,7 @@
 """
 Implementação concreta do repositório de perguntas usando MongoDB
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from bson import ObjectId
 from bson.errors import InvalidId
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -70,6 +70,17 @@ class QuestionRepository:
         except InvalidId:
             return False
         
+    async def get_pool_entries(self) -> List[Tuple[str, Optional[str]]]:
+        """(id, team_id) de todas as perguntas, para os pools de sorteio (só os dois campos)"""
+        cursor = self.collection.find({}, {"_id": 1, "team_id": 1})
+        return [(str(doc["_id"]), doc.get("team_id")) async for doc in cursor]
+        
+    async def get_existing_ids(self, question_ids: List[str]) -> Set[str]:
+        """Quais dos IDs ainda existem (uma consulta $in, só o _id)"""
+        object_ids = [ObjectId(qid) for qid in question_ids if ObjectId.is_valid(qid)]
+        cursor = self.collection.find({"_id": {"$in": object_ids}}, {"_id": 1})
+        return {str(doc["_id"]) async for doc in cursor}
+
     async def get_random_questions(self, limit: int = 10, team_id: Optional[str] = None) -> List[Dict[str, Any]]:
         pipeline = []
 
@@ -1,7 +1,9 @@
 
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime
@@ -12,13 +14,17 @@ class QuizSessionRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["quiz_sessions"]
 
-        # TODO índices para performance
+        # Índices criados pelas migrações de app/indexes.py (lifespan do main.py)
     
     async def create(self, session: QuizSession) -> QuizSession:
         """Cria uma nova sessão de quiz"""
         session_dict = session.model_dump(by_alias=True, exclude={"id"})
         
-        result = await self.collection.insert_one(session_dict)
+        try:
+            result = await self.collection.insert_one(session_dict)
+        except DuplicateKeyError:
+            # Índice único parcial: outra requisição iniciou um quiz para o usuário ao mesmo tempo
+            raise ValueError("Usuário já possui um quiz ativo")
 
         session.id = str(result.inserted_id)
         return session
@@ -56,6 +62,86 @@ class QuizSessionRepository:
         )
         return session
     
+    async def record_answer(
+        self,
+        session_id: str,
+        expected_index: int,
+        answer: Dict[str, Any],
+        points: int,
+        is_correct: bool,
+        set_fields: Optional[Dict[str, Any]] = None,
+    ) -> Optional[QuizSession]:
+        """
+        Registra uma resposta em uma única operação (find_one_and_update).
+        Só casa se a sessão está em andamento e ainda na pergunta `expected_index`,
+        então duas submissões da mesma pergunta não são aplicadas duas vezes.
+        Retorna a sessão já atualizada, ou None se o filtro não casou.
+        """
+        try:
+            oid = ObjectId(session_id)
+        except InvalidId:
+            return None
+
+        update: Dict[str, Any] = {
+            "$push": {"answers": answer},
+            "$inc": {
+                "current_question_index": 1,
+                "total_points": points,
+                "correct_answers": int(is_correct),
+                "wrong_answers": int(not is_correct),
+            },
+        }
+        if set_fields:
+            update["$set"] = set_fields
+
+        doc = await self.collection.find_one_and_update(
+            {
+                "_id": oid,
+                "status": QuizStatus.IN_PROGRESS.value,
+                "current_question_index": expected_index,
+            },
+            update,
+            return_document=ReturnDocument.AFTER,
+        )
+        return QuizSession(**doc) if doc else None
+    
+    async def apply_delta(
+        self,
+        session_id: str,
+        base_index: Optional[int] = None,
+        new_index: Optional[int] = None,
+        answers: Optional[List[Dict[str, Any]]] = None,
+        points: int = 0,
+        correct: int = 0,
+        wrong: int = 0,
+        set_fields: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Grava respostas acumuladas com $push/$inc (sem regravar o documento).
+        Condicionado a current_question_index == base_index: um delta já aplicado
+        não é aplicado de novo. Retorna False se nenhum documento casou.
+        """
+        try:
+            oid = ObjectId(session_id)
+        except InvalidId:
+            raise ValueError("ID da sessão inválido para atualização")
+
+        query: Dict[str, Any] = {"_id": oid, "status": QuizStatus.IN_PROGRESS.value}
+        update: Dict[str, Any] = {}
+        fields = dict(set_fields or {})
+        if answers:
+            query["current_question_index"] = base_index
+            update["$push"] = {"answers": {"$each": answers}}
+            update["$inc"] = {"total_points": points, "correct_answers": correct, "wrong_answers": wrong}
+            fields["current_question_index"] = new_index
+        if fields:
+            update["$set"] = fields
+        if not update:
+            return True
+
+        result = await self.collection.update_one(query, update)
+        return result.matched_count > 0
+    
     async def get_user_history(
         self, 
         user_id: int, 
@@ -9,6 +9,7 @@ from app.database import get_database
 from app.dependencies import get_answer_repo
 
 from app.repositories.answer_repository import AnswerRepository
+from app.services.answer_key_cache import answer_key_cache
 #from app.interfaces.repositories import IAnswerRepository
 from app.dependencies import require_admin_role
 
@@ -61,6 +62,8 @@ async def create_answer(
     
     answer_dict = answer_data.model_dump()
     answer = await repository.create(answer_dict)
+    # Gabarito da pergunta pode ter mudado (nova correta ou outra opção)
+    answer_key_cache.invalidate(answer_data.questionId)
     return AnswerResponse(**answer)
 
 
@@ -114,6 +117,8 @@ async def delete_answer(
     repository: AnswerRepository = Depends(get_answer_repo),
     _admin_role: str = Depends(require_admin_role)
 ):
+    answer = await repository.get_by_id(answer_id)
     success = await repository.delete(answer_id)
     if not success:
-        raise HTTPException(status_code=404, detail="Resposta não encontrada")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Resposta não encontrada")
+    answer_key_cache.invalidate(answer.get("questionId") if answer else None)
\ No newline at end of file
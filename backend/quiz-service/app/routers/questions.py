@@ -11,6 +11,8 @@ from app.dependencies import get_question_admin_service, get_question_repo
 
 from app.repositories.question_repository import QuestionRepository
 from app.services.question_admin_service import QuestionAdminService
+from app.services.answer_key_cache import answer_key_cache
+from app.services.question_pool import question_pools
 #from app.interfaces.repositories import IQuestionRepository
 from app.dependencies import require_admin_role
 
@@ -115,6 +117,8 @@ async def delete_question(
 ):
     """Deleta uma pergunta (apenas admin)"""
     success = await repository.delete(question_id)
+    answer_key_cache.invalidate(question_id)
+    question_pools.remove(question_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
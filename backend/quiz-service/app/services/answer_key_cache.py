@@ -0,0 +1,88 @@
+"""
+Cache do gabarito (question_id -> id da resposta correta)
+
+O gabarito não muda durante uma partida, então o submit_answer não precisa ler
+a coleção answers a cada resposta: o start_quiz pré-carrega as perguntas da
+sessão com uma única consulta e as respostas seguintes são resolvidas em
+memória. Criações/remoções de perguntas e respostas pelos routers de admin
+invalidam a pergunta afetada. O cache é por processo (LRU); o TTL limita a
+defasagem caso a base seja alterada por fora do serviço.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from app.config import settings
+from app.repositories.answer_repository import AnswerRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerKeyCache:
+    """LRU de gabaritos com TTL; None em get() significa 'consultar o banco'"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 600.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, question_id: str) -> Optional[str]:
+        entry = self._entries.get(question_id)
+        if entry is None:
+            return None
+        answer_id, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[question_id]
+            return None
+        self._entries.move_to_end(question_id)
+        return answer_id
+
+    def put(self, question_id: str, answer_id: str) -> None:
+        self._entries[question_id] = (answer_id, self.clock() + self.ttl_seconds)
+        self._entries.move_to_end(question_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, question_id: Optional[str]) -> None:
+        if question_id:
+            self._entries.pop(str(question_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def warm(self, question_ids: Iterable[str], answer_repo: AnswerRepository) -> int:
+        """Carrega de uma vez os gabaritos que faltam (uma consulta com $in); retorna quantos entraram"""
+        missing = [qid for qid in dict.fromkeys(question_ids) if self.get(qid) is None]
+        if not missing:
+            return 0
+        keys = await answer_repo.get_correct_answer_ids(missing)
+        for question_id, answer_id in keys.items():
+            self.put(question_id, answer_id)
+        if len(keys) < len(missing):
+            logger.warning(
+                "Gabarito ausente para %d de %d perguntas da sessão", len(missing) - len(keys), len(missing)
+            )
+        return len(keys)
+
+    async def correct_answer_id(self, question_id: str, answer_repo: AnswerRepository) -> Optional[str]:
+        """Resposta correta da pergunta: memória ou, na falta, uma leitura pontual no banco"""
+        answer_id = self.get(question_id)
+        if answer_id is not None:
+            return answer_id
+        answer = await answer_repo.get_correct_answer_by_question(question_id)
+        if not answer:
+            return None
+        answer_id = str(answer["id"])
+        self.put(question_id, answer_id)
+        return answer_id
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+answer_key_cache = AnswerKeyCache(
+    max_size=settings.ANSWER_KEY_CACHE_SIZE,
+    ttl_seconds=settings.ANSWER_KEY_CACHE_TTL_SECONDS,
+)
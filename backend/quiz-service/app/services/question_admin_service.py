@@ -6,6 +6,8 @@ from app.repositories.answer_repository import AnswerRepository
 from app.repositories.quiz_repository import QuizRepository
 from app.repositories.team_repository import TeamRepository
 from app.schemas.question_schemas import QuestionCreateRequest
+from app.services.answer_key_cache import answer_key_cache
+from app.services.question_pool import question_pools
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +62,8 @@ class QuestionAdminService:
 
         # 4. Salva as Respostas em Lote
         await self.answer_repo.create_many(answers_docs)
+        answer_key_cache.invalidate(question_id)
+        question_pools.add(question_id, data.team_id)
 
         logger.info(f"✅ Pergunta criada (ID: {question_id}) com opções integradas.")
         
@@ -0,0 +1,186 @@
+"""
+Pools de IDs de perguntas em memória para o sorteio do start_quiz
+
+Antes cada início de quiz rodava `$match` + `$sample` na coleção questions
+(varredura + ordenação aleatória com filtro por time). Aqui os IDs ficam em
+arrays por time e em um array global, carregados no startup com uma consulta
+que traz só `_id`/`team_id`. Criar/remover perguntas pelas rotas de admin
+atualiza os pools do worker que atendeu a requisição (O(1): remoção por troca
+com o último elemento); os demais workers (gunicorn) e alterações feitas por
+fora do serviço só aparecem na ressincronização em background
+(QUESTION_POOL_REFRESH_SECONDS). Por isso `draw` confere os IDs sorteados no
+banco com um `$in` antes de criar a sessão: perguntas já apagadas saem do pool
+e o sorteio é refeito.
+
+O sorteio é sem reposição e O(k): random.sample sobre range(n) escolhe k
+posições sem copiar o array.
+"""
+import asyncio
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.repositories.question_repository import QuestionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class IdPool:
+    """Conjunto de IDs com inserção, remoção e sorteio em O(1)/O(k)"""
+
+    __slots__ = ("_ids", "_positions")
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        for question_id in ids:
+            self.add(question_id)
+
+    def add(self, question_id: str) -> None:
+        if question_id in self._positions:
+            return
+        self._positions[question_id] = len(self._ids)
+        self._ids.append(question_id)
+
+    def remove(self, question_id: str) -> None:
+        position = self._positions.pop(question_id, None)
+        if position is None:
+            return
+        last = self._ids.pop()
+        if position < len(self._ids):
+            # Troca com o último: o array continua denso sem deslocar elementos
+            self._ids[position] = last
+            self._positions[last] = position
+
+    def sample(self, k: int, rng=random) -> List[str]:
+        """k IDs distintos (ou todos, se houver menos)"""
+        size = len(self._ids)
+        if k >= size:
+            ids = list(self._ids)
+            rng.shuffle(ids)
+            return ids
+        return [self._ids[position] for position in rng.sample(range(size), k)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self._positions
+
+
+class QuestionPools:
+    """Pool global e um pool por time, mantidos em sincronia com a coleção questions"""
+
+    def __init__(self, refresh_seconds: float = 300.0):
+        self.refresh_seconds = refresh_seconds
+        self.repo: Optional[QuestionRepository] = None
+        self.loaded = False
+        self._global = IdPool()
+        self._teams: Dict[str, IdPool] = {}
+        self._team_of: Dict[str, Optional[str]] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        # Alterações feitas enquanto uma recarga lê o banco (reaplicadas sobre o resultado)
+        self._changes: Optional[List[Tuple[str, str, Optional[str]]]] = None
+
+    def add(self, question_id: str, team_id: Optional[str] = None) -> None:
+        question_id = str(question_id)
+        if self._changes is not None:
+            self._changes.append(("add", question_id, team_id))
+        self._add(question_id, team_id)
+
+    def remove(self, question_id: str) -> None:
+        question_id = str(question_id)
+        if self._changes is not None:
+            self._changes.append(("remove", question_id, None))
+        self._remove(question_id)
+
+    def _add(self, question_id: str, team_id: Optional[str]) -> None:
+        if question_id in self._team_of:
+            self._remove(question_id)
+        self._team_of[question_id] = team_id
+        self._global.add(question_id)
+        if team_id:
+            self._teams.setdefault(team_id, IdPool()).add(question_id)
+
+    def _remove(self, question_id: str) -> None:
+        if question_id not in self._team_of:
+            return
+        team_id = self._team_of.pop(question_id)
+        self._global.remove(question_id)
+        pool = self._teams.get(team_id) if team_id else None
+        if pool is not None:
+            pool.remove(question_id)
+            if not len(pool):
+                del self._teams[team_id]
+
+    def sample(self, k: int, team_id: Optional[str] = None) -> List[str]:
+        """Sorteio sem reposição (sem acessar o MongoDB)"""
+        pool = self._teams.get(team_id) if team_id else self._global
+        return pool.sample(k) if pool is not None else []
+
+    async def draw(self, k: int, team_id: Optional[str], repo: QuestionRepository) -> List[str]:
+        """sample() só com perguntas que ainda existem no banco"""
+        question_ids = self.sample(k, team_id)
+        existing = await repo.get_existing_ids(question_ids)
+        stale = [question_id for question_id in question_ids if question_id not in existing]
+        if not stale:
+            return question_ids
+        # Apagadas por outro worker antes da ressincronização deste
+        logger.info(f"{len(stale)} perguntas removidas dos pools (não existem mais)")
+        for question_id in stale:
+            self.remove(question_id)
+        question_ids = self.sample(k, team_id)
+        existing = await repo.get_existing_ids(question_ids)
+        return [question_id for question_id in question_ids if question_id in existing]
+
+    async def refresh(self) -> None:
+        """Recarrega todos os pools (só `_id`/`team_id`) e troca de uma vez"""
+        self._changes = []
+        try:
+            entries = await self.repo.get_pool_entries()
+        except Exception:
+            self._changes = None
+            raise
+        changes, self._changes = self._changes, None
+        self._global = IdPool()
+        self._teams = {}
+        self._team_of = {}
+        for question_id, team_id in entries:
+            self._add(question_id, team_id)
+        for operation, question_id, team_id in changes:
+            if operation == "add":
+                self._add(question_id, team_id)
+            else:
+                self._remove(question_id)
+        self.loaded = True
+
+    async def start(self, repo: QuestionRepository) -> None:
+        self.repo = repo
+        try:
+            await self.refresh()
+            logger.info(f"Pools de perguntas carregados: {len(self._global)} perguntas, {len(self._teams)} times")
+        except Exception as e:
+            # Sem pools o start_quiz volta ao $sample no MongoDB
+            logger.error(f"Falha ao carregar pools de perguntas: {e}")
+        if self._refresher is None and self.refresh_seconds > 0:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Ressincronização dos pools de perguntas falhou: {e}")
+
+question_pools = QuestionPools(refresh_seconds=settings.QUESTION_POOL_REFRESH_SECONDS)
@@ -7,6 +7,9 @@ from app.repositories.question_repository import QuestionRepository
 from app.repositories.answer_repository import AnswerRepository
 from app.repositories.quiz_repository import QuizRepository
 
+from app.services.answer_key_cache import AnswerKeyCache, answer_key_cache
+from app.services.session_store import HotSessionStore, StaleSessionError, session_store
+from app.services.question_pool import QuestionPools, question_pools
 from app.schemas.quiz_session import QuizSession, QuizStatus, QuizType, QuestionAnswer
 from app.utils.scoring import calculate_points
 
@@ -21,13 +24,19 @@ class QuizGameService:
         question_repo: QuestionRepository,
         answer_repo: AnswerRepository,
         event_producer: EventProducer, # Injeção de dependência futura
-        quiz_repo: Optional[QuizRepository] = None
+        quiz_repo: Optional[QuizRepository] = None,
+        answer_keys: AnswerKeyCache = answer_key_cache,
+        sessions: HotSessionStore = session_store,
+        pools: QuestionPools = question_pools
     ):
         self.session_repo = session_repo
         self.question_repo = question_repo
         self.answer_repo = answer_repo
         self.event_producer = event_producer
         self.quiz_repo = quiz_repo
+        self.answer_keys = answer_keys
+        self.sessions = sessions
+        self.pools = pools
     
     async def start_quiz(
         self, 
@@ -78,16 +87,18 @@ class QuizGameService:
             # Lógica original: buscar questões aleatórias
             logger.info(f"🔍 DEBUG: Tentando buscar perguntas aleatórias...")
           
-            questions = await self.question_repo.get_random_questions(limit=10, team_id=team_id) #ajustar dps
+            if self.pools.loaded:
+                # Sorteio nos pools em memória; o MongoDB só confirma os IDs sorteados ($in)
+                question_ids = await self.pools.draw(10, team_id, self.question_repo) #ajustar dps
+            else:
+                questions = await self.question_repo.get_random_questions(limit=10, team_id=team_id) #ajustar dps
+                question_ids = [str(q.get("id", q.get("_id"))) for q in questions]
             
-            logger.info(f"🔍 DEBUG: Quantidade encontrada: {len(questions)}")
-            logger.info(f"🔍 DEBUG: Conteúdo: {questions}")
+            logger.info(f"🔍 DEBUG: Quantidade encontrada: {len(question_ids)}")
 
-            if len(questions) < 5:  #ajustar dps
+            if len(question_ids) < 5:  #ajustar dps
                 logger.error("DEBUG: Entrou no IF de erro!")
                 raise ValueError("Não há perguntas suficientes para iniciar o quiz")
-            
-            question_ids = [str(q.get("id", q.get("_id"))) for q in questions]
         
         session = QuizSession(
             user_id=user_id,
@@ -100,6 +111,15 @@ class QuizGameService:
         )
         
         created_session = await self.session_repo.create(session)
+        await self.sessions.add(created_session)
+
+        # Gabarito das perguntas da sessão em memória: o submit_answer não lê a coleção answers
+        try:
+            await self.answer_keys.warm(question_ids, self.answer_repo)
+        except Exception as e:
+            # Sem pré-carga o submit_answer busca o gabarito sob demanda
+            logger.warning(f"Falha ao pré-carregar gabarito da sessão {created_session.id}: {e}")
+
         logger.info(f"✅ Quiz iniciado: user_id={user_id}, session_id={created_session.id}, quiz_id={quiz_id}")
 
         # try:
@@ -129,28 +149,48 @@ class QuizGameService:
         answer_id: str, 
         time_taken_seconds: int
     ) -> dict:
-        session = await self.session_repo.get_by_id(session_id)
+        # Respostas da mesma sessão em sequência (ex: toque duplo no app)
+        async with self.sessions.lock(session_id):
+            try:
+                return await self._submit_answer(session_id, question_id, answer_id, time_taken_seconds)
+            except StaleSessionError:
+                # A sessão do cache pode estar atrás do MongoDB (resposta gravada por outro
+                # worker/réplica): relê e valida de novo antes de recusar
+                await self.sessions.reload(session_id)
+                return await self._submit_answer(session_id, question_id, answer_id, time_taken_seconds)
+
+    async def _submit_answer(
+        self,
+        session_id: str,
+        question_id: str,
+        answer_id: str,
+        time_taken_seconds: int
+    ) -> dict:
+        # Sessão em andamento vem do cache (HotSessionStore), sem leitura no MongoDB
+        session = await self.sessions.get(session_id)
         if not session:
             raise ValueError("Sessão não encontrada")
         
         if session.status != QuizStatus.IN_PROGRESS:
             raise ValueError("Quiz já foi finalizado")
         
+        if session.current_question_index >= len(session.questions):
+            raise ValueError("Todas as perguntas já foram respondidas")
+        
         # Valida se é a pergunta da vez
         current_q_id = session.questions[session.current_question_index]
         if current_q_id != question_id:
-            raise ValueError("Pergunta fora de ordem")
+            raise StaleSessionError("Pergunta fora de ordem")
         
-        # Busca resposta correta
-        answers = await self.answer_repo.get_by_question(question_id)
-        correct_answer = next((a for a in answers if a.get("correct") is True), None)
+        # Resposta correta (cache do gabarito, pré-carregado no start_quiz)
+        correct_answer_id = await self.answer_keys.correct_answer_id(question_id, self.answer_repo)
         
-        if not correct_answer:
+        if not correct_answer_id:
             logger.error(f"Pergunta {question_id} sem resposta correta!")
             raise ValueError("Erro interno: Pergunta sem gabarito")
 
 
-        is_correct = (answer_id == str(correct_answer["id"]))
+        is_correct = (answer_id == correct_answer_id)
         
         # Cálculo de Pontos 
 
@@ -164,41 +204,37 @@ class QuizGameService:
             points_earned=points
         )
         
-        session.answers.append(question_answer)
-        session.total_points += points
-        
-        if is_correct:
-            session.correct_answers += 1
-        else:
-            session.wrong_answers += 1
-            
-        session.current_question_index += 1
+        # Verifica Fim de Jogo (a última resposta grava também o status final)
+        is_finished = session.current_question_index + 1 >= len(session.questions)
+        if is_finished:
+            self._mark_finished(session, QuizStatus.COMPLETED)
         
-        # Verifica Fim de Jogo
-        is_finished = session.current_question_index >= len(session.questions)
+        # Um único find_one_and_update condicionado à pergunta da vez ($push/$inc);
+        # uma segunda submissão da mesma pergunta não casa e vira StaleSessionError
+        session = await self.sessions.apply_answer(session, question_answer, finish=is_finished)
         
         if is_finished:
             await self._finish_quiz(session)
-        else:
-            await self.session_repo.update(session)
             
         return {
             "is_correct": is_correct,
             "points_earned": points,
-            "correct_answer_id": str(correct_answer["id"]), # Front pode mostrar qual era a certa
+            "correct_answer_id": correct_answer_id, # Front pode mostrar qual era a certa
             "is_quiz_finished": is_finished,
             "new_total_points": session.total_points
         }
 
-    async def _finish_quiz(self, session: QuizSession):
-        """Finaliza o quiz e dispara eventos"""
-        session.status = QuizStatus.COMPLETED
+    @staticmethod
+    def _mark_finished(session: QuizSession, status: QuizStatus) -> None:
+        """Preenche status final, fim e duração (gravados junto com a última operação)"""
+        session.status = status
         session.finished_at = datetime.utcnow()
         session.total_time_seconds = int(
             (session.finished_at - session.started_at).total_seconds()
         )
-        
-        await self.session_repo.update(session)
+
+    async def _finish_quiz(self, session: QuizSession):
+        """Dispara os eventos do quiz finalizado (status final já gravado)"""
         logger.info(f"🏁 Quiz Finalizado: User={session.user_id}, Pontos={session.total_points}")
 
         #await self.session_repo.update(session)
@@ -239,6 +275,8 @@ class QuizGameService:
         session = await self.session_repo.get_active_by_user(user_id)
         if not session:
             return None
+        # O documento pode estar atrás do cache (respostas ainda não gravadas)
+        session = await self.sessions.fresh(session)
         
         # Retornar o formato completo da sessão para compatibilidade com frontend
         session_dict = {
@@ -272,21 +310,26 @@ class QuizGameService:
         """
         Marca o quiz como abandonado.
         """
-        session = await self.session_repo.get_by_id(session_id)
+        async with self.sessions.lock(session_id):
+            try:
+                return await self._abandon_quiz(session_id)
+            except StaleSessionError:
+                # O cache dizia "em andamento", mas o MongoDB não casou (ex: quiz finalizado
+                # por outro worker/réplica): relê e valida de novo antes de responder
+                await self.sessions.reload(session_id)
+                return await self._abandon_quiz(session_id)
+
+    async def _abandon_quiz(self, session_id: str) -> QuizSession:
+        session = await self.sessions.get(session_id)
         if not session:
             raise ValueError("Sessão não encontrada")
       
         if session.status != QuizStatus.IN_PROGRESS:
             raise ValueError("Este quiz já foi finalizado ou abandonado")
         
-        session.status = QuizStatus.ABANDONED
-        session.finished_at = datetime.utcnow()
- 
-        session.total_time_seconds = int(
-            (session.finished_at - session.started_at).total_seconds()
-        )
+        self._mark_finished(session, QuizStatus.ABANDONED)
    
-        await self.session_repo.update(session)
+        await self.sessions.close_session(session)
         logger.info(f"⚠️ Quiz abandonado: session_id={session_id}")
         
         return session
\ No newline at end of file
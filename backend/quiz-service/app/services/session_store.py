@@ -0,0 +1,431 @@
+"""
+Sessões em andamento em memória e gravação das respostas como deltas no MongoDB
+
+Antes cada resposta lia a QuizSession inteira e regravava o documento com um
+`$set` do model_dump completo. Aqui a sessão em andamento fica em um cache
+(local ou Redis, SESSION_STORE_BACKEND) e cada resposta vira um delta:
+`$push` da resposta, `$inc` de pontos/acertos/erros e do índice.
+
+SESSION_WRITE_MODE=atomic (padrão): cada resposta é um único find_one_and_update
+condicionado a status in_progress e ao current_question_index esperado, que
+devolve o documento já atualizado. Duas requisições para a mesma pergunta (toque
+duplo, réplicas diferentes) não passam as duas: a segunda não casa o filtro.
+
+SESSION_WRITE_MODE=write_behind: os deltas de uma sessão são acumulados e
+gravados juntos em um único update (menos escritas, mas só é seguro com uma
+réplica ou com o mesmo processo atendendo a sessão):
+
+- em background, a cada SESSION_FLUSH_SECONDS;
+- no checkpoint, quando a sessão acumula SESSION_CHECKPOINT_EVERY respostas
+  (1 = grava toda resposta, sem janela de perda);
+- na finalização/abandono e no shutdown, antes de qualquer evento sair.
+
+O update é condicionado ao índice que o MongoDB tinha quando o delta começou,
+então um flush repetido (ex: timeout depois de aplicado) não duplica respostas.
+As respostas de uma mesma sessão são serializadas por um lock por processo,
+que só existe enquanto alguém o usa (sessões finalizadas, abandonadas ou que
+saíram do cache não deixam locks para trás).
+
+Com várias réplicas/workers, a sessão em cache pode ficar atrás do MongoDB
+(resposta gravada por outro processo). Uma validação que falha com a sessão do
+cache (StaleSessionError) é repetida uma vez depois de reler o MongoDB.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.repositories.quiz_session_repository import QuizSessionRepository
+from app.schemas.quiz_session import QuestionAnswer, QuizSession, QuizStatus
+
+logger = logging.getLogger(__name__)
+
+
+class StaleSessionError(ValueError):
+    """Validação que pode ter falhado por causa de uma sessão em cache defasada"""
+
+
+class SessionCache(ABC):
+    """Onde ficam as sessões quentes (interface comum aos backends)"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[QuizSession]:
+        """Sessão em cache (None se ausente ou expirada)"""
+        pass
+
+    @abstractmethod
+    async def set(self, session: QuizSession) -> None:
+        """Grava/atualiza a sessão no cache"""
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Remove a sessão do cache"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalSessionCache(SessionCache):
+    """Sessões no próprio processo (LRU com expiração por inatividade)"""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[QuizSession]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        session, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def set(self, session: QuizSession) -> None:
+        self._sessions[str(session.id)] = (session, time.monotonic() + self.ttl_seconds)
+        self._sessions.move_to_end(str(session.id))
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class RedisSessionCache(SessionCache):
+    """Sessões compartilhadas entre réplicas (pacote opcional `redis`)"""
+
+    def __init__(self, url: str, ttl_seconds: float = 3600.0, prefix: str = "quiz:session:"):
+        import redis.asyncio as redis  # dependência opcional
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, session_id: str) -> Optional[QuizSession]:
+        raw = await self.client.get(self.prefix + session_id)
+        return QuizSession.model_validate_json(raw) if raw else None
+
+    async def set(self, session: QuizSession) -> None:
+        await self.client.set(
+            self.prefix + str(session.id),
+            session.model_dump_json(by_alias=True),
+            px=int(self.ttl_seconds * 1000),
+        )
+
+    async def delete(self, session_id: str) -> None:
+        await self.client.delete(self.prefix + session_id)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def build_session_cache() -> SessionCache:
+    """Cria o backend configurado em SESSION_STORE_BACKEND (local ou redis)"""
+    if settings.SESSION_STORE_BACKEND == "redis":
+        try:
+            return RedisSessionCache(settings.SESSION_STORE_REDIS_URL, settings.SESSION_STORE_TTL_SECONDS)
+        except ImportError:
+            logger.warning("SESSION_STORE_BACKEND=redis, mas o pacote 'redis' não está instalado. Usando cache local")
+    return LocalSessionCache(settings.SESSION_STORE_MAX_SESSIONS, settings.SESSION_STORE_TTL_SECONDS)
+
+
+class _SessionLock:
+    """Lock de uma sessão e quantas requisições o seguram ou aguardam"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+@dataclass
+class PendingDelta:
+    """Respostas ainda não gravadas de uma sessão"""
+
+    base_index: int  # current_question_index no MongoDB quando o delta começou
+    new_index: int
+    answers: List[Dict[str, Any]] = field(default_factory=list)
+    points: int = 0
+    correct: int = 0
+    wrong: int = 0
+
+
+class HotSessionStore:
+    """Lê sessões em andamento do cache e grava as respostas como deltas adiados"""
+
+    def __init__(
+        self,
+        cache: SessionCache,
+        flush_seconds: float = 1.0,
+        checkpoint_every: int = 5,
+        atomic: bool = True,
+    ):
+        self.cache = cache
+        self.atomic = atomic
+        self.flush_seconds = flush_seconds
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.repo: Optional[QuizSessionRepository] = None
+        self._pending: Dict[str, PendingDelta] = {}
+        self._locks: Dict[str, _SessionLock] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.flushed_answers = 0
+        self.flush_errors = 0
+        self.conflicts = 0
+        self.atomic_writes = 0
+        self.reloads = 0
+
+    @asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        """Lock da sessão: respostas, finalização e flush da mesma sessão não se intercalam"""
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = _SessionLock()
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            # Último a sair remove o lock: nada acumula por sessão finalizada ou largada
+            if entry.users == 0 and self._locks.get(session_id) is entry:
+                del self._locks[session_id]
+
+    async def start(self, repo: QuizSessionRepository) -> None:
+        self.repo = repo
+        if self._flusher is None and self.flush_seconds > 0 and not self.atomic:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Para o flush periódico e grava tudo que estiver pendente"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush_all()
+        await self.cache.close()
+
+    async def add(self, session: QuizSession) -> None:
+        """Sessão recém-criada (já gravada no MongoDB) passa a ser servida do cache"""
+        await self.cache.set(session)
+
+    async def get(self, session_id: str) -> Optional[QuizSession]:
+        """Sessão do cache ou, na falta, do MongoDB. Deve ser chamado com self.lock(session_id) adquirido."""
+        session = await self.cache.get(session_id)
+        if session is not None:
+            self.hits += 1
+            return session
+        self.misses += 1
+        if session_id in self._pending:
+            # Saiu do cache com respostas pendentes: grava antes de reler o MongoDB
+            await self._flush_locked(session_id)
+        session = await self.repo.get_by_id(session_id)
+        if session is not None and session.status == QuizStatus.IN_PROGRESS:
+            await self.cache.set(session)
+        return session
+
+    async def reload(self, session_id: str) -> Optional[QuizSession]:
+        """
+        Descarta a sessão do cache e relê do MongoDB (gravando antes o que estiver
+        pendente). Deve ser chamado com self.lock(session_id) adquirido.
+        """
+        self.reloads += 1
+        await self.cache.delete(session_id)
+        return await self.get(session_id)
+
+    async def fresh(self, session: QuizSession) -> QuizSession:
+        """Versão mais recente de uma sessão lida do MongoDB (o cache pode estar à frente)"""
+        cached = await self.cache.get(str(session.id))
+        return cached if cached is not None else session
+
+    @staticmethod
+    def _final_fields(session: QuizSession) -> Dict[str, Any]:
+        return {
+            "status": session.status.value,
+            "finished_at": session.finished_at,
+            "total_time_seconds": session.total_time_seconds,
+        }
+
+    async def apply_answer(self, session: QuizSession, answer: QuestionAnswer, finish: bool = False) -> QuizSession:
+        """
+        Registra a resposta e devolve a sessão atualizada. Com finish=True grava
+        também o status final (já preenchido pelo chamador) e tira a sessão do cache.
+        Deve ser chamado com self.lock(session.id) adquirido.
+
+        Raises:
+            StaleSessionError: o MongoDB não está mais na pergunta/estado da sessão informada
+                (já respondida, finalizada ou sessão do cache defasada); no write-behind,
+                só na última resposta (finish=True)
+        """
+        if self.atomic:
+            return await self._apply_atomic(session, answer, finish)
+
+        session_id = str(session.id)
+        delta = self._pending.get(session_id)
+        if delta is None:
+            delta = self._pending[session_id] = PendingDelta(
+                base_index=session.current_question_index,
+                new_index=session.current_question_index,
+            )
+
+        session.answers.append(answer)
+        session.total_points += answer.points_earned
+        if answer.is_correct:
+            session.correct_answers += 1
+        else:
+            session.wrong_answers += 1
+        session.current_question_index += 1
+
+        delta.answers.append(answer.model_dump())
+        delta.points += answer.points_earned
+        delta.correct += int(answer.is_correct)
+        delta.wrong += int(not answer.is_correct)
+        delta.new_index = session.current_question_index
+
+        if finish:
+            await self.close_session(session)
+            return session
+        await self.cache.set(session)
+        if len(delta.answers) >= self.checkpoint_every:
+            try:
+                await self._flush_locked(session_id)
+            except Exception as e:
+                # Checkpoint falhou: o delta continua pendente e o flush periódico tenta de novo
+                logger.warning(f"Checkpoint da sessão {session_id} adiado: {e}")
+        return session
+
+    async def _apply_atomic(self, session: QuizSession, answer: QuestionAnswer, finish: bool) -> QuizSession:
+        session_id = str(session.id)
+        try:
+            updated = await self.repo.record_answer(
+                session_id,
+                expected_index=session.current_question_index,
+                answer=answer.model_dump(),
+                points=answer.points_earned,
+                is_correct=answer.is_correct,
+                set_fields=self._final_fields(session) if finish else None,
+            )
+        except Exception:
+            # A sessão em cache pode ter sido alterada pelo chamador; a próxima leitura vai ao MongoDB
+            await self.cache.delete(session_id)
+            raise
+        if updated is None:
+            self.conflicts += 1
+            await self.cache.delete(session_id)
+            raise StaleSessionError("Pergunta já respondida ou quiz não está em andamento")
+
+        self.atomic_writes += 1
+        if finish:
+            await self.cache.delete(session_id)
+        else:
+            await self.cache.set(updated)
+        return updated
+
+    async def close_session(self, session: QuizSession) -> None:
+        """
+        Grava (de forma síncrona) as respostas pendentes junto com o status final e
+        tira a sessão do cache. Deve ser chamado com self.lock(session.id) adquirido.
+
+        Raises:
+            StaleSessionError: nada foi gravado; o MongoDB não está mais no estado da
+                sessão do cache (ex: finalizada por outro worker/réplica)
+        """
+        session_id = str(session.id)
+        try:
+            applied = await self._flush_locked(session_id, self._final_fields(session))
+        finally:
+            # Em caso de falha a próxima leitura volta ao MongoDB (depois de gravar o pendente)
+            await self.cache.delete(session_id)
+        if not applied:
+            raise StaleSessionError("Quiz não está mais em andamento")
+
+    async def _flush_locked(self, session_id: str, final: Optional[Dict[str, Any]] = None) -> bool:
+        """Grava o delta pendente (e `final`); False se o MongoDB não casou com a sessão"""
+        delta = self._pending.pop(session_id, None)
+        if delta is None and final is None:
+            return True
+        try:
+            if delta is None:
+                applied = await self.repo.apply_delta(session_id, set_fields=final)
+            else:
+                applied = await self.repo.apply_delta(
+                    session_id,
+                    base_index=delta.base_index,
+                    new_index=delta.new_index,
+                    answers=delta.answers,
+                    points=delta.points,
+                    correct=delta.correct,
+                    wrong=delta.wrong,
+                    set_fields=final,
+                )
+        except Exception:
+            self.flush_errors += 1
+            if delta is not None:
+                self._pending[session_id] = delta
+            raise
+        self.flushes += 1
+        if delta is not None:
+            self.flushed_answers += len(delta.answers)
+        if not applied:
+            # O índice no MongoDB não era o esperado: o delta já tinha sido aplicado
+            # (retry após timeout) ou a sessão foi alterada por fora
+            self.conflicts += 1
+            logger.warning(f"Delta da sessão {session_id} não aplicado: índice no MongoDB divergente")
+        return applied
+
+    async def flush_all(self) -> None:
+        for session_id in list(self._pending):
+            async with self.lock(session_id):
+                try:
+                    await self._flush_locked(session_id)
+                except Exception as e:
+                    logger.error(f"Falha ao gravar respostas da sessão {session_id}: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.cache).__name__,
+            "mode": "atomic" if self.atomic else "write_behind",
+            "atomic_writes": self.atomic_writes,
+            "reloads": self.reloads,
+            "locks": len(self._locks),
+            "pending_sessions": len(self._pending),
+            "pending_answers": sum(len(delta.answers) for delta in self._pending.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "flushed_answers": self.flushed_answers,
+            "flush_errors": self.flush_errors,
+            "conflicts": self.conflicts,
+        }
+
+
+session_store = HotSessionStore(
+    build_session_cache(),
+    flush_seconds=settings.SESSION_FLUSH_SECONDS,
+    checkpoint_every=settings.SESSION_CHECKPOINT_EVERY,
+    atomic=settings.SESSION_WRITE_MODE != "write_behind",
+)
@@ -10,7 +10,13 @@ from fastapi.responses import RedirectResponse
 import uvicorn
 
 from app.config import settings
-from app.database import init_db, close_db
+from app.tracing import TracingMiddleware, tracer
+from app.database import init_db, close_db, get_database
+from app.indexes import apply_migrations
+from app.repositories.question_repository import QuestionRepository
+from app.repositories.quiz_session_repository import QuizSessionRepository
+from app.services.question_pool import question_pools
+from app.services.session_store import session_store
 from app.messaging.producer import event_producer
 
 from app.routers import teams, questions, answers
@@ -22,6 +28,17 @@ async def lifespan(app: FastAPI):
     print("🔄 Inicializando conexões...")
 
     await init_db()
+    if settings.MONGO_INDEXES_AUTO_APPLY:
+        # Índices versionados (app/indexes.py); falha não impede o serviço de subir
+        try:
+            version = await apply_migrations(get_database())
+            print(f"🗂️ Índices do MongoDB na versão {version}")
+        except Exception as e:
+            print(f"⚠️ Não foi possível aplicar os índices do MongoDB: {e}")
+    # Sessões em andamento em memória; respostas gravadas em lote no MongoDB
+    await session_store.start(QuizSessionRepository(get_database()))
+    # IDs das perguntas por time em memória: o start_quiz sorteia sem $sample
+    await question_pools.start(QuestionRepository(get_database()))
 
     await event_producer.connect(max_retries=10, retry_delay=5)
 
@@ -31,7 +48,11 @@ async def lifespan(app: FastAPI):
     yield
     print("🛑 Encerrando conexões...")
     await event_producer.close()
+    # Grava as respostas ainda pendentes antes de fechar o MongoDB
+    await session_store.stop()
+    await question_pools.stop()
     await close_db()
+    tracer.close()
     print("✅ Quiz Service encerrado com sucesso")
 
 
@@ -51,6 +72,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span de cada requisição, continuando o trace do gateway (traceparent / X-Request-ID)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # --- REGISTRO DE ROTAS ---
 
 # 1. Rotas Administrativas (CRUD Backoffice)
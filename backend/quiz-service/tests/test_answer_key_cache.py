@@ -0,0 +1,177 @@
+"""
+Testes do cache do gabarito (AnswerKeyCache) e da sua invalidação
+"""
+import pytest
+
+from app.routers import answers, questions
+from app.routers.answers import AnswerCreate
+from app.schemas.question_schemas import QuestionCreateRequest
+from app.services import question_admin_service
+from app.services.answer_key_cache import AnswerKeyCache
+from app.services.question_admin_service import QuestionAdminService
+from app.services.question_pool import QuestionPools
+from app.services.quiz_game_service import QuizGameService
+from app.services.session_store import HotSessionStore, LocalSessionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeAnswerRepo:
+    """Gabarito em memória; conta as consultas ao banco"""
+
+    def __init__(self, keys=None):
+        self.keys = dict(keys or {})
+        self.batch_queries = []
+        self.single_queries = []
+        self.answers = {}
+
+    async def get_correct_answer_ids(self, question_ids):
+        self.batch_queries.append(list(question_ids))
+        return {qid: self.keys[qid] for qid in question_ids if qid in self.keys}
+
+    async def get_correct_answer_by_question(self, question_id):
+        self.single_queries.append(question_id)
+        answer_id = self.keys.get(question_id)
+        return {"id": answer_id, "questionId": question_id} if answer_id else None
+
+    async def update(self, answer_id, data):
+        return {"id": answer_id, **data}
+
+    async def create(self, data):
+        answer = {"id": f"a-{len(self.answers)}", **data}
+        self.answers[answer["id"]] = answer
+        return answer
+
+    async def create_many(self, docs):
+        for doc in docs:
+            await self.create(doc)
+
+    async def get_by_id(self, answer_id):
+        return self.answers.get(answer_id)
+
+    async def delete(self, answer_id):
+        return self.answers.pop(answer_id, None) is not None
+
+
+class FakeQuestionRepo:
+    async def get_existing_ids(self, question_ids):
+        return set(question_ids)
+
+    async def create(self, data):
+        return {"id": "q-new", **data}
+
+    async def delete(self, question_id):
+        return True
+
+
+class FakeSessionRepo:
+    async def get_active_by_user(self, user_id):
+        return None
+
+    async def create(self, session):
+        return session.model_copy(update={"id": "s1"})
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AnswerKeyCache(max_size=10)
+    # Routers e serviço de admin invalidam a instância global
+    for module in (answers, questions, question_admin_service):
+        monkeypatch.setattr(module, "answer_key_cache", cache)
+    return cache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = AnswerKeyCache(max_size=2)
+    cache.put("q1", "a1")
+    cache.put("q2", "a2")
+    cache.get("q1")  # "q2" passa a ser o menos usado
+    cache.put("q3", "a3")
+
+    assert cache.get("q2") is None
+    assert (cache.get("q1"), cache.get("q3")) == ("a1", "a3")
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = AnswerKeyCache(ttl_seconds=60, clock=clock)
+    cache.put("q1", "a1")
+
+    clock.now = 59
+    assert cache.get("q1") == "a1"
+    clock.now = 60
+    assert cache.get("q1") is None
+    assert len(cache) == 0
+
+
+async def test_correct_answer_id_reads_the_database_once():
+    cache = AnswerKeyCache()
+    repo = FakeAnswerRepo({"q1": "a1"})
+
+    assert await cache.correct_answer_id("q1", repo) == "a1"
+    assert await cache.correct_answer_id("q1", repo) == "a1"
+    assert await cache.correct_answer_id("q-sem-gabarito", repo) is None
+    assert repo.single_queries == ["q1", "q-sem-gabarito"]
+
+
+async def test_start_quiz_prewarms_the_session_answer_keys(cache):
+    keys = {f"q{index}": f"a{index}" for index in range(6)}
+    repo = FakeAnswerRepo(keys)
+    pools = QuestionPools(refresh_seconds=0)
+    for question_id in keys:
+        pools.add(question_id)
+    pools.loaded = True
+    store = HotSessionStore(LocalSessionCache())
+    service = QuizGameService(
+        FakeSessionRepo(), FakeQuestionRepo(), repo, None, answer_keys=cache, sessions=store, pools=pools
+    )
+
+    session = await service.start_quiz(user_id=1)
+
+    # Uma única consulta ($in) para todas as perguntas sorteadas
+    assert len(repo.batch_queries) == 1
+    assert sorted(repo.batch_queries[0]) == sorted(session.questions)
+    for question_id in session.questions:
+        assert await cache.correct_answer_id(question_id, repo) == keys[question_id]
+    assert repo.single_queries == []
+
+    # Uma segunda partida com as mesmas perguntas não consulta o banco de novo
+    assert await cache.warm(session.questions, repo) == 0
+    assert len(repo.batch_queries) == 1
+
+
+async def test_answer_create_and_delete_invalidate_the_question(cache):
+    repo = FakeAnswerRepo()
+    cache.put("q1", "a-antiga")
+
+    created = await answers.create_answer(
+        AnswerCreate(text="Pelé", correct=True, questionId="q1"), repository=repo, _admin_role="admin"
+    )
+    assert cache.get("q1") is None
+
+    cache.put("q1", created.id)
+    await answers.delete_answer(created.id, repository=repo, _admin_role="admin")
+    assert cache.get("q1") is None
+
+
+async def test_question_create_and_delete_invalidate_the_question(cache, monkeypatch):
+    monkeypatch.setattr(question_admin_service, "question_pools", QuestionPools(refresh_seconds=0))
+    monkeypatch.setattr(questions, "question_pools", QuestionPools(refresh_seconds=0))
+    cache.put("q-new", "resposta-de-uma-pergunta-antiga")
+
+    service = QuestionAdminService(FakeQuestionRepo(), FakeAnswerRepo())
+    await service.create_full_question(
+        QuestionCreateRequest(statement="Quem?", options=["A", "B"], correct_option_index=1)
+    )
+    assert cache.get("q-new") is None
+
+    cache.put("q-new", "a-1")
+    await questions.delete_question("q-new", repository=FakeQuestionRepo(), _admin_role="admin")
+    assert cache.get("q-new") is None
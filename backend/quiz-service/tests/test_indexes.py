@@ -0,0 +1,154 @@
+"""
+Testes das migrações de índices (apply_migrations) com um banco em memória
+"""
+from datetime import datetime, timedelta
+
+from pymongo.errors import OperationFailure
+
+from app.indexes import LATEST_VERSION, MIGRATIONS, MIGRATIONS_COLLECTION, MIGRATIONS_ID, apply_migrations, dry_run
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for key, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """Subconjunto do Motor usado pelas migrações (filtro por igualdade e $in)"""
+
+    def __init__(self):
+        self.docs = []
+        self.indexes = {"_id_": {}}
+        self.created = []
+        self.fail_on = None
+
+    async def create_indexes(self, models):
+        names = [model.document["name"] for model in models]
+        if self.fail_on in names:
+            raise OperationFailure("E11000 duplicate key error")
+        self.created.extend(names)
+        self.indexes.update({name: {} for name in names})
+        return names
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    def _matches(self, doc, query):
+        for key, value in query.items():
+            if isinstance(value, dict) and "$in" in value:
+                if doc.get(key) not in value["$in"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if self._matches(doc, query)])
+
+    async def find_one(self, query):
+        return next((doc for doc in self.docs if self._matches(doc, query)), None)
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update["$set"])
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one(query)
+        if doc is None:
+            doc = {**query, "version": 0, "history": []}
+            self.docs.append(doc)
+        doc["version"] = max(doc["version"], update["$max"]["version"])
+        doc["history"].append(update["$push"]["history"])
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def session(session_id, user_id, minutes_ago, status="in_progress"):
+    started_at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return {"_id": session_id, "user_id": user_id, "status": status, "started_at": started_at}
+
+
+def record(db):
+    return db[MIGRATIONS_COLLECTION].docs[0]
+
+
+async def test_migrations_are_applied_in_order_and_recorded():
+    db = FakeDatabase()
+
+    assert await apply_migrations(db) == LATEST_VERSION
+
+    doc = record(db)
+    assert doc["_id"] == MIGRATIONS_ID
+    assert doc["version"] == LATEST_VERSION
+    assert [entry["version"] for entry in doc["history"]] == [migration.version for migration in MIGRATIONS]
+    assert "one_in_progress_per_user" in db["quiz_sessions"].indexes
+    assert (await dry_run(db))["pending"] == []
+
+
+async def test_second_run_applies_nothing():
+    db = FakeDatabase()
+    await apply_migrations(db)
+    created = {name: list(collection.created) for name, collection in db.items()}
+
+    assert await apply_migrations(db) == LATEST_VERSION
+
+    assert {name: collection.created for name, collection in db.items()} == created
+    assert len(record(db)["history"]) == len(MIGRATIONS)
+
+
+async def test_failed_step_keeps_previous_version_and_is_retried():
+    db = FakeDatabase()
+    db["quiz_sessions"].fail_on = "one_in_progress_per_user"
+
+    # A v1 fica registrada; a v2 falha e não entra no histórico
+    assert await apply_migrations(db) == 1
+    assert record(db)["version"] == 1
+    assert [entry["version"] for entry in record(db)["history"]] == [1]
+    assert [item["version"] for item in (await dry_run(db))["pending"]] == [2]
+
+    db["quiz_sessions"].fail_on = None
+    assert await apply_migrations(db) == 2
+    assert [entry["version"] for entry in record(db)["history"]] == [1, 2]
+
+
+async def test_duplicate_in_progress_sessions_are_abandoned_before_the_unique_index():
+    db = FakeDatabase()
+    db["quiz_sessions"].docs = [
+        session("old", 1, 30),
+        session("newest", 1, 1),
+        session("middle", 1, 10),
+        session("other-user", 2, 20),
+        session("done", 1, 5, status="completed"),
+    ]
+
+    assert await apply_migrations(db) == LATEST_VERSION
+
+    status = {doc["_id"]: doc["status"] for doc in db["quiz_sessions"].docs}
+    assert status == {
+        "old": "abandoned",
+        "newest": "in_progress",
+        "middle": "abandoned",
+        "other-user": "in_progress",
+        "done": "completed",
+    }
+    assert record(db)["history"][1]["prepare"] == {"abandoned_duplicates": 2}
@@ -0,0 +1,203 @@
+"""
+Testes dos pools de perguntas (QuestionPools) usados no sorteio do start_quiz
+"""
+import pytest
+
+from app.routers import questions
+from app.schemas.question_schemas import QuestionCreateRequest
+from app.services import question_admin_service
+from app.services.question_admin_service import QuestionAdminService
+from app.services.question_pool import IdPool, QuestionPools
+from app.services.quiz_game_service import QuizGameService
+from app.services.session_store import HotSessionStore, LocalSessionCache
+
+
+class FakeQuestionRepo:
+    """Coleção questions em memória; `during_read` simula alterações durante a recarga"""
+
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self.random_queries = 0
+        self.existence_queries = 0
+        self.during_read = None
+
+    async def get_pool_entries(self):
+        entries = list(self.entries)
+        if self.during_read:
+            self.during_read()
+        return entries
+
+    async def get_existing_ids(self, question_ids):
+        self.existence_queries += 1
+        stored = {question_id for question_id, _ in self.entries}
+        return {question_id for question_id in question_ids if question_id in stored}
+
+    async def get_random_questions(self, limit=10, team_id=None):
+        self.random_queries += 1
+        ids = [question_id for question_id, team in self.entries if team_id in (None, team)]
+        return [{"id": question_id} for question_id in ids[:limit]]
+
+    async def create(self, data):
+        return {"id": "q-new", **data}
+
+    async def delete(self, question_id):
+        return True
+
+
+class FakeAnswerRepo:
+    async def get_correct_answer_ids(self, question_ids):
+        return {}
+
+    async def create_many(self, docs):
+        pass
+
+
+class FakeSessionRepo:
+    async def get_active_by_user(self, user_id):
+        return None
+
+    async def create(self, session):
+        return session.model_copy(update={"id": "s1"})
+
+
+def entries(count, team_id=None, prefix="q"):
+    return [(f"{prefix}{index}", team_id) for index in range(count)]
+
+
+def pool_ids(pools, team_id=None):
+    return set(pools.sample(1000, team_id))
+
+
+def make_service(pools, question_repo):
+    return QuizGameService(
+        FakeSessionRepo(),
+        question_repo,
+        FakeAnswerRepo(),
+        None,
+        sessions=HotSessionStore(LocalSessionCache()),
+        pools=pools,
+    )
+
+
+def test_id_pool_stays_dense_after_removals():
+    pool = IdPool(f"q{index}" for index in range(5))
+    pool.remove("q1")
+    pool.remove("q4")
+    pool.remove("nao-existe")
+
+    assert len(pool) == 3
+    assert "q1" not in pool
+    assert sorted(pool.sample(10)) == ["q0", "q2", "q3"]
+
+
+async def test_sample_is_distinct_and_per_team():
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(FakeQuestionRepo(entries(20, "flamengo", "fla") + entries(3, "vasco", "vas")))
+
+    drawn = pools.sample(10, "flamengo")
+    assert len(drawn) == len(set(drawn)) == 10
+    assert all(question_id.startswith("fla") for question_id in drawn)
+    # Menos perguntas que o pedido: devolve todas
+    assert sorted(pools.sample(10, "vasco")) == ["vas0", "vas1", "vas2"]
+    assert len(pools.sample(100)) == 23
+    assert pools.sample(10, "time-sem-perguntas") == []
+
+
+async def test_start_quiz_draws_from_the_pools_and_only_confirms_the_ids():
+    repo = FakeQuestionRepo(entries(12, "flamengo"))
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(repo)
+
+    session = await make_service(pools, repo).start_quiz(user_id=1, team_id="flamengo")
+
+    assert len(session.questions) == 10
+    assert (repo.random_queries, repo.existence_queries) == (0, 1)
+
+
+async def test_questions_deleted_by_another_worker_are_not_drawn():
+    repo = FakeQuestionRepo(entries(7))
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(repo)
+    # Outro worker apagou q0 e q1; os pools deste só veriam isso na ressincronização
+    repo.entries = entries(7)[2:]
+
+    session = await make_service(pools, repo).start_quiz(user_id=1)
+
+    assert sorted(session.questions) == ["q2", "q3", "q4", "q5", "q6"]
+    assert pool_ids(pools) == {"q2", "q3", "q4", "q5", "q6"}
+    assert repo.existence_queries == 2
+
+
+async def test_start_quiz_falls_back_to_the_database_when_pools_are_not_loaded():
+    repo = FakeQuestionRepo(entries(6))
+    pools = QuestionPools(refresh_seconds=0)
+    repo_down = FakeQuestionRepo()
+
+    async def fail():
+        raise ConnectionError("MongoDB indisponível")
+
+    repo_down.get_pool_entries = fail
+    await pools.start(repo_down)
+    assert not pools.loaded
+
+    session = await make_service(pools, repo).start_quiz(user_id=1)
+
+    assert repo.random_queries == 1
+    assert sorted(session.questions) == sorted(question_id for question_id, _ in repo.entries)
+
+
+async def test_start_quiz_rejects_an_empty_pool():
+    repo = FakeQuestionRepo(entries(4))
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(repo)
+
+    with pytest.raises(ValueError, match="Não há perguntas suficientes"):
+        await make_service(pools, repo).start_quiz(user_id=1)
+    assert repo.random_queries == 0
+
+
+async def test_refresh_replays_changes_made_while_reading():
+    repo = FakeQuestionRepo(entries(3))
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(repo)
+
+    def admin_changes():
+        # A leitura já foi feita: sem a reaplicação q-new voltaria a sumir e q0 voltaria
+        pools.add("q-new", "flamengo")
+        pools.remove("q0")
+
+    repo.during_read = admin_changes
+    await pools.refresh()
+
+    assert pool_ids(pools) == {"q1", "q2", "q-new"}
+    assert pool_ids(pools, "flamengo") == {"q-new"}
+
+
+async def test_refresh_picks_up_changes_made_outside_the_service():
+    repo = FakeQuestionRepo(entries(3))
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(repo)
+
+    repo.entries = [("q1", None), ("q9", "vasco")]
+    await pools.refresh()
+
+    assert pool_ids(pools) == {"q1", "q9"}
+    assert pool_ids(pools, "vasco") == {"q9"}
+
+
+async def test_question_create_and_delete_update_the_pools(monkeypatch):
+    pools = QuestionPools(refresh_seconds=0)
+    await pools.start(FakeQuestionRepo(entries(2)))
+    monkeypatch.setattr(question_admin_service, "question_pools", pools)
+    monkeypatch.setattr(questions, "question_pools", pools)
+
+    service = QuestionAdminService(FakeQuestionRepo(), FakeAnswerRepo())
+    await service.create_full_question(
+        QuestionCreateRequest(statement="Quem?", options=["A", "B"], correct_option_index=1, team_id="flamengo")
+    )
+    assert pool_ids(pools) == {"q0", "q1", "q-new"}
+    assert pool_ids(pools, "flamengo") == {"q-new"}
+
+    await questions.delete_question("q-new", repository=FakeQuestionRepo(), _admin_role="admin")
+    assert pool_ids(pools) == {"q0", "q1"}
+    assert pool_ids(pools, "flamengo") == set()
@@ -0,0 +1,282 @@
+"""
+Testes das sessões quentes (HotSessionStore) com uma coleção quiz_sessions em memória
+"""
+import asyncio
+import copy
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.repositories.quiz_session_repository import QuizSessionRepository
+from app.schemas.quiz_session import QuizSession, QuizStatus, QuizType
+from app.services.answer_key_cache import AnswerKeyCache
+from app.services.quiz_game_service import QuizGameService
+from app.services.session_store import HotSessionStore, LocalSessionCache, SessionCache
+
+QUESTIONS = [f"q{index}" for index in range(6)]
+KEYS = {question_id: f"a-{question_id}" for question_id in QUESTIONS}
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+
+
+class InsertResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class FakeCollection:
+    """Subconjunto do Motor usado pelo QuizSessionRepository (filtro por igualdade, $push/$inc/$set)"""
+
+    def __init__(self):
+        self.docs = {}
+        self.writes = 0
+        # Falhas a simular: "before" (não aplica) ou "after" (aplica e perde a resposta, ex: timeout)
+        self.failures = []
+
+    async def insert_one(self, doc):
+        doc = {"_id": ObjectId(), **copy.deepcopy(doc)}
+        self.docs[doc["_id"]] = doc
+        return InsertResult(doc["_id"])
+
+    async def find_one(self, query):
+        doc = self._match(query)
+        return copy.deepcopy(doc) if doc else None
+
+    async def update_one(self, query, update):
+        doc = self._write(query, update)
+        return UpdateResult(int(doc is not None))
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        doc = self._write(query, update)
+        return copy.deepcopy(doc) if doc else None
+
+    def _match(self, query):
+        for doc in self.docs.values():
+            if all(doc.get(key) == value for key, value in query.items()):
+                return doc
+        return None
+
+    def _write(self, query, update):
+        failure = self.failures.pop(0) if self.failures else None
+        if failure == "before":
+            raise TimeoutError("MongoDB indisponível")
+        self.writes += 1
+        doc = self._match(query)
+        if doc is not None:
+            for key, value in update.get("$push", {}).items():
+                doc[key].extend(value["$each"] if "$each" in value else [value])
+            for key, value in update.get("$inc", {}).items():
+                doc[key] += value
+            doc.update(update.get("$set", {}))
+        if failure == "after":
+            raise TimeoutError("Timeout depois de aplicar")
+        return doc
+
+
+class FakeAnswerRepo:
+    async def get_correct_answer_ids(self, question_ids):
+        return {qid: KEYS[qid] for qid in question_ids}
+
+    async def get_correct_answer_by_question(self, question_id):
+        return {"id": KEYS[question_id]}
+
+
+class FakeProducer:
+    def __init__(self):
+        self.events = []
+
+    async def publish_game_finished(self, payload):
+        self.events.append(payload)
+
+
+async def setup(atomic: bool, checkpoint_every: int = 100, cache: SessionCache = None):
+    collection = FakeCollection()
+    repo = QuizSessionRepository({"quiz_sessions": collection})
+    store = HotSessionStore(cache or LocalSessionCache(), flush_seconds=0, checkpoint_every=checkpoint_every, atomic=atomic)
+    await store.start(repo)
+    session = await repo.create(
+        QuizSession(user_id=1, quiz_type=QuizType.GENERAL, questions=QUESTIONS, started_at=datetime.utcnow())
+    )
+    await store.add(session)
+    service = QuizGameService(repo, None, FakeAnswerRepo(), FakeProducer(), answer_keys=AnswerKeyCache(), sessions=store)
+    return service, store, collection, str(session.id)
+
+
+def stored(collection, session_id):
+    return collection.docs[ObjectId(session_id)]
+
+
+def test_session_cache_is_abstract():
+    with pytest.raises(TypeError):
+        SessionCache()
+
+
+async def test_answers_are_written_in_order_as_one_delta():
+    service, store, collection, session_id = await setup(atomic=False)
+
+    for question_id in QUESTIONS[:3]:
+        await service.submit_answer(session_id, question_id, KEYS[question_id], 5)
+    # Respostas em memória: nada gravado ainda
+    assert collection.writes == 0
+    assert store.stats()["pending_answers"] == 3
+
+    await store.flush_all()
+    doc = stored(collection, session_id)
+    assert collection.writes == 1
+    assert [answer["question_id"] for answer in doc["answers"]] == QUESTIONS[:3]
+    assert doc["current_question_index"] == 3
+    assert doc["correct_answers"] == 3
+
+
+async def test_duplicate_submit_is_applied_once():
+    service, store, collection, session_id = await setup(atomic=False)
+
+    results = await asyncio.gather(
+        service.submit_answer(session_id, "q0", KEYS["q0"], 5),
+        service.submit_answer(session_id, "q0", KEYS["q0"], 5),
+        return_exceptions=True,
+    )
+
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert [str(result) for result in results if isinstance(result, Exception)] == ["Pergunta fora de ordem"]
+    await store.flush_all()
+    assert len(stored(collection, session_id)["answers"]) == 1
+
+
+async def test_failed_checkpoint_stays_pending_and_is_retried():
+    service, store, collection, session_id = await setup(atomic=False, checkpoint_every=2)
+
+    collection.failures = ["before"]
+    await service.submit_answer(session_id, "q0", KEYS["q0"], 5)
+    # O checkpoint falha, mas a resposta não se perde (segue pendente)
+    await service.submit_answer(session_id, "q1", KEYS["q1"], 5)
+    assert stored(collection, session_id)["answers"] == []
+    assert store.stats()["flush_errors"] == 1
+
+    await store.flush_all()
+    doc = stored(collection, session_id)
+    assert [answer["question_id"] for answer in doc["answers"]] == ["q0", "q1"]
+    assert store.stats()["pending_answers"] == 0
+
+
+async def test_retry_after_an_applied_flush_does_not_duplicate():
+    service, store, collection, session_id = await setup(atomic=False)
+    await service.submit_answer(session_id, "q0", KEYS["q0"], 5)
+
+    # Aplicado no MongoDB, mas a resposta se perde: o delta volta para pendente
+    collection.failures = ["after"]
+    await store.flush_all()
+    await store.flush_all()
+
+    assert len(stored(collection, session_id)["answers"]) == 1
+    assert store.stats()["conflicts"] == 1
+
+
+async def test_stop_flushes_pending_deltas():
+    service, store, collection, session_id = await setup(atomic=False)
+    for question_id in QUESTIONS[:2]:
+        await service.submit_answer(session_id, question_id, KEYS[question_id], 5)
+
+    await store.stop()
+
+    doc = stored(collection, session_id)
+    assert [answer["question_id"] for answer in doc["answers"]] == QUESTIONS[:2]
+    assert store.stats()["pending_sessions"] == 0
+
+
+async def test_last_answer_writes_final_status_before_the_event():
+    service, store, collection, session_id = await setup(atomic=False)
+
+    for question_id in QUESTIONS:
+        result = await service.submit_answer(session_id, question_id, KEYS[question_id], 5)
+
+    assert result["is_quiz_finished"]
+    doc = stored(collection, session_id)
+    assert doc["status"] == QuizStatus.COMPLETED.value
+    assert len(doc["answers"]) == len(QUESTIONS)
+    assert service.event_producer.events[0]["correct_answers"] == len(QUESTIONS)
+
+
+async def second_worker(service: QuizGameService, session_id: str) -> QuizGameService:
+    """Outro worker/réplica: mesma coleção, cache próprio já com a sessão"""
+    store = HotSessionStore(LocalSessionCache(), flush_seconds=0, atomic=service.sessions.atomic)
+    await store.start(service.session_repo)
+    await store.get(session_id)
+    return QuizGameService(
+        service.session_repo, None, FakeAnswerRepo(), FakeProducer(), answer_keys=AnswerKeyCache(), sessions=store
+    )
+
+
+async def test_stale_cache_is_reloaded_before_rejecting_the_next_question():
+    worker_a, _, collection, session_id = await setup(atomic=True)
+    worker_b = await second_worker(worker_a, session_id)
+
+    await worker_a.submit_answer(session_id, "q0", KEYS["q0"], 5)
+    # O cache do worker B ainda está na q0; a q1 não pode virar "Pergunta fora de ordem"
+    result = await worker_b.submit_answer(session_id, "q1", KEYS["q1"], 5)
+
+    assert result["is_correct"]
+    doc = stored(collection, session_id)
+    assert [answer["question_id"] for answer in doc["answers"]] == ["q0", "q1"]
+    assert worker_b.sessions.stats()["reloads"] == 1
+
+
+async def test_double_tap_across_workers_is_recorded_once():
+    worker_a, _, collection, session_id = await setup(atomic=True)
+    worker_b = await second_worker(worker_a, session_id)
+
+    await worker_a.submit_answer(session_id, "q0", KEYS["q0"], 5)
+    with pytest.raises(ValueError, match="Pergunta fora de ordem"):
+        # O cache do worker B aceita a q0, o find_one_and_update não casa e a releitura recusa
+        await worker_b.submit_answer(session_id, "q0", KEYS["q0"], 5)
+
+    assert len(stored(collection, session_id)["answers"]) == 1
+    assert worker_b.sessions.stats()["conflicts"] == 1
+
+
+@pytest.mark.parametrize("atomic", [True, False])
+async def test_locks_are_released_after_use(atomic):
+    service, store, _, session_id = await setup(atomic=atomic)
+
+    await asyncio.gather(
+        service.submit_answer(session_id, "q0", KEYS["q0"], 5),
+        service.submit_answer(session_id, "q0", KEYS["q0"], 5),
+        return_exceptions=True,
+    )
+    # Partida largada no meio: nenhum lock fica para trás
+    assert store.stats()["locks"] == 0
+
+    for question_id in QUESTIONS[1:]:
+        await service.submit_answer(session_id, question_id, KEYS[question_id], 5)
+    assert store.stats()["locks"] == 0
+
+
+@pytest.mark.parametrize("atomic", [True, False])
+async def test_abandon_from_a_stale_cache_does_not_hide_a_finished_quiz(atomic):
+    worker_a, _, collection, session_id = await setup(atomic=atomic)
+    worker_b = await second_worker(worker_a, session_id)
+
+    for question_id in QUESTIONS:
+        await worker_a.submit_answer(session_id, question_id, KEYS[question_id], 5)
+    # O cache do worker B ainda mostra a sessão em andamento
+    with pytest.raises(ValueError, match="já foi finalizado"):
+        await worker_b.abandon_quiz(session_id)
+
+    assert stored(collection, session_id)["status"] == QuizStatus.COMPLETED.value
+    assert worker_b.sessions.stats()["reloads"] == 1
+
+
+async def test_abandon_with_a_current_cache_is_written():
+    service, store, collection, session_id = await setup(atomic=False)
+    await service.submit_answer(session_id, "q0", KEYS["q0"], 5)
+
+    session = await service.abandon_quiz(session_id)
+
+    doc = stored(collection, session_id)
+    assert session.status == doc["status"] == QuizStatus.ABANDONED.value
+    assert len(doc["answers"]) == 1
+    assert store.stats()["reloads"] == 0
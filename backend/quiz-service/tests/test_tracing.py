@@ -0,0 +1,121 @@
+"""
+Testes da propagação do trace (shared/tracing.py): middleware HTTP e RabbitMQ
+"""
+import json
+
+import pytest
+
+from app import tracing
+from app.messaging.producer import EventProducer
+from app.tracing import Tracer, TracingMiddleware, consumer_span, current_span
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+GATEWAY_SPAN_ID = "00f067aa0ba902b7"
+TRACEPARENT = f"00-{TRACE_ID}-{GATEWAY_SPAN_ID}-01"
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exporter = MemoryExporter()
+    # producer_span/consumer_span usam o tracer global do módulo
+    monkeypatch.setattr(tracing, "tracer", Tracer("quiz-service", exporter))
+    return exporter.spans
+
+
+async def call(app, headers):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/quizzes/answer",
+        "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+async def test_middleware_continues_the_gateway_trace(spans):
+    seen = []
+
+    async def endpoint(scope, receive, send):
+        seen.append(current_span.get().context)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    app = TracingMiddleware(endpoint, tracing.tracer)
+    sent = await call(app, {"traceparent": TRACEPARENT, "x-request-id": "req-1"})
+
+    [span] = spans
+    assert (span["trace_id"], span["parent_id"], span["request_id"]) == (TRACE_ID, GATEWAY_SPAN_ID, "req-1")
+    assert (span["kind"], span["attributes"]["http.status_code"]) == ("server", 200)
+    assert seen[0].span_id == span["span_id"]
+    assert (b"x-request-id", b"req-1") in sent[0]["headers"]
+
+
+async def test_middleware_starts_a_trace_without_traceparent(spans):
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 500, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = await call(TracingMiddleware(endpoint, tracing.tracer), {"traceparent": "invalido"})
+
+    [span] = spans
+    assert span["parent_id"] is None
+    assert span["status"] == "error"
+    assert (b"x-request-id", span["request_id"].encode()) in sent[0]["headers"]
+
+
+class FakeExchange:
+    name = "quiz_events"
+
+    def __init__(self):
+        self.messages = []
+
+    async def publish(self, message, routing_key):
+        self.messages.append((message, routing_key))
+
+
+class IncomingMessage:
+    """O que o consumidor lê de um aio_pika.IncomingMessage"""
+
+    def __init__(self, message, routing_key, exchange):
+        self.body = message.body
+        self.headers = message.headers
+        self.routing_key = routing_key
+        self.exchange = exchange
+
+
+async def test_rabbitmq_message_carries_the_trace_to_the_consumer(spans):
+    producer = EventProducer()
+    producer.quiz_exchange = FakeExchange()
+
+    with tracing.tracer.span("POST /quizzes/answer", "server", request_id="req-1") as request_span:
+        await producer.publish_game_finished({"session_id": "s1"})
+    [(message, routing_key)] = producer.quiz_exchange.messages
+    assert json.loads(message.body) == {"session_id": "s1"}
+
+    # Como no ranking-service e no worker: o processamento roda dentro de consumer_span
+    async with consumer_span(IncomingMessage(message, routing_key, FakeExchange.name)) as span:
+        assert current_span.get() is span
+
+    publish, server, consume = spans
+    assert (publish["kind"], publish["parent_id"]) == ("producer", request_span.span_id)
+    assert (consume["kind"], consume["name"]) == ("consumer", "consume game.finished")
+    assert consume["parent_id"] == publish["span_id"]
+    assert {span["trace_id"] for span in spans} == {request_span.trace_id}
+    assert consume["request_id"] == "req-1"
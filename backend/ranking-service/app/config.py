@@ -21,6 +21,15 @@ class Settings(BaseSettings):
     MONGODB_URL: str = "mongodb://localhost:27017/ranking_db"
     MONGODB_DB: str = "soccer_ranking"
     
+    # Tracing distribuído (traceparent + X-Request-ID, ver app/tracing.py). Spans em JSON
+    # por linha no arquivo e/ou em lotes para o coletor; sem nenhum dos dois, só propaga
+    TRACE_SERVICE_NAME: str = "ranking-service"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
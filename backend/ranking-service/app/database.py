@@ -2,9 +2,47 @@
 Configuração do banco de dados MongoDB para Ranking Service
 """
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo import monitoring
+from typing import Any, Dict, Optional, Tuple
 
 from app.config import settings
+from app.tracing import Span, current_span, tracer
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Span por comando do MongoDB, filho do span da requisição ou mensagem em andamento"""
+
+    def __init__(self):
+        self._spans: Dict[Tuple[Any, int], Span] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        # Comandos fora de uma requisição (handshake, monitoramento) não viram span
+        if current_span.get() is None:
+            return
+        collection = event.command.get(event.command_name)
+        attributes = {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.collection": collection if isinstance(collection, str) else None,
+        }
+        span = tracer.start_span(f"mongo {event.command_name}", "client", attributes=attributes)
+        self._spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.finish()
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.status = "error"
+            span.set("error", str(event.failure))
+            span.finish()
+
+
+mongo_tracer = MongoCommandTracer()
 
 client: Optional[AsyncIOMotorClient] = None
 database = None
@@ -13,7 +51,7 @@ database = None
 async def init_db():
     """Inicializa conexão com MongoDB"""
     global client, database
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[mongo_tracer])
     database = client[settings.MONGODB_DB]
     print(f"✅ Conectado ao MongoDB: {settings.MONGODB_DB}")
 
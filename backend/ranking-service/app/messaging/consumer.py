@@ -5,6 +5,7 @@ import aio_pika
 from datetime import datetime, timezone
 
 from app.config import settings
+from app.tracing import consumer_span
 from app.database import get_database
 from app.repositories.leaderboard_repository import LeaderboardRepository
 from app.services.leaderboard_service import LeaderboardService
@@ -68,7 +69,8 @@ class RabbitMQConsumer:
     async def _on_message(self, message: aio_pika.IncomingMessage):
         """Processa mensagem recebida"""
         try:
-            async with message.process():
+            # Span do processamento, no mesmo trace da requisição que finalizou o quiz
+            async with message.process(), consumer_span(message):
                 payload = json.loads(message.body.decode())
                 logger.info(f"📥 [EVENTO] Recebido: {message.routing_key}")
                 await self._handle_game_finished(payload)
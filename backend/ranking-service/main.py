@@ -9,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.config import settings
+from app.tracing import TracingMiddleware, tracer
 from app.database import init_db, close_db
 from app.messaging.consumer import RabbitMQConsumer
 from app.routers import leaderboard_routes
@@ -33,6 +34,7 @@ async def lifespan(app: FastAPI):
     print("🛑 Encerrando Ranking Service...")
     await consumer.close()
     await close_db()
+    tracer.close()
     print("✅ Ranking Service encerrado com sucesso")
 
 
@@ -51,6 +53,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span de cada requisição, continuando o trace do gateway (traceparent / X-Request-ID)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # --- REGISTRO DE ROTAS ---
 app.include_router(leaderboard_routes.router)
 
@@ -0,0 +1,390 @@
+"""
+Rastreamento distribuído (W3C Trace Context) e request ID
+
+Módulo único do gateway e dos serviços: no api-gateway ele é
+app/services/tracing.py e em auth/notification/quiz/ranking/user é
+app/tracing.py, sempre um link para este arquivo. O Dockerfile o copia do
+contexto extra `shared` (additional_contexts no docker-compose) e os workflows
+de deploy copiam o arquivo para dentro do pacote antes de publicar.
+
+O gateway abre o span raiz de cada requisição (ou continua o `traceparent`
+recebido), gera o X-Request-ID quando o cliente não manda um e repassa os dois
+aos microsserviços. Cada serviço continua o mesmo trace (TracingMiddleware) e o
+contexto vai nos headers das mensagens publicadas no RabbitMQ, retomado por
+quem as consome (producer_span/consumer_span).
+
+Os spans terminados vão, em JSON por linha, para TRACE_EXPORT_PATH e/ou em
+lotes via POST para TRACE_COLLECTOR_URL (ex: backend/trace_waterfall.py --serve).
+A escrita acontece em uma thread com fila limitada: com a fila cheia o span é
+descartado e contado em `dropped`, sem segurar a requisição.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+REQUEST_ID_HEADER = "x-request-id"
+
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# Request IDs de fora são aceitos só se curtos e sem caracteres estranhos (vão para logs e headers)
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:@/+=-]{1,128}$")
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """SpanContext de um header traceparent (None se ausente ou inválido)"""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+def clean_request_id(value: Optional[str]) -> Optional[str]:
+    if value and _REQUEST_ID_RE.match(value):
+        return value
+    return None
+
+
+current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Operação medida: início/fim, pai e atributos"""
+
+    __slots__ = (
+        "name", "kind", "service", "trace_id", "span_id", "parent_id", "sampled",
+        "request_id", "attributes", "status", "start_ns", "_started", "duration_ms", "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        kind: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        request_id: str,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.service = tracer.service
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.request_id = request_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.duration_ms: Optional[float] = None
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id, self.sampled)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def fail(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def finish(self) -> None:
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = round((time.perf_counter_ns() - self._started) / 1e6, 3)
+        if self.sampled:
+            self._tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "request_id": self.request_id,
+            "service": self.service,
+            "name": self.name,
+            "kind": self.kind,
+            "start_us": self.start_ns // 1000,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Escreve spans (JSON por linha) em arquivo e/ou envia em lotes para um coletor, numa thread"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        url: Optional[str] = None,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_seconds: float = 1.0,
+    ):
+        self.path = path
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_queue)
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        batch: List[Dict] = []
+        closing = False
+        while not closing:
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch: List[Dict]) -> None:
+        try:
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.writelines(json.dumps(span, default=str) + "\n" for span in batch)
+            if self.url:
+                request = urllib.request.Request(
+                    self.url,
+                    data=json.dumps(batch, default=str).encode(),
+                    headers={"content-type": "application/json"},
+                    method="POST",
+                )
+                urllib.request.urlopen(request, timeout=2.0).close()
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning("Falha ao exportar %d spans: %s", len(batch), e)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Envia o que restou na fila e encerra a thread"""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+class Tracer:
+    """Cria spans, propaga o contexto em headers e entrega os spans ao exportador"""
+
+    def __init__(self, service: str, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        self.service = service
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[SpanContext] = None,
+        request_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        """Filho de `parent` (contexto remoto) ou do span atual; sem nenhum dos dois, abre um trace novo"""
+        local = current_span.get()
+        if parent is None and local is not None:
+            parent = local.context
+            request_id = request_id or local.request_id
+        if parent is None:
+            trace_id = secrets.token_hex(16)
+            parent_id = None
+            sampled = random.random() < self.sample_rate
+        else:
+            trace_id, parent_id, sampled = parent
+        return Span(
+            self, name, kind, trace_id, parent_id, sampled,
+            request_id or uuid.uuid4().hex, attributes,
+        )
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[SpanContext] = None,
+        request_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Span]:
+        """Span ativo (current_span) durante o bloco; exceções marcam o span como erro"""
+        span = self.start_span(name, kind, parent, request_id, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            current_span.reset(token)
+            span.finish()
+
+    @staticmethod
+    def inject(headers: Dict[str, Any]) -> Dict[str, Any]:
+        """Acrescenta traceparent e X-Request-ID do span atual (HTTP ou headers de mensagem)"""
+        span = current_span.get()
+        if span is not None:
+            headers[TRACEPARENT_HEADER] = span.traceparent
+            headers[REQUEST_ID_HEADER] = span.request_id
+        return headers
+
+    @staticmethod
+    def extract(headers: Optional[Mapping[str, Any]]) -> Tuple[Optional[SpanContext], Optional[str]]:
+        """Contexto remoto e request ID recebidos (headers HTTP ou da mensagem)"""
+        if not headers:
+            return None, None
+        lowered = {}
+        for key, value in headers.items():
+            if isinstance(value, bytes):
+                value = value.decode("latin-1")
+            lowered[str(key).lower()] = value if isinstance(value, str) else None
+        return (
+            parse_traceparent(lowered.get(TRACEPARENT_HEADER)),
+            clean_request_id(lowered.get(REQUEST_ID_HEADER)),
+        )
+
+    def export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span.to_dict())
+
+    def stats(self) -> Dict[str, Any]:
+        exporter = self.exporter
+        return {
+            "service": self.service,
+            "sample_rate": self.sample_rate,
+            "export_path": exporter.path if exporter else None,
+            "collector_url": exporter.url if exporter else None,
+            "exported": exporter.exported if exporter else 0,
+            "dropped": exporter.dropped if exporter else 0,
+            "failed": exporter.failed if exporter else 0,
+        }
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def build_tracer(service: str) -> Tracer:
+    """Tracer com os TRACE_* do app/config.py; sem destino configurado os spans só propagam o contexto"""
+    exporter = None
+    if settings.TRACING_ENABLED and (settings.TRACE_EXPORT_PATH or settings.TRACE_COLLECTOR_URL):
+        exporter = SpanExporter(
+            path=settings.TRACE_EXPORT_PATH or None,
+            url=settings.TRACE_COLLECTOR_URL or None,
+            max_queue=settings.TRACE_QUEUE_SIZE,
+        )
+    return Tracer(service, exporter, settings.TRACE_SAMPLE_RATE if settings.TRACING_ENABLED else 0.0)
+
+
+class TracingMiddleware:
+    """Middleware ASGI: span do servidor para cada requisição, filho do span do gateway"""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        parent, request_id = self.tracer.extract(headers)
+        method = scope["method"]
+        attributes = {"http.method": method, "http.target": scope["path"]}
+        with self.tracer.span(f"{method} {scope['path']}", "server", parent, request_id, attributes) as span:
+
+            async def send_with_request_id(message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (REQUEST_ID_HEADER.encode(), span.request_id.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_request_id)
+            # Nome pelo template da rota (ex: GET /quizzes/{session_id}/answer), melhor para agrupar
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                span.name = f"{method} {route.path}"
+
+
+tracer = build_tracer(settings.TRACE_SERVICE_NAME)
+
+
+@contextmanager
+def producer_span(exchange: str, routing_key: str) -> Iterator[Dict[str, str]]:
+    """Span da publicação no RabbitMQ; entrega os headers de contexto a pôr na mensagem"""
+    attributes = {"messaging.system": "rabbitmq", "messaging.destination": exchange, "messaging.routing_key": routing_key}
+    with tracer.span(f"publish {routing_key}", "producer", attributes=attributes):
+        yield tracer.inject({})
+
+
+@asynccontextmanager
+async def consumer_span(message: Any) -> AsyncIterator[Span]:
+    """Span do processamento de uma mensagem (aio_pika), filho do span de quem publicou"""
+    parent, request_id = tracer.extract(getattr(message, "headers", None))
+    attributes = {
+        "messaging.system": "rabbitmq",
+        "messaging.destination": getattr(message, "exchange", None),
+        "messaging.routing_key": message.routing_key,
+    }
+    with tracer.span(f"consume {message.routing_key}", "consumer", parent, request_id, attributes) as span:
+        yield span
@@ -0,0 +1,140 @@
+"""
+Coletor local e waterfall dos traces do Soccer Quiz
+
+Os serviços exportam spans (JSON por linha) para TRACE_EXPORT_PATH e/ou em
+lotes via POST para TRACE_COLLECTOR_URL. Este script faz as duas pontas, sem
+dependências além da biblioteca padrão:
+
+    # Coletor (usado pelo docker-compose): grava os spans recebidos em um arquivo
+    python trace_waterfall.py --serve 4318 --out traces/spans.jsonl
+
+    # Waterfall dos traces mais lentos, de um trace ou de um X-Request-ID
+    python trace_waterfall.py traces/spans.jsonl --slowest 5
+    python trace_waterfall.py traces/spans.jsonl --request-id 3f2c...
+"""
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List
+
+BAR_WIDTH = 40
+
+
+def load_spans(paths: Iterable[str]) -> List[Dict]:
+    spans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+    return spans
+
+
+def group_traces(spans: List[Dict]) -> Dict[str, List[Dict]]:
+    traces: Dict[str, List[Dict]] = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    return traces
+
+
+def trace_bounds(spans: List[Dict]):
+    start = min(span["start_us"] for span in spans)
+    end = max(span["start_us"] + span["duration_ms"] * 1000 for span in spans)
+    return start, (end - start) / 1000
+
+
+def render(spans: List[Dict]) -> str:
+    """Árvore de spans com início relativo, duração e barra proporcional"""
+    start, total_ms = trace_bounds(spans)
+    ids = {span["span_id"] for span in spans}
+    children: Dict[str, List[Dict]] = defaultdict(list)
+    roots = []
+    for span in sorted(spans, key=lambda item: item["start_us"]):
+        if span.get("parent_id") in ids:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+
+    first = spans[0]
+    lines = [f"trace {first['trace_id']}  request {first.get('request_id')}  total {total_ms:.1f} ms"]
+    scale = BAR_WIDTH / total_ms if total_ms else 0
+
+    def walk(span: Dict, depth: int) -> None:
+        offset_ms = (span["start_us"] - start) / 1000
+        lead = int(offset_ms * scale)
+        width = max(1, int(span["duration_ms"] * scale))
+        bar = " " * lead + "█" * min(width, BAR_WIDTH - lead)
+        error = "  ERRO" if span.get("status") == "error" else ""
+        label = f"{'  ' * depth}{span['service']}: {span['name']}"
+        lines.append(
+            f"{label[:60]:60} {offset_ms:>8.1f} {span['duration_ms']:>8.1f} ms |{bar:{BAR_WIDTH}}|{error}"
+        )
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in roots:
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def serve(port: int, out: str) -> None:
+    """Coletor: POST com uma lista JSON de spans; cada span vira uma linha em `out`"""
+    lock = threading.Lock()
+    directory = os.path.dirname(out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            try:
+                spans = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            with lock, open(out, "a", encoding="utf-8") as file:
+                file.writelines(json.dumps(span) + "\n" for span in spans)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Coletor de spans em :{port} gravando em {out}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="arquivos JSONL de spans")
+    parser.add_argument("--serve", type=int, metavar="PORTA", help="roda o coletor em vez de mostrar traces")
+    parser.add_argument("--out", default="traces/spans.jsonl", help="arquivo do coletor")
+    parser.add_argument("--trace", help="trace_id")
+    parser.add_argument("--request-id", help="X-Request-ID")
+    parser.add_argument("--slowest", type=int, default=5, help="quantos traces mais lentos mostrar")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.out)
+        return
+
+    traces = group_traces(load_spans(args.files or [args.out]))
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    elif args.request_id:
+        selected = [spans for spans in traces.values() if any(s.get("request_id") == args.request_id for s in spans)]
+    else:
+        selected = sorted(traces.values(), key=lambda spans: trace_bounds(spans)[1], reverse=True)[: args.slowest]
+
+    for spans in selected:
+        print(render(spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,15 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = "http://auth-service:3000"
     
     
+    # Tracing distribuído (traceparent + X-Request-ID, ver app/tracing.py). Spans em JSON
+    # por linha no arquivo e/ou em lotes para o coletor; sem nenhum dos dois, só propaga
+    TRACE_SERVICE_NAME: str = "user-service"
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_COLLECTOR_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,6 +2,7 @@ import pika
 import json
 import logging
 from app.config import settings
+from app.tracing import producer_span
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -38,16 +39,18 @@ class RabbitMQProducer:
                 "created_at": str(datetime.utcnow())
             }
             
-            # 4. Publica
-            channel.basic_publish(
-                exchange=self.exchange,
-                routing_key=self.routing_key,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  
-                    content_type='application/json'
+            # 4. Publica (com traceparent/X-Request-ID da requisição nos headers)
+            with producer_span(self.exchange, self.routing_key) as headers:
+                channel.basic_publish(
+                    exchange=self.exchange,
+                    routing_key=self.routing_key,
+                    body=json.dumps(message),
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,  
+                        content_type='application/json',
+                        headers=headers,
+                    )
                 )
-            )
             
             logger.info(f"📤 Evento USER_CREATED enviado para {email}")
 
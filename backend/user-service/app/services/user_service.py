@@ -11,6 +11,7 @@ from app.models import User, UserRole
 from app.interfaces.user_repository import IUserRepository
 from app.producers import RabbitMQProducer
 from app.config import settings
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -100,7 +101,8 @@ class UserService:
             with httpx.Client() as client:
                 # Limpar refresh tokens
                 client.delete(
-                    f"{settings.AUTH_SERVICE_URL}/auth/users/{user_id}/tokens"
+                    f"{settings.AUTH_SERVICE_URL}/auth/users/{user_id}/tokens",
+                    headers=tracer.inject({}),
                 )
         except Exception as e:
             logger.error(f"❌ Erro ao limpar tokens no auth-service: {e}")
@@ -9,6 +9,7 @@ from fastapi.responses import RedirectResponse
 import uvicorn
 
 from app.config import settings
+from app.tracing import TracingMiddleware, tracer
 from app.routers import users
 from app.database import engine, Base
 
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
     print(f" ✅ Documentação disponível em: http://localhost:{settings.PORT}/docs")
     yield
     # Shutdown
+    tracer.close()
     print("User Service encerrado")
 
 
@@ -40,6 +42,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span de cada requisição, continuando o trace do gateway (traceparent / X-Request-ID)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # Registrar rotas
 app.include_router(users.router, prefix="/users", tags=["users"])
 